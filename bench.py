@@ -0,0 +1,309 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import gc
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from mint import max
+from mint import miny
+from mint.miny import *
+
+#-------------------------------------------------------------------------------
+# Synthetic design: an array of cores, each with its own interface, a shared
+# clock/reset and a scan chain through all of them
+#-------------------------------------------------------------------------------
+class bench_if(Interface):
+    @model
+    def rtl(self, a, b):
+        req = wire()
+        data = wire[32]()
+        ack = wire()
+
+        a > req > b
+        a > data > b
+        a < ack < b
+
+        return locals()
+
+class BenchTile(Module):
+    """ Core with a register pipeline inside, to give the top some depth """
+    depth = 64
+    work = 0
+
+    @model
+    def rtl(self, io):
+        # Stand-in for the python work of real model functions (parsing
+        # register tables, computing parameters)
+        sum(i * i for i in xrange(self.work))
+
+        regs = instance[self.depth].BenchReg
+
+        clk = wire()
+        io > clk > regs
+
+        stages = wire[32 * (self.depth + 1)]()
+        connect(regs/'d', stages[32 * self.depth - 1:0], Map.SLICE, dir=Dir.I)
+        connect(regs/'q', stages[32 * (self.depth + 1) - 1:32], Map.SLICE,
+                dir=Dir.O)
+
+        return locals()
+
+class BenchTop(Module):
+    lanes = 256
+    core = 'BenchCore'
+
+    @model
+    def rtl(self, io):
+        cores = getattr(instance[self.lanes], self.core)
+        ifs = interface[self.lanes].bench_if
+
+        clk, rst = wire() * 2
+        io > clk > cores
+        io > rst > cores
+
+        io == ifs
+        ifs == cores
+
+        chain = wire[self.lanes + 1]()
+        connect(cores/'si', chain[self.lanes - 1:0], Map.SLICE, dir=Dir.I)
+        connect(cores/'so', chain[self.lanes:1], Map.SLICE, dir=Dir.O)
+
+        return locals()
+
+def bench_design(lanes):
+    BenchTop.lanes = lanes
+    return miny.elaborate(BenchTop, 'rtl')
+
+def generate(mod):
+    out = cStringIO.StringIO()
+    max.VerilogGenerator(mod, out).generate_module()
+    return out
+
+#-------------------------------------------------------------------------------
+def timeit(func, repeat):
+    """ Return the median wall time of 'repeat' calls of func """
+    times = []
+    for i in range(repeat):
+        start = time.time()
+        func()
+        times.append(time.time() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+def report(name, seconds):
+    print "%-40s %10.3f ms" % (name, seconds * 1000)
+
+#-------------------------------------------------------------------------------
+def bench_server(repeat=10):
+    """ Cold (batch CLI) vs warm (server) request latency """
+    from mint import server
+
+    tmpdir = tempfile.mkdtemp()
+    sock = os.path.join(tmpdir, 'mint.sock')
+    out = os.path.join(tmpdir, 'Demo.v')
+    python = [sys.executable, '-m', 'mint']
+    devnull = open(os.devnull, 'w')
+
+    def cold():
+        subprocess.check_call(python + ['gen', '-d', 'demo', 'Demo', 'rtl',
+                                        '-o', out], stderr=devnull)
+
+    proc = subprocess.Popen(python + ['serve', '-s', sock, 'demo'],
+                            stderr=devnull)
+    try:
+        while True:
+            try:
+                client = server.Client(sock)
+                break
+            except socket.error:
+                time.sleep(0.01)
+
+        def warm():
+            client.request('Demo', 'rtl', out)
+
+        def warm_cli():
+            subprocess.check_call(python + ['client', '-s', sock,
+                                            'Demo', 'rtl', '-o', out])
+
+        report('cold: mint gen', timeit(cold, repeat))
+        report('warm: mint client (process)', timeit(warm_cli, repeat))
+        report('warm: server request', timeit(warm, repeat))
+        client.close()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+#-------------------------------------------------------------------------------
+def bench_bind(repeat=5, lanes=(1, 1024)):
+    """ Bulk binding cost by number of lanes """
+    for n in lanes:
+        insts = miny.instance[n].BenchLane
+        intfs = miny.interface[n].bench_lane_if
+        bus = miny.wire[4 * n]()
+        clk = miny.wire()
+
+        def bind():
+            clk > insts
+            insts == intfs
+            miny.connect(insts, bus, miny.Map.SLICE, dir=miny.Dir.O)
+
+        def bind_templated():
+            clk > insts/'clk'
+            insts/'{n}' == intfs
+            miny.connect(insts/'d', bus, miny.Map.SLICE, dir=miny.Dir.O)
+
+        report('bind %d lanes' % n, timeit(bind, repeat))
+        report('bind %d lanes, templated' % n, timeit(bind_templated, repeat))
+
+def bench_slices(repeat=5, lanes=1024, rounds=10):
+    """ Repeated per-lane slicing of a bus, and the slice objects it keeps """
+    bus = miny.wire[4 * lanes]()
+
+    def slices():
+        return [bus[4 * i + 3:4 * i] for i in range(lanes) for j in range(rounds)]
+
+    report('%d slices of %d lanes' % (lanes * rounds, lanes),
+           timeit(slices, repeat))
+    kept = slices()
+    print "%-40s %10d" % ('distinct slice objects',
+                           len(set(id(wire) for wire in kept)))
+
+def bench_wires(repeat=5, signals=4096):
+    """ Creating many wires: one by one, as a bundle, and by cloning """
+    table = [('sig%d' % i, i % 64) for i in xrange(signals)]
+
+    def one_by_one():
+        return [miny.wire[width](name) for name, width in table]
+
+    report('%d wires one by one' % signals, timeit(one_by_one, repeat))
+    report('%d wires as a bundle' % signals,
+           timeit(lambda: miny.wire.bundle(table), repeat))
+    report('wire() * %d' % signals,
+           timeit(lambda: miny.wire() * signals, repeat))
+
+def bench_models(repeat=5, intfs=4096):
+    """ Repeated interface elaboration, and model lookup alone """
+    def elaborate():
+        for i in xrange(intfs):
+            bench_if(model='rtl')
+
+    def lookup():
+        intf = bench_if()
+        for i in xrange(intfs):
+            getattr(intf, 'rtl')
+
+    report('elaborate %d interfaces' % intfs, timeit(elaborate, repeat))
+    report('%d model lookups' % intfs, timeit(lookup, repeat))
+
+def bench_templatize(repeat=5, lanes=1024, exprs=100):
+    """ Binding an instance array through many inst/template expressions """
+    insts = miny.instance[lanes].BenchLane
+    bus = miny.wire[lanes]()
+
+    def bind():
+        for i in range(exprs):
+            bus > insts/('in%d' % i)
+            insts[i % lanes]/('out%d' % i) > bus[i % lanes]
+
+    report('%d templated binds, %d lanes' % (2 * exprs, lanes),
+           timeit(bind, repeat))
+
+def bench_gc(lanes=1024):
+    """ Cyclic GC cost on an elaborated netlist, plain vs frozen """
+    for freeze in (False, True):
+        gc.collect()
+        start = time.time()
+        with miny.frozen_gc(freeze):
+            mod = bench_design(lanes)
+            generate(mod)
+        label = 'frozen' if freeze else 'plain'
+        report('%s: elaborate + generate' % label, time.time() - start)
+
+        start = time.time()
+        gc.collect()
+        report('%s: full collection, netlist alive' % label, time.time() - start)
+
+        del mod
+        print "%-40s %10d" % ('%s: cycles left in netlist' % label,
+                               gc.collect())
+
+def bench_stream(lanes=1024):
+    """ Peak memory of a whole-module vs streaming generate, in subprocesses """
+    script = ('import os, bench, mint.miny as miny; bench.BenchTop.lanes = %d; '
+              'bench.BenchTop.core = "BenchTile"; '
+              'miny.verilog(bench.BenchTop, "rtl", open(os.devnull, "w"), '
+              'stream=%s)')
+    for stream in (False, True):
+        start = time.time()
+        proc = subprocess.Popen([sys.executable, '-c', script % (lanes, stream)])
+        pid, status, rusage = os.wait4(proc.pid, 0)
+        label = 'stream' if stream else 'plain'
+        report('%s: generate %d lanes' % (label, lanes), time.time() - start)
+        print "%-40s %10d kB" % ('%s: peak rss' % label, rusage.ru_maxrss)
+
+def bench_parallel(repeat=3, lanes=256, depth=64, work=100000):
+    """ Serial vs multi-process elaboration of a top with deep submodules """
+    from mint import elab
+
+    BenchTop.core = 'BenchTile'
+    BenchTile.depth = depth
+    BenchTile.work = work
+    jobs = [1]
+    while jobs[-1] < multiprocessing.cpu_count():
+        jobs.append(min(jobs[-1] * 2, multiprocessing.cpu_count()))
+
+    def elaborate(elaborator):
+        BenchTop.lanes = lanes
+        return miny.elaborate(BenchTop, 'rtl', elaborator=elaborator)
+
+    try:
+        serial = timeit(lambda: elaborate(elab.Elaborator()), repeat)
+        report('serial: elaborate %d tiles' % lanes, serial)
+        for n in jobs:
+            seconds = timeit(lambda: elaborate(elab.ParallelElaborator(n)),
+                             repeat)
+            report('%d jobs: elaborate %d tiles (x%.2f)' %
+                   (n, lanes, serial / seconds), seconds)
+    finally:
+        BenchTop.core = 'BenchCore'
+        BenchTile.work = 0
+
+def bench_sv(repeat=3, lanes=1024):
+    """ Flattened verilog vs SystemVerilog interfaces: time and size """
+    mod = bench_design(lanes)
+    for generator in (max.VerilogGenerator, max.SystemVerilogGenerator):
+        def generate():
+            out = cStringIO.StringIO()
+            generator(mod, out).generate_module()
+            return out
+        report('%s: generate %d lanes' % (generator.__name__, lanes),
+               timeit(generate, repeat))
+        print "%-40s %10d bytes" % ('%s: output' % generator.__name__,
+                                     len(generate().getvalue()))
+
+#-------------------------------------------------------------------------------
+BENCHMARKS = [
+    bench_server,
+    bench_bind,
+    bench_slices,
+    bench_wires,
+    bench_models,
+    bench_templatize,
+    bench_gc,
+    bench_stream,
+    bench_parallel,
+    bench_sv,
+]
+
+if __name__ == '__main__':
+    names = sys.argv[1:]
+    for bench in BENCHMARKS:
+        if not names or bench.__name__[len('bench_'):] in names:
+            print "-" * 80
+            print bench.__name__
+            bench()
@@ -49,9 +49,11 @@ class InterfaceFromString(Interface):
             if line == "": continue
 
             op, sig, size = re.split(r'\s+', line)
+            signals.append((op, sig, int(size)))
 
-            w = wire[int(size)](sig)
+        wires = wire.bundle([(sig, size) for op, sig, size in signals])
 
+        for (op, sig, size), w in zip(signals, wires):
             if op == '>':
                 a > w > b
             elif op == '<':
@@ -80,9 +82,11 @@ class InterfaceFromTable(Interface):
             if line == "": continue
 
             op, sig, size = re.split(r'\s+', line)
+            signals.append((op, sig, int(size)))
 
-            w = wire[int(size)](sig)
+        wires = wire.bundle([(sig, size) for op, sig, size in signals])
 
+        for (op, sig, size), w in zip(signals, wires):
             if op == '>':
                 a > w > b
             elif op == '<':
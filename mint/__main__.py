@@ -0,0 +1,276 @@
+#-------------------------------------------------------------------------------
+import argparse
+import importlib
+import logging
+import os
+import sys
+
+from mint import diff
+from mint import memprof
+from mint import miny
+from mint import output
+from mint import server
+from mint import stats
+from mint import watch
+from mint.min import MintError
+
+#-------------------------------------------------------------------------------
+def cmd_gen(args):
+    for name in args.design:
+        importlib.import_module(name)
+
+    if not args.memprofile:
+        generate(args)
+        return
+
+    with memprof.MemoryProfile() as profile:
+        generate(args, profile)
+    path = (args.output or args.module) + '.mem.json'
+    with output.OutputFile(path, codec='none') as out:
+        profile.save(out)
+    for line in profile.format_summary().splitlines():
+        logging.info(line)
+    logging.info("memory profile: %s", path)
+
+def generate(args, profile=None):
+    if args.stream and args.jobs:
+        sys.exit("mint: --stream elaborates one instance at a time, it cannot "
+                 "be combined with --jobs")
+    if args.split is not None:
+        if args.output is None:
+            sys.exit("mint: --split needs an output file (-o)")
+        if args.stream:
+            sys.exit("mint: --split cannot be combined with --stream")
+        codec = args.compress or output.codec_for(args.output)
+        if codec not in (None, 'none'):
+            sys.exit("mint: --split writes plain `include files, it cannot "
+                     "compress them (%s)" % codec)
+        stats = output.WriteStats()
+        try:
+            with output.ConcurrentWriter(args.write_jobs, stats) as writer:
+                with output.SplitOutput(args.output, args.split, stats,
+                                        writer) as out:
+                    miny.verilog(args.module, args.model, out,
+                                 freeze_gc=args.freeze_gc, jobs=args.jobs,
+                                 sv=args.sv, profile=profile)
+        except output.WriteError as e:
+            sys.exit("mint: %s" % e)
+        logging.info("%s: %s", out.manifest_path, stats)
+    elif args.output is None and args.compress in (None, 'none'):
+        miny.verilog(args.module, args.model, freeze_gc=args.freeze_gc,
+                     stream=args.stream, jobs=args.jobs, sv=args.sv,
+                     profile=profile)
+    elif args.output is None:
+        with output.CompressedWriter(sys.stdout, args.compress) as out:
+            miny.verilog(args.module, args.model, out,
+                         freeze_gc=args.freeze_gc, stream=args.stream,
+                         jobs=args.jobs, sv=args.sv, profile=profile)
+    else:
+        stats = output.WriteStats()
+        with output.OutputFile(args.output, stats, args.compress) as out:
+            miny.verilog(args.module, args.model, out,
+                         freeze_gc=args.freeze_gc, stream=args.stream,
+                         jobs=args.jobs, sv=args.sv, profile=profile)
+        logging.info("%s: %s", args.output, stats)
+
+def cmd_stats(args):
+    for name in args.design:
+        importlib.import_module(name)
+
+    mod = miny.elaborate(args.module, args.model, jobs=args.jobs)
+    per_module, total = stats.design_stats(mod)
+    if args.json:
+        sys.stdout.write(stats.json_report(per_module, total))
+    else:
+        sys.stdout.write(stats.format_report(per_module, total))
+
+def cmd_stubs(args):
+    for name in args.design:
+        importlib.import_module(name)
+
+    vgen = miny.VerilogGenerator(miny.elaborate(args.module, args.model))
+    try:
+        if args.output is None:
+            vgen.generate_submodules(args.submodule, args.instance)
+        else:
+            stats = output.WriteStats()
+            vgen.generate_submodule_files(args.output, args.submodule,
+                                          args.instance, stats=stats,
+                                          jobs=args.jobs)
+            logging.info("%s: %s", args.output, stats)
+    except (MintError, output.WriteError) as e:
+        sys.exit("mint: %s" % e)
+
+def cmd_netlist(args):
+    for name in args.design:
+        importlib.import_module(name)
+
+    netlist = diff.Netlist.from_module(miny.elaborate(args.module, args.model))
+    if args.output is None:
+        netlist.save(sys.stdout)
+    else:
+        with output.OutputFile(args.output) as out:
+            netlist.save(out)
+
+def load_netlist(spec):
+    """ Load a saved netlist file, or elaborate a 'module:model' spec """
+    if os.path.exists(spec):
+        with open(spec) as f:
+            return diff.Netlist.load(f)
+    try:
+        module, model = spec.split(':')
+    except ValueError:
+        sys.exit("mint: '%s' is neither a netlist file nor MODULE:MODEL" % spec)
+    return diff.Netlist.from_module(miny.elaborate(module, model))
+
+def cmd_diff(args):
+    for name in args.design:
+        importlib.import_module(name)
+
+    changes = diff.diff(load_netlist(args.old), load_netlist(args.new))
+    sys.stdout.write(diff.format_changes(changes))
+    if changes:
+        sys.exit(1)
+
+def cmd_watch(args):
+    targets = [watch.parse_target(spec) for spec in args.target]
+    watcher = watch.Watcher(args.design, targets, interval=args.interval)
+    watcher.run()
+
+def cmd_serve(args):
+    server.serve(args.socket, args.design)
+
+def cmd_client(args):
+    client = server.Client(args.socket)
+    try:
+        response = client.request(args.module, args.model, args.output)
+    finally:
+        client.close()
+
+    if response['status'] != 'ok':
+        sys.exit("mint: %s" % response['error'])
+    if args.output is None:
+        sys.stdout.write(response['text'])
+
+def positive_int(text):
+    """ argparse type for job counts """
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise argparse.ArgumentTypeError("'%s' is not a positive number" % text)
+    return value
+
+#-------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='mint')
+    subparsers = parser.add_subparsers()
+
+    gen = subparsers.add_parser('gen', help='generate verilog for a module')
+    gen.add_argument('module', help='name of the module to generate')
+    gen.add_argument('model', help='model of the module to build')
+    gen.add_argument('-d', '--design', action='append', default=[],
+                     help='python module holding the design (repeatable)')
+    gen.add_argument('-o', '--output', help='output file (default: stdout)')
+    gen.add_argument('--freeze-gc', action='store_true',
+                     help='keep the cyclic GC off the netlist')
+    gen.add_argument('--stream', action='store_true',
+                     help='elaborate and emit one submodule instance at a time')
+    gen.add_argument('-j', '--jobs', type=positive_int,
+                     help='elaborate submodules in JOBS worker processes')
+    gen.add_argument('--sv', action='store_true',
+                     help='SystemVerilog, with interfaces kept whole')
+    gen.add_argument('--split', type=output.parse_size, metavar='SIZE',
+                     help='split wires and instances into `include files of '
+                          'about SIZE bytes (e.g. 4M), listed in a manifest; '
+                          'not compressed')
+    gen.add_argument('--write-jobs', type=positive_int, default=4,
+                     metavar='N',
+                     help='with --split, write the files from N threads '
+                          '(default: 4)')
+    gen.add_argument('--memprofile', action='store_true',
+                     help='snapshot memory after each phase into '
+                          'OUTPUT.mem.json (or MODULE.mem.json)')
+    gen.add_argument('-z', '--compress',
+                     choices=sorted(output.CODECS) + ['none'],
+                     help='compress the output (default: by the extension of '
+                          'the output file, %s)' %
+                          ', '.join(sorted(output.EXTENSIONS)))
+    gen.set_defaults(func=cmd_gen)
+
+    sta = subparsers.add_parser('stats', help='report design statistics')
+    sta.add_argument('module', help='name of the module to report on')
+    sta.add_argument('model', help='model of the module to build')
+    sta.add_argument('-d', '--design', action='append', default=[],
+                     help='python module holding the design (repeatable)')
+    sta.add_argument('--json', action='store_true', help='report as JSON')
+    sta.add_argument('-j', '--jobs', type=positive_int,
+                     help='elaborate submodules in JOBS worker processes')
+    sta.set_defaults(func=cmd_stats)
+
+    stu = subparsers.add_parser('stubs', help='generate submodule stubs')
+    stu.add_argument('module', help='name of the module to generate')
+    stu.add_argument('model', help='model of the module to build')
+    stu.add_argument('-d', '--design', action='append', default=[],
+                     help='python module holding the design (repeatable)')
+    stu.add_argument('-o', '--output', metavar='DIR',
+                     help='write one file per submodule to DIR '
+                          '(default: all to stdout)')
+    stu.add_argument('-s', '--submodule', help='only stub this submodule')
+    stu.add_argument('-i', '--instance', help='only stub this instance')
+    stu.add_argument('-j', '--jobs', type=positive_int, default=4,
+                     help='write files from JOBS threads (default: 4)')
+    stu.set_defaults(func=cmd_stubs)
+
+    net = subparsers.add_parser('netlist', help='save a structural netlist')
+    net.add_argument('module', help='name of the module to save')
+    net.add_argument('model', help='model of the module to build')
+    net.add_argument('-d', '--design', action='append', default=[],
+                     help='python module holding the design (repeatable)')
+    net.add_argument('-o', '--output', help='output file (default: stdout)')
+    net.set_defaults(func=cmd_netlist)
+
+    dif = subparsers.add_parser('diff', help='compare two netlists')
+    dif.add_argument('old', help='saved netlist file or MODULE:MODEL')
+    dif.add_argument('new', help='saved netlist file or MODULE:MODEL')
+    dif.add_argument('-d', '--design', action='append', default=[],
+                     help='python module holding the design (repeatable)')
+    dif.set_defaults(func=cmd_diff)
+
+    wat = subparsers.add_parser('watch', help='regenerate on design changes, '
+                                'rebuilding only the edited modules and their '
+                                'parents')
+    wat.add_argument('design', nargs='+',
+                     help='python modules holding the design')
+    wat.add_argument('-t', '--target', action='append', default=[],
+                     required=True, metavar='MODULE:MODEL:PATH',
+                     help='module, model and output file (repeatable)')
+    wat.add_argument('-i', '--interval', type=float, default=0.25,
+                     help='polling interval in seconds (default: 0.25)')
+    wat.set_defaults(func=cmd_watch)
+
+    srv = subparsers.add_parser('serve', help='serve generation requests')
+    srv.add_argument('design', nargs='*',
+                     help='python modules holding the design')
+    srv.add_argument('-s', '--socket', default='mint.sock',
+                     help='unix socket path (default: mint.sock)')
+    srv.set_defaults(func=cmd_serve)
+
+    cli = subparsers.add_parser('client', help='generate through a server')
+    cli.add_argument('module', help='name of the module to generate')
+    cli.add_argument('model', help='model of the module to build')
+    cli.add_argument('-s', '--socket', default='mint.sock',
+                     help='unix socket path (default: mint.sock)')
+    cli.add_argument('-o', '--output', help='output file (default: stdout)')
+    cli.set_defaults(func=cmd_client)
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(format='mint: %(message)s', level=logging.INFO)
+    sys.path.insert(0, '')
+
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+#-------------------------------------------------------------------------------
+import collections
+import hashlib
+import json
+
+import min
+
+#-------------------------------------------------------------------------------
+# Structural summary of an elaborated design. Every module object is reduced
+# to a record with a digest of its whole subtree, so identical subtrees are
+# stored once and compare in O(1):
+# - ports = ((name, dir, width), ...) sorted by name
+# - insts = ((name, InstRecord), ...) sorted by name
+# - InstRecord.pins = ((port, dir, net), ...) sorted by port
+#-------------------------------------------------------------------------------
+ModuleRecord = collections.namedtuple('ModuleRecord', 'name, ports, insts')
+InstRecord = collections.namedtuple('InstRecord', 'module, digest, pins')
+
+Change = collections.namedtuple('Change', 'kind, item, path, old, new')
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+# 2: directions as emitted (ports were recorded from the inside before)
+FORMAT_VERSION = 2
+
+def _digest(*parts):
+    return hashlib.sha1(repr(parts)).hexdigest()
+
+def module_ports(mod):
+    """ Return the sorted (name, dir, width) ports of an elaborated module """
+    ports = {}
+    for mod_inst in mod.module_instances.values():
+        if mod_inst.isport:
+            for pin in mod_inst.get_pins():
+                ports[pin.net.fname] = (pin.net.fname,
+                                        min.Dir.NAMES[pin.effective_dir],
+                                        len(pin.net.parent))
+    return tuple(sorted(ports.values()))
+
+def instance_pins(inst):
+    """ Return the sorted (port, dir, net) connections of an instance """
+    return tuple(sorted((pin.fname, min.Dir.NAMES[pin.effective_dir],
+                         pin.net.formatted_repr())
+                        for pin in inst.get_pins()))
+
+class Netlist(object):
+    """
+    Structural netlist of an elaborated design, as emitted in verilog:
+    - top = digest of the top module record
+    - modules = digest -> ModuleRecord, one per distinct module subtree
+    """
+
+    def __init__(self, top, modules):
+        self.top = top
+        self.modules = modules
+
+    @classmethod
+    def from_module(cls, top):
+        """ Summarize the hierarchy of the elaborated module object 'top' """
+        modules = {}
+        digests = {} # id(module object) -> digest
+
+        # Post-order walk with an explicit stack, as hierarchies can be deep
+        stack = [(top, False)]
+        while stack:
+            mod, visited = stack.pop()
+            if id(mod) in digests:
+                continue
+
+            insts = [inst for inst in mod.get_module_instances(flatten=True)
+                     if not inst.isport]
+            if not visited:
+                stack.append((mod, True))
+                stack.extend((inst.module, False) for inst in insts
+                             if id(inst.module) not in digests)
+                continue
+
+            records = []
+            for inst in insts:
+                module = digests[id(inst.module)]
+                pins = instance_pins(inst)
+                name = inst.formatted_repr(fmt0="{name}", fmt1="{name}{index}")
+                records.append((name, InstRecord(module, _digest(module, pins),
+                                                 pins)))
+            records.sort()
+
+            ports = module_ports(mod)
+            digest = _digest(mod.name, ports,
+                             [(name, inst.digest) for name, inst in records])
+            modules[digest] = ModuleRecord(mod.name, ports, tuple(records))
+            digests[id(mod)] = digest
+
+        return cls(digests[id(top)], modules)
+
+    @property
+    def name(self):
+        return self.modules[self.top].name
+
+    #---------------------------------------------------------------------------
+    def save(self, f):
+        """ Write the netlist to the file object 'f' as JSON """
+        modules = {}
+        for digest, record in self.modules.iteritems():
+            modules[digest] = {
+                'name': record.name,
+                'ports': record.ports,
+                'insts': [(name, inst.module, inst.digest, inst.pins)
+                          for name, inst in record.insts],
+            }
+        json.dump({'format': FORMAT_VERSION, 'top': self.top,
+                   'modules': modules}, f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, f):
+        """ Read a netlist written by save from the file object 'f' """
+        data = json.load(f)
+        if data.get('format') != FORMAT_VERSION:
+            raise min.MintValueError("unsupported netlist format %r" %
+                                     data.get('format'))
+
+        modules = {}
+        for digest, record in data['modules'].iteritems():
+            ports = tuple(tuple(port) for port in record['ports'])
+            insts = tuple((name, InstRecord(module, inst_digest,
+                                            tuple(tuple(pin) for pin in pins)))
+                          for name, module, inst_digest, pins
+                          in record['insts'])
+            modules[digest] = ModuleRecord(record['name'], ports, insts)
+        return cls(data['top'], modules)
+
+#-------------------------------------------------------------------------------
+def diff(old, new):
+    """
+    Return the list of Changes from netlist 'old' to 'new' (Netlist or
+    elaborated module objects). Subtrees with equal digests are skipped, and
+    each pair of differing modules is compared once however often it is
+    instantiated.
+    """
+    if not isinstance(old, Netlist):
+        old = Netlist.from_module(old)
+    if not isinstance(new, Netlist):
+        new = Netlist.from_module(new)
+
+    cache = {}
+
+    def module_changes(old_digest, new_digest):
+        """ Changes relative to the module, with paths below it """
+        key = (old_digest, new_digest)
+        if key in cache:
+            return cache[key]
+
+        old_mod = old.modules[old_digest]
+        new_mod = new.modules[new_digest]
+        changes = []
+
+        for kind, name, old_val, new_val in _compare(
+                dict((port[0], port[1:]) for port in old_mod.ports),
+                dict((port[0], port[1:]) for port in new_mod.ports)):
+            changes.append(Change(kind, 'port', name, old_val, new_val))
+
+        old_insts = dict(old_mod.insts)
+        new_insts = dict(new_mod.insts)
+        for kind, name, old_inst, new_inst in _compare(old_insts, new_insts):
+            if kind != CHANGED:
+                inst = old_inst or new_inst
+                changes.append(Change(kind, 'instance', name,
+                                      old_inst and old.modules[inst.module].name,
+                                      new_inst and new.modules[inst.module].name))
+                continue
+            if old_inst.digest == new_inst.digest:
+                continue
+
+            old_name = old.modules[old_inst.module].name
+            new_name = new.modules[new_inst.module].name
+            if old_name != new_name:
+                changes.append(Change(CHANGED, 'instance', name,
+                                      old_name, new_name))
+
+            for kind, port, old_pin, new_pin in _compare(
+                    dict((pin[0], pin[1:]) for pin in old_inst.pins),
+                    dict((pin[0], pin[1:]) for pin in new_inst.pins)):
+                changes.append(Change(kind, 'connection',
+                                      '%s.%s' % (name, port),
+                                      old_pin, new_pin))
+
+            if old_inst.module != new_inst.module:
+                for change in module_changes(old_inst.module, new_inst.module):
+                    changes.append(change._replace(
+                        path='%s/%s' % (name, change.path)))
+
+        cache[key] = changes
+        return changes
+
+    if old.top == new.top:
+        return []
+
+    return [change._replace(path='%s/%s' % (new.name, change.path))
+            for change in module_changes(old.top, new.top)]
+
+def _compare(old, new):
+    """
+    Yield (kind, key, old value, new value) for the keys of dicts 'old' and
+    'new' in sorted order. Keys in both are yielded as CHANGED when the
+    values differ, and always if the values are InstRecords.
+    """
+    for key in sorted(set(old) | set(new)):
+        old_val = old.get(key)
+        new_val = new.get(key)
+        if old_val is None:
+            yield ADDED, key, None, new_val
+        elif new_val is None:
+            yield REMOVED, key, old_val, None
+        elif old_val != new_val or isinstance(old_val, InstRecord):
+            yield CHANGED, key, old_val, new_val
+
+#-------------------------------------------------------------------------------
+_SIGNS = {ADDED: '+', REMOVED: '-', CHANGED: '~'}
+
+def _value_repr(item, value):
+    if value is None:
+        return ''
+    if item == 'connection':
+        dir, net = value
+        return '%s %s' % (net, dir)
+    if item == 'port':
+        dir, width = value
+        return '%s [%d]' % (dir, width)
+    return value
+
+def format_changes(changes):
+    """ Return the changes as text, one line per change """
+    lines = []
+    for change in changes:
+        old = _value_repr(change.item, change.old)
+        new = _value_repr(change.item, change.new)
+        if change.kind == CHANGED:
+            detail = '%s -> %s' % (old, new)
+        else:
+            detail = old or new
+        lines.append('%s %-10s %s: %s' % (_SIGNS[change.kind], change.item,
+                                          change.path, detail))
+    return ''.join(line + '\n' for line in lines)
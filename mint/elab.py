@@ -0,0 +1,285 @@
+#-------------------------------------------------------------------------------
+import collections
+import cPickle
+import cStringIO
+import multiprocessing
+
+import min
+import max
+
+#-------------------------------------------------------------------------------
+class Elaborator(object):
+    """
+    Elaborates module/interface hierarchies of any depth from an explicit work
+    queue (no recursion). Each (object, model) pair is built once, and the
+    parent -> child edges are kept as a dependency graph:
+    - nodes = (obj, model) pairs in elaboration order
+    - children = (id(obj), model) -> list of child (obj, model) pairs
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.children = {}
+        self.queue = collections.deque()
+
+    @staticmethod
+    def key(obj, model):
+        return (id(obj), model)
+
+    def elaborate(self, obj, model, built=False):
+        """
+        Elaborate 'obj' and everything under it with 'model'. Set 'built' if
+        obj.make(model) already ran (as it does when a model is passed to the
+        constructor), so that only the objects under it are built.
+        """
+        self.add(obj, model, built)
+        self.run()
+        return obj
+
+    def elaborate_interfaces(self, obj, model):
+        """
+        Elaborate only the interfaces instantiated in 'obj' (which is built),
+        leaving its submodules to be elaborated later, one at a time
+        """
+        for intf_inst in obj.get_interface_instances(flatten=True):
+            intf_inst.model = model
+            self.elaborate(intf_inst.interface, model)
+
+    def add(self, obj, model, built=False):
+        """ Queue (obj, model) unless it was seen before """
+        key = self.key(obj, model)
+        if key in self.children:
+            return False
+        self.children[key] = []
+        self.queue.append((obj, model, built))
+        return True
+
+    def run(self):
+        while self.queue:
+            obj, model, built = self.queue.popleft()
+            if not built:
+                self.make(obj, model)
+            self.nodes.append((obj, model))
+
+            children = self.children[self.key(obj, model)]
+            for child in self.instantiated(obj, model):
+                children.append((child, model))
+                self.add(child, model)
+
+    def make(self, obj, model):
+        try:
+            obj.make(model)
+        except min.MintModelDoesNotExist:
+            # Leaf modules need not define every model, interfaces must
+            if not isinstance(obj, min.Module):
+                raise
+
+    def instantiated(self, obj, model):
+        """ Return the module and interface objects instantiated in 'obj' """
+        return [child for inst, child in self.instances(obj, model)]
+
+    def instances(self, obj, model):
+        """ Return (instance, module or interface object) pairs of 'obj' """
+        pairs = []
+        for mod_inst in obj.get_module_instances(flatten=True):
+            if mod_inst.isport:
+                continue
+            mod_inst.model = model
+            pairs.append((mod_inst, mod_inst.module))
+        for intf_inst in obj.get_interface_instances(flatten=True):
+            intf_inst.model = model
+            pairs.append((intf_inst, intf_inst.interface))
+        return pairs
+
+    #---------------------------------------------------------------------------
+    def parents(self):
+        """ Return the reverse graph: (id(obj), model) -> parent nodes """
+        parents = collections.defaultdict(list)
+        for obj, model in self.nodes:
+            for child in self.children[self.key(obj, model)]:
+                parents[self.key(*child)].append((obj, model))
+        return parents
+
+    def subtree(self, obj, model):
+        """ Return the nodes under (and including) (obj, model), breadth first """
+        nodes = [(obj, model)]
+        seen = set([self.key(obj, model)])
+        for node in nodes:
+            for child in self.children[self.key(*node)]:
+                key = self.key(*child)
+                if key not in seen:
+                    seen.add(key)
+                    nodes.append(child)
+        return nodes
+
+    def classes(self):
+        """ Return the set of module/interface classes that were elaborated """
+        return set(type(obj) for obj, model in self.nodes)
+
+#-------------------------------------------------------------------------------
+# Subtrees handed to the worker processes, which inherit them through fork
+_subtrees = []
+
+def _auto_classes():
+    return dict((cls, key) for key, cls in max.Registry._auto_created.items())
+
+def dump_subtree(root, objs):
+    """
+    Pickle the elaborated contents of 'root' and the list 'objs'. The root
+    object itself is only referenced, so that loading stitches the contents
+    into the root object of the loading process. Auto created classes are
+    referenced by registry key, as they cannot be pickled by name.
+    """
+    auto = _auto_classes()
+
+    def persistent_id(obj):
+        if obj is root:
+            return 'root'
+        if isinstance(obj, type) and obj in auto:
+            return auto[obj]
+        return None
+
+    f = cStringIO.StringIO()
+    pickler = cPickle.Pickler(f, cPickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = persistent_id
+    pickler.dump((root.__dict__, objs))
+    return f.getvalue()
+
+def load_subtree(root, data):
+    """ Load the output of dump_subtree into 'root', return the objs list """
+    def persistent_load(pid):
+        if pid == 'root':
+            return root
+        obj_name, obj_type = pid
+        return max.Registry.get_or_create(obj_name, obj_type)
+
+    unpickler = cPickle.Unpickler(cStringIO.StringIO(data))
+    unpickler.persistent_load = persistent_load
+    state, objs = unpickler.load()
+    root.__dict__.update(state)
+    return objs
+
+def _elaborate_subtree(i):
+    root, model = _subtrees[i]
+    elaborator = Elaborator()
+    elaborator.elaborate(root, model)
+    return dump_subtree(root, [obj for obj, model in elaborator.nodes])
+
+class ParallelElaborator(Elaborator):
+    """
+    Elaborator that builds the subtree under each submodule of the top in a
+    pool of 'jobs' worker processes (default: one per CPU). Sibling subtrees
+    do not depend on each other, so they are built concurrently; each worker
+    returns its subtree pickled, and it is loaded back into the submodule
+    object of the parent. The graph is then walked as usual, without building
+    anything twice, so the result is the same as with Elaborator.
+    """
+
+    def __init__(self, jobs=None):
+        Elaborator.__init__(self)
+        self.jobs = jobs or multiprocessing.cpu_count()
+        self.built = set() # ids of the objects built by the workers
+
+    def elaborate(self, obj, model, built=False):
+        if not built:
+            self.make(obj, model)
+
+        roots = []
+        seen = set()
+        for child in self.instantiated(obj, model):
+            # Interfaces are cheaper to build than to send back
+            if isinstance(child, min.Module) and id(child) not in seen:
+                seen.add(id(child))
+                roots.append(child)
+        if roots:
+            self.elaborate_subtrees(roots, model)
+
+        return Elaborator.elaborate(self, obj, model, built=True)
+
+    def elaborate_subtrees(self, roots, model):
+        global _subtrees
+        _subtrees = [(root, model) for root in roots]
+
+        pool = multiprocessing.Pool(self.jobs)
+        try:
+            chunksize = len(roots) // (self.jobs * 4) + 1
+            results = pool.imap(_elaborate_subtree, range(len(roots)),
+                                chunksize)
+            for root, data in zip(roots, results):
+                for obj in load_subtree(root, data):
+                    self.built.add(id(obj))
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+            _subtrees = []
+
+    def make(self, obj, model):
+        if id(obj) not in self.built:
+            Elaborator.make(self, obj, model)
+
+#-------------------------------------------------------------------------------
+def instance_name(inst):
+    return inst.formatted_repr(fmt0="{name}", fmt1="{name}{index}")
+
+class IncrementalElaborator(Elaborator):
+    """
+    Elaborator that reuses what it can of 'previous', an earlier
+    IncrementalElaborator of the same top and model, after the python
+    modules named in 'changed' were re-imported. An object must be built
+    again if its class (or a base) comes from a changed module, or if
+    anything under it must, since its model may depend on its children.
+    Every other subtree is taken from 'previous' as is: the new instance at
+    the same path is pointed at the old object, which is not built again.
+    Only the class of each object is checked: a model that calls into a
+    changed module through a plain function is not noticed.
+    """
+
+    def __init__(self, previous=None, changed=()):
+        Elaborator.__init__(self)
+        self.paths = {}     # id(obj) -> instance names from the top
+        self.built = set()  # ids of the objects taken from 'previous'
+        self.reusable = {}  # path -> clean object of 'previous'
+        if previous is not None:
+            self.reusable = previous.clean_objects(set(changed))
+
+    def elaborate(self, obj, model, built=False):
+        self.paths[id(obj)] = ()
+        return Elaborator.elaborate(self, obj, model, built)
+
+    def instances(self, obj, model):
+        path = self.paths[id(obj)]
+        pairs = []
+        for inst, child in Elaborator.instances(self, obj, model):
+            child_path = path + (instance_name(inst),)
+            old = self.reusable.get(child_path)
+            if old is not None and type(old) is type(child):
+                if isinstance(old, min.Module):
+                    inst.module = old
+                else:
+                    inst.interface = old
+                child = old
+                self.built.add(id(child))
+            self.paths[id(child)] = child_path
+            pairs.append((inst, child))
+        return pairs
+
+    def make(self, obj, model):
+        if id(obj) not in self.built:
+            Elaborator.make(self, obj, model)
+
+    def clean_objects(self, changed):
+        """
+        Return path -> object for the objects that a change to the python
+        modules 'changed' leaves as they are
+        """
+        dirty = set()
+        # Breadth first order, reversed: children come before their parents
+        for obj, model in reversed(self.nodes):
+            key = self.key(obj, model)
+            if (any(cls.__module__ in changed for cls in type(obj).__mro__) or
+                    any(self.key(*child) in dirty
+                        for child in self.children[key])):
+                dirty.add(key)
+        return dict((self.paths[id(obj)], obj) for obj, model in self.nodes
+                    if self.key(obj, model) not in dirty)
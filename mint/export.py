@@ -0,0 +1,162 @@
+#-------------------------------------------------------------------------------
+import array
+import collections
+
+import min
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#-------------------------------------------------------------------------------
+ARRAYS = ('inst_module', 'inst_ptr',
+          'pin_inst', 'pin_port', 'pin_dir', 'pin_net',
+          'net_width', 'net_lsb', 'net_wire', 'net_isport', 'net_ptr',
+          'net_pins')
+
+TABLES = ('inst_names', 'module_names', 'port_names', 'net_names',
+          'wire_names')
+
+class StringTable(object):
+    """ Strings numbered in order of first appearance """
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def id(self, string):
+        try:
+            return self.ids[string]
+        except KeyError:
+            self.ids[string] = len(self.strings)
+            self.strings.append(string)
+            return self.ids[string]
+
+#-------------------------------------------------------------------------------
+class Connectivity(object):
+    """
+    Connectivity of one elaborated module as typed arrays (array.array, or
+    numpy arrays through to_numpy) and string tables. Instances and nets are
+    numbered from 0; a pin is one (instance, port, net) connection, and pins
+    to concatenations give one pin per concatenated net (constants have none).
+    With 'ports', the port instance of the module (named after the model
+    argument, of module '_port_') is numbered first, like any instance.
+    - inst_module[i] = module_names id of instance i
+    - inst_ptr = CSR row pointers: pins of instance i are
+                 inst_ptr[i]:inst_ptr[i+1], in emission order
+    - pin_inst, pin_port (port_names id), pin_dir (min.Dir code), pin_net
+    - net_width[n], net_lsb[n] = bits of net n (a wire or a slice of it)
+    - net_wire[n] = wire_names id of the wire that net n is (a slice of)
+    - net_isport[n] = 1 if net n is a port of the module
+    - net_ptr = CSR row pointers: pins of net n are
+                net_pins[net_ptr[n]:net_ptr[n+1]], in pin order
+    """
+
+    def __init__(self, mod, ports=False):
+        inst_table = StringTable()
+        module_table = StringTable()
+        port_table = StringTable()
+        net_table = StringTable()
+        wire_table = StringTable()
+
+        for name in ARRAYS:
+            typecode = 'b' if name in ('pin_dir', 'net_isport') else 'i'
+            setattr(self, name, array.array(typecode))
+
+        port_nets = set()
+        for mod_inst in mod.module_instances.values():
+            if mod_inst.isport:
+                for pin in mod_inst.get_pins():
+                    port_nets.add(pin.net.fname)
+
+        self.inst_ptr.append(0)
+        insts = [inst for inst in mod.get_module_instances(flatten=True)
+                 if not inst.isport]
+        if ports:
+            insts[:0] = [inst for inst in mod.module_instances.values()
+                         if inst.isport]
+        for inst in insts:
+            inst_name = inst.formatted_repr(fmt0="{name}", fmt1="{name}{index}")
+            inst_id = inst_table.id(inst_name)
+            self.inst_module.append(module_table.id(inst.module.name))
+
+            for pin in inst.get_pins():
+                if isinstance(pin.net, min.Const):
+                    continue
+                if isinstance(pin.net, min.Concat):
+                    wires = pin.net.wires
+                else:
+                    wires = [pin.net]
+
+                port_id = port_table.id(pin.fname)
+                for wire in wires:
+                    net_name = wire.formatted_repr()
+                    net_id = net_table.id(net_name)
+                    if net_id == len(self.net_width):
+                        self.net_width.append(len(wire))
+                        self.net_lsb.append(wire.indices[0]
+                                            if wire.indices else 0)
+                        self.net_wire.append(wire_table.id(wire.parent.fname))
+                        self.net_isport.append(int(wire.fname in port_nets))
+
+                    self.pin_inst.append(inst_id)
+                    self.pin_port.append(port_id)
+                    self.pin_dir.append(pin.dir)
+                    self.pin_net.append(net_id)
+
+            self.inst_ptr.append(len(self.pin_net))
+
+        # net -> pins CSR, by counting sort of the pins on their net
+        counts = [0] * (len(net_table.strings) + 1)
+        for net_id in self.pin_net:
+            counts[net_id + 1] += 1
+        for i in xrange(1, len(counts)):
+            counts[i] += counts[i - 1]
+        self.net_ptr = array.array('i', counts)
+
+        fill = counts[:-1]
+        net_pins = [0] * len(self.pin_net)
+        for pin_id, net_id in enumerate(self.pin_net):
+            net_pins[fill[net_id]] = pin_id
+            fill[net_id] += 1
+        self.net_pins = array.array('i', net_pins)
+
+        self.inst_names = inst_table.strings
+        self.module_names = module_table.strings
+        self.port_names = port_table.strings
+        self.net_names = net_table.strings
+        self.wire_names = wire_table.strings
+
+    @property
+    def num_insts(self):
+        return len(self.inst_module)
+
+    @property
+    def num_nets(self):
+        return len(self.net_width)
+
+    @property
+    def num_pins(self):
+        return len(self.pin_net)
+
+    def arrays(self):
+        """ Return the typed arrays by name """
+        return collections.OrderedDict((name, getattr(self, name))
+                                       for name in ARRAYS)
+
+    def tables(self):
+        """ Return the string tables by name """
+        return collections.OrderedDict((name, getattr(self, name))
+                                       for name in TABLES)
+
+    def to_numpy(self):
+        """ Return the arrays by name as numpy arrays sharing their memory """
+        if numpy is None:
+            raise ImportError("numpy is required for Connectivity.to_numpy")
+        return collections.OrderedDict(
+            (name, numpy.frombuffer(arr, dtype=arr.typecode))
+            for name, arr in self.arrays().items())
+
+def connectivity(mod, ports=False):
+    """ Return the Connectivity of the elaborated module object 'mod' """
+    return Connectivity(mod, ports)
@@ -1,15 +1,21 @@
 #-------------------------------------------------------------------------------
 import collections
+import cStringIO
+import os
+import shutil
 import sys
 import re
+import tempfile
 
 import min
+import output
 
 #-------------------------------------------------------------------------------
 class Registry(object):
     Entry = collections.namedtuple('Entry', 'obj, type')
     _registry = collections.OrderedDict()
     _auto_enabled = {}
+    _auto_created = {}
 
     #def __init__(self):
     #    Registry._registry = collections.OrderedDict()
@@ -53,7 +59,14 @@ class Registry(object):
                 #                                                   obj_type))
                 # Auto create, and register
                 #obj = obj_type(obj_name)
+                # Reuse auto created classes, each new class is a cycle for GC
+                key = (obj_name, obj_type)
+                try:
+                    return cls._auto_created[key]
+                except KeyError:
+                    pass
                 obj = type(obj_name, (obj_type,), {})
+                cls._auto_created[key] = obj
                 #TODO: maybe we should not be registering autocreated classes?
                 #cls.register(obj, obj_name, obj_type)
                 return obj
@@ -91,8 +104,19 @@ class Registry(object):
     def clear(cls):
         cls._registry = collections.OrderedDict()
         cls._auto_enabled = {}
+        cls._auto_created = {}
 
 #-------------------------------------------------------------------------------
+def array_shape(indices):
+    """ Return the shape of an array given the indices of each dimension """
+    return tuple(len(dim_indices) for dim_indices in indices)
+
+def array_size(shape):
+    size = 1
+    for n in shape:
+        size *= n
+    return size
+
 class InstGen(object):
     def __init__(self, scalar_type, vector_type, instof_type=None):
         self.scalar_type = scalar_type
@@ -123,11 +147,11 @@ class InstGen(object):
         else:
             indices = tuple(key)
 
+        # One entry per dimension: instance[4][8] is a 4x8 array
         if self.indices is None:
-            self.indices = indices
+            self.indices = [indices]
         else:
-            # FIXME: how should multiple dimensions work?
-            self.indices = (self.indices, indices)
+            self.indices.append(indices)
 
         #print 'InstGen:', key, self.indices
         return  self
@@ -143,9 +167,11 @@ class InstGen(object):
             #                               args, kwargs)
             return self.scalar_type(*args, **kwargs)
         else:
-            vector = [self.scalar_type() for i in indices]
+            shape = array_shape(indices)
+            vector = [self.scalar_type() for i in xrange(array_size(shape))]
             #print "InstGen: %s(%s, %s, %s)" % (self.vector_type.__name__,
             #                                   vector, args, kwargs)
+            kwargs['shape'] = shape
             return self.vector_type(vector, *args, **kwargs)
 
 
@@ -174,9 +200,11 @@ class InstGen(object):
             #                               obj_name)
             return self.scalar_type(obj_class())
         else:
-            vector = [self.scalar_type(obj_class()) for i in indices]
+            shape = array_shape(indices)
+            vector = [self.scalar_type(obj_class())
+                      for i in xrange(array_size(shape))]
             #print "InstGen: %s(%s)" % (self.vector_type.__name__, vector)
-            return self.vector_type(vector)
+            return self.vector_type(vector, shape=shape)
 
 class ModportWireGen(object):
     def __init__(self, scalar_type, vector_type):
@@ -251,6 +279,10 @@ class WireGen(object):
     def __call__(self, *args, **kwargs):
         return min.Wire(*args, **kwargs)
 
+    def bundle(self, signals):
+        """ Return the wires of 'signals' (see min.wire_bundle) """
+        return min.wire_bundle(signals)
+
     def __getitem__(self, key):
         indices = ()
 
@@ -273,20 +305,25 @@ class WireGen(object):
             return min.Wire(indices=tuple(key))
 
 #-------------------------------------------------------------------------------
+def column_width(fields, minimum=0):
+    """ Return the length of the longest field, but at least 'minimum' """
+    width = minimum
+    for field in fields:
+        if len(field) > width:
+            width = len(field)
+    return width
+
 class VerilogGenerator(object):
-    def __init__(self, module):
+    def __init__(self, module, out=None):
         self.module = module
+        self.out = out if out is not None else sys.stdout
         self.port_pins = None
+        self.profile = None # memprof.MemoryProfile
         self.reset_indent()
         self.cursor = 0
 
     def invert_dir(self, dir):
-        if dir == 'input':
-            return 'output'
-        elif dir == 'output':
-            return 'input'
-        else:
-            return dir
+        return min.Dir.INVERSE[dir]
 
     def reset_indent(self):
         self.indent_stack = []
@@ -294,7 +331,7 @@ class VerilogGenerator(object):
         self.new_line = True
 
     def next_line(self):
-        print
+        self.out.write('\n')
         self.cursor = 0
         self.new_line = True
 
@@ -316,13 +353,25 @@ class VerilogGenerator(object):
         else:
             prefix = space
 
-        sys.stdout.write(prefix + string)
+        self.out.write(prefix + string)
         self.cursor += len(prefix + string)
 
     def emitln(self, string, space=' '):
         self.emit(string, space)
         self.next_line()
 
+    def write_row(self, row, desc=None, desc_col=0):
+        """ Write a preformatted line, with optional description at desc_col """
+        row = ' ' * self.indent_pos + row
+        if desc is not None:
+            lines = re.split(r"\n", desc)
+            row = row.ljust(desc_col) + '// ' + lines[0]
+            for line in lines[1:]:
+                row += '\n' + ' ' * desc_col + '// ' + line
+        self.out.write(row + '\n')
+        self.cursor = 0
+        self.new_line = True
+
     def advance_cursor(self, by=1, to=None):
         if to is None:
             to = self.cursor + by;
@@ -332,12 +381,113 @@ class VerilogGenerator(object):
         self.emit(' ' * (to - self.cursor), space='')
         self.cursor = to
 
-    def generate_module(self, outtype=None, autos=False):
+    def generate_module(self, outtype=None, autos=False, stream=False,
+                        elaborate=None):
+        if stream:
+            self.generate_module_streaming(outtype, autos, elaborate)
+            self.mark_phase('stream')
+            return
+
         self.reset_indent()
         self.generate_header(outtype, autos)
+        self.mark_phase('ports')
         self.generate_wires()
+        self.mark_phase('wires')
         self.generate_instances(autos)
         self.generate_trailer()
+        self.mark_phase('instances')
+
+    def mark_phase(self, phase):
+        """ Snapshot memory at the end of 'phase', when profiling """
+        if self.profile is not None:
+            self.profile.mark(phase)
+
+    def profile_pins(self, insts):
+        """
+        Snapshot memory with the pins of all of 'insts' expanded (IntfPins
+        and bulk binds) as the 'intfpins' phase. The pins are dropped again:
+        expanding an IntfPin renames the shared modport pins in place, so
+        each instance is expanded anew right before its pins are used.
+        """
+        pins = [self.instance_pins(inst) for inst in insts]
+        self.mark_phase('intfpins')
+        del pins
+
+    def begin_section(self, name):
+        """
+        Start a section of the module body ('wires' or 'instances'), which
+        outputs that split modules across files (output.SplitOutput) put in
+        `include files of their own
+        """
+        section = getattr(self.out, 'section', None)
+        if section is not None:
+            section(name)
+
+    def boundary(self):
+        """ Mark a point between declarations/instances of a section """
+        boundary = getattr(self.out, 'boundary', None)
+        if boundary is not None:
+            boundary()
+
+    def end_section(self):
+        end_section = getattr(self.out, 'end_section', None)
+        if end_section is not None:
+            end_section()
+
+    def generate_module_streaming(self, outtype=None, autos=False,
+                                  elaborate=None):
+        """
+        Generate the module in a single pass over the instances. Each port
+        map is written to a spool file as soon as it is formatted, then the
+        instance's pins and elaborated submodule are released. Only the wire
+        declarations are kept until the end, when they are written ahead of
+        the spooled instances. 'elaborate', if given, is called with each
+        instance just before it is emitted, so submodules can be built one
+        at a time.
+        What this bounds is the elaborated hierarchy under the top (one
+        submodule subtree at a time) and the pins of bulk binds (connect and
+        instance list binds), which are expanded per instance. The top
+        model has run already: the pins it bound one by one and its nets
+        all exist up front, so memory still grows with those.
+        The output is the same as generate_module, but the module is
+        consumed: it cannot be generated again.
+        """
+        if hasattr(self.out, 'section'):
+            raise min.MintError("streaming into a split output is not "
+                                "supported")
+
+        self.reset_indent()
+        self.generate_header(outtype, autos)
+
+        out = self.out
+        spool = tempfile.TemporaryFile()
+        self.out = spool
+        try:
+            self.reset_wires()
+            for inst in self.module.get_module_instances(flatten=True):
+                if inst is self.port_inst: continue
+                if elaborate is not None:
+                    elaborate(inst)
+                pins = self.instance_pins(inst)
+                self.collect_wires(pins)
+                self.generate_instance(inst, autos, pins)
+                del pins
+                self.release_instance(inst)
+        finally:
+            self.out = out
+
+        self.generate_declarations()
+        spool.seek(0)
+        shutil.copyfileobj(spool, out)
+        spool.close()
+        self.generate_trailer()
+
+    def release_instance(self, inst):
+        """ Drop the pins and elaborated contents of an emitted instance """
+        inst.pins = []
+        inst.intfpins = []
+        inst.module.module_instances = min.OrderedTable()
+        inst.module.interface_instances = min.OrderedTable()
 
     def generate_header(self, outtype=None, autos=False):
         self.emit('module')
@@ -370,113 +520,133 @@ class VerilogGenerator(object):
 
         port_pins = self.port_inst.get_pins()
 
-        uniq_port_pins = collections.OrderedDict()
+        uniq_port_pins = min.OrderedTable()
         for pin in port_pins:
             uniq_port_pins[pin.net.fname] = pin
 
         # save for use in wires later
         self.port_pins = uniq_port_pins.values()
 
-        if len(self.port_pins) == 0:
-            return
-
-        self.emit(' ')
-        self.generate_port(self.port_pins[0], outtype)
-
-        for pin in self.port_pins[1:]:
-            self.emit(',')
-            self.generate_port(pin, outtype)
+        rows = [self.port_row(pin, outtype) for pin in self.port_pins]
+        self.generate_port_rows(rows)
 
-
-    def generate_port(self, pin, outtype=None):
-        pin_dir = self.invert_dir(pin.dir)
-        self.emit(pin_dir.ljust(6))
+    def port_row(self, pin, outtype=None):
+        """ Return (dir, type, index, name, desc) of a module port """
+        pin_dir = pin.effective_dir
 
         # outtype = logic | reg | None (wire)
-        if pin_dir == 'output' and outtype is not None:
-            self.emit(outtype.ljust(5))
+        if pin_dir == min.Dir.O and outtype is not None:
+            pin_type = outtype
         else:
-            self.emit(' ' * 5)
+            pin_type = ''
 
         index = pin.net.parent.formatted_repr(fmt0='',
                                               fmt1='[{msb}:{lsb}]',
                                               fmt2='[{msb}:{lsb}]')
 
-        self.advance_cursor(to=16)
-        self.emit(index.rjust(6), space='')
+        return (min.Dir.NAMES[pin_dir], pin_type, index, pin.net.fname,
+                getattr(pin.net, 'desc', None))
 
-        self.advance_cursor(to=24)
-        self.emit(pin.net.fname, space='')
+    def generate_port_rows(self, rows):
+        """ Write port declarations with columns sized to fit all the rows """
+        index_width = column_width([row[2] for row in rows], 6)
+        name_width = column_width([row[3] for row in rows], 24)
+        desc_col = 18 + index_width + name_width
 
-        if hasattr(pin.net, 'desc'):
-            self.generate_desc(pin.net.desc, col=48)
-        else:
-            self.next_line()
+        fmt = '{0} {1:<6} {2:<5}  {3:>{index_width}}  {4}'
+        sep = ' '
+        for pin_dir, pin_type, index, name, desc in rows:
+            row = fmt.format(sep, pin_dir, pin_type, index, name,
+                             index_width=index_width)
+            self.write_row(row, desc, desc_col)
+            sep = ','
 
     def generate_wires(self):
-        wire_list = []
-
-        wires_by_intf = collections.OrderedDict() # wires grouped by intf
-        wires_all = {} # for uniquifiying
-
-        port_wires = [] # wires connected to module ports
-        for port_pin in self.port_pins:
-            port_wires.append(port_pin.net.fname)
-
-        for mod_inst in self.module.get_module_instances(flatten=True):
-            if mod_inst is self.port_inst: continue
-
-            pins = mod_inst.get_pins()
-
-            for pin in pins:
-                if isinstance(pin.net, min.Const):    # skip constants
-                    continue
+        insts = [mod_inst for mod_inst in
+                 self.module.get_module_instances(flatten=True)
+                 if mod_inst is not self.port_inst]
+        if self.profile is not None:
+            self.profile_pins(insts)
+
+        self.reset_wires()
+        for mod_inst in insts:
+            self.collect_wires(self.instance_pins(mod_inst))
+
+        self.begin_section('wires')
+        self.generate_declarations()
+        self.end_section()
+
+    def generate_declarations(self):
+        """ Write the declarations of the collected wires """
+        self.generate_wire_rows(self.wire_rows())
+
+    def reset_wires(self):
+        self.wires_by_intf = min.OrderedTable() # wire rows grouped by intf
+        self.wires_all = set() # for uniquifiying
+
+        # wires connected to module ports
+        self.port_wires = set(port_pin.net.fname for port_pin in self.port_pins)
+
+    def collect_wires(self, pins):
+        """ Add the wires of 'pins' not seen before to the declarations """
+        for pin in pins:
+            if isinstance(pin.net, min.Const):    # skip constants
+                continue
+
+            if isinstance(pin.net, min.Concat):
+                wires = pin.net.wires
+            else:
+                wires = [pin.net]
 
-                if isinstance(pin.net, min.Concat):
-                    wires = pin.net.wires
-                else:
-                    wires = [pin.net]
-
-                for wire in wires:
-                    if wire.fname in port_wires:    # skip module ports
-                        continue
-
-                    if wire.fname not in wires_all:
-                        wires_all[wire.fname] = True
-                        if pin.intfinst in wires_by_intf:
-                            wires_by_intf[pin.intfinst] += [wire]
-                        else:
-                            wires_by_intf[pin.intfinst] = [wire]
-
-        for intfinst_name, wires in wires_by_intf.items():
-            #self.next_line()
-            #self.emit('//')
-            #self.emitln(intfinst_name)
             for wire in wires:
-                self.generate_wire(wire)
-
-    def generate_wire(self, wire):
-        self.emit('wire'.ljust(10))
+                fname = wire.fname
+                if fname in self.port_wires:    # skip module ports
+                    continue
 
+                if fname not in self.wires_all:
+                    self.wires_all.add(fname)
+                    row = self.wire_row(wire)
+                    if pin.intfinst in self.wires_by_intf:
+                        self.wires_by_intf[pin.intfinst].append(row)
+                    else:
+                        self.wires_by_intf[pin.intfinst] = [row]
+
+    def wire_rows(self):
+        rows = []
+        for intfinst_name, intf_rows in self.wires_by_intf.items():
+            rows += intf_rows
+        return rows
+
+    def wire_row(self, wire):
+        """ Return (index, name, desc) of a wire declaration """
         index = wire.parent.formatted_repr(fmt0='', fmt1='', fmt2='[{index}]')
-        self.advance_cursor(to=16)
-        self.emit(index.rjust(6), space='')
+        return (index, wire.fname + ';', getattr(wire, 'desc', None))
 
-        self.advance_cursor(to=24)
-        self.emit(wire.fname, space='')
-        self.emit(';', space='')
+    def generate_wire_rows(self, rows, net_type='wire'):
+        """ Write wire declarations with columns sized to fit all the rows """
+        self.generate_decl_rows([(net_type,) + tuple(row) for row in rows])
 
-        if hasattr(wire, 'desc'):
-            self.generate_desc(wire.desc, col=48)
-        else:
-            self.next_line()
+    def generate_decl_rows(self, rows):
+        """ Write (type, index, name, desc) declarations, in columns """
+        index_width = column_width([row[1] for row in rows], 6)
+        name_width = column_width([row[2] for row in rows], 24)
+        desc_col = 18 + index_width + name_width
+
+        fmt = '{0:<16}{1:>{index_width}}  {2}'
+        for decl_type, index, name, desc in rows:
+            row = fmt.format(decl_type, index, name, index_width=index_width)
+            self.write_row(row, desc, desc_col)
+            self.boundary()
 
     def generate_instances(self, autos=False):
+        self.begin_section('instances')
         for inst in self.module.get_module_instances(flatten=True):
             if inst is self.port_inst: continue
             self.generate_instance(inst, autos)
+            self.boundary()
+        self.end_section()
 
-    def generate_instance(self, inst, autos=False):
+    def generate_instance(self, inst, autos=False, pins=None):
         self.next_line()
 
         if hasattr(inst, 'desc'):
@@ -485,9 +655,11 @@ class VerilogGenerator(object):
         self.emit(inst.module.name)
         self.emit(inst.formatted_repr(fmt0="{name}", fmt1="{name}{index}"))
 
-        pins = inst.get_pins()
+        if pins is None:
+            pins = self.instance_pins(inst)
+        rows = self.portmap_rows(inst, pins)
 
-        if len(pins) == 0:
+        if len(rows) == 0:
             self.emitln('();')
             return
 
@@ -495,89 +667,298 @@ class VerilogGenerator(object):
         self.next_line()
         self.indent()
 
-        self.generate_portmap(pins[0])
-
-        for pin in pins[1:]:
-            self.emitln(',', space='')
-            self.generate_portmap(pin)
+        self.generate_portmap_rows(rows)
 
-        self.next_line()
         if autos == True:
             self.emitln('/*AUTOINST*/')
 
         self.emitln(');', space='')
         self.dedent()
 
-    def generate_portmap(self, pin):
-        self.emit('.')
-        self.emit(pin.fname.ljust(24), space='')
-        self.emit('(')
-        self.emit(pin.net.formatted_repr().ljust(24))
-        self.emit(')')
+    def instance_pins(self, inst):
+        """ Return the pins of 'inst' whose nets are declared in the module """
+        return inst.get_pins()
+
+    def portmap_rows(self, inst, pins):
+        """ Return the (port, net) connections of 'inst' """
+        return [self.portmap_row(pin) for pin in pins]
+
+    def portmap_row(self, pin):
+        """ Return (port, net) of an instance port connection """
+        return (pin.fname, pin.net.formatted_repr())
+
+    def generate_portmap_rows(self, rows):
+        """ Write port connections with columns sized to fit all the rows """
+        port_width = column_width([row[0] for row in rows], 24)
+        net_width = column_width([row[1] for row in rows], 24)
+
+        fmt = '.{0:<{port_width}} ( {1:<{net_width}} ){2}'
+        last = len(rows) - 1
+        for i, (port, net) in enumerate(rows):
+            row = fmt.format(port, net, ',' if i < last else '',
+                             port_width=port_width, net_width=net_width)
+            self.write_row(row)
 
     def generate_submodules(self, submodname=None, instname=None, outtype=None):
+        """ Write one stub per submodule (see collect_submodules) """
+        stubs = self.collect_submodules(submodname, instname, outtype)
+        for name, rows in stubs.items():
+            self.generate_stub(name, rows)
+
+    def generate_submodule_files(self, directory, submodname=None,
+                                 instname=None, outtype=None, stats=None,
+                                 jobs=1):
+        """
+        Write one stub per submodule to '<directory>/<name>.v', in one pass,
+        and return the paths. Each stub is handed to 'jobs' writer threads
+        as soon as it is formatted (see output.ConcurrentWriter), and files
+        whose content is unchanged are left alone.
+        """
+        stubs = self.collect_submodules(submodname, instname, outtype)
+        paths = []
+        out = self.out
+        try:
+            with output.ConcurrentWriter(jobs, stats) as writer:
+                for name, rows in stubs.items():
+                    self.out = cStringIO.StringIO()
+                    self.generate_stub(name, rows)
+                    path = os.path.join(directory, name + '.v')
+                    writer.submit(path, self.out.getvalue())
+                    paths.append(path)
+        finally:
+            self.out = out
+        return paths
+
+    def collect_submodules(self, submodname=None, instname=None, outtype=None):
+        """
+        Return an OrderedTable of submodule name -> stub port rows, in order
+        of first instance. All instances of a submodule must resolve to the
+        same ports (name, direction, type and width), otherwise MintError
+        lists the instances that differ from the first one.
+        """
         insts = [inst for inst in self.module.get_module_instances(flatten=True)
                  if not inst.isport if instname in (None, inst.name)]
 
         if instname is None:
             insts = [inst for inst in insts
                      if submodname in (None, inst.module.name)]
-        if insts:
-            for inst in insts:
-                self.generate_submodule(inst, outtype)
-        elif instname is not None:
-            raise min.MintError("Instance '%s' not found." % instname)
-        elif submodname is not None:
-            raise min.MintError("Submodule '%s' not found." % submodname)
+        if not insts:
+            if instname is not None:
+                raise min.MintError("Instance '%s' not found." % instname)
+            elif submodname is not None:
+                raise min.MintError("Submodule '%s' not found." % submodname)
+
+        stubs = min.OrderedTable()
+        signatures = {} # name -> (signature, instance name) of the first
+        conflicts = []
+        for inst in insts:
+            name = inst.module.name
+            rows = self.submodule_port_rows(inst, outtype)
+            signature = tuple(row[:4] for row in rows)
+            inst_name = inst.formatted_repr(fmt0="{name}", fmt1="{name}{index}")
+            if name not in signatures:
+                signatures[name] = (signature, inst_name)
+                stubs[name] = rows
+            elif signatures[name][0] != signature:
+                conflicts.append("Submodule '%s': ports of instance '%s' differ "
+                                 "from instance '%s'." %
+                                 (name, inst_name, signatures[name][1]))
+
+        if conflicts:
+            raise min.MintError('\n'.join(conflicts))
+        return stubs
 
     def generate_submodule(self, inst, outtype=None):
-        submodule = inst.module
+        self.generate_stub(inst.module.name,
+                           self.submodule_port_rows(inst, outtype))
 
+    def generate_stub(self, name, rows):
+        """ Write an empty module 'name' with the port rows 'rows' """
         self.reset_indent()
         self.emit('module')
-        self.emit(submodule.name)
+        self.emit(name)
         self.emitln('(')
-        self.generate_submodule_ports(inst, outtype)
+        self.generate_port_rows(rows)
         self.emitln(');')
         self.generate_trailer()
 
     def generate_submodule_ports(self, inst, outtype=None):
-        pins = inst.get_pins()
-        if len(pins) == 0:
-            return
-
-        self.emit(' ')
-        self.generate_submodule_port(pins[0], outtype)
+        self.generate_port_rows(self.submodule_port_rows(inst, outtype))
 
-        for pin in pins[1:]:
-            self.emit(',')
-            self.generate_submodule_port(pin, outtype)
+    def submodule_port_rows(self, inst, outtype=None):
+        return [self.submodule_port_row(pin, outtype) for pin in inst.get_pins()]
 
-    def generate_submodule_port(self, pin, outtype=None):
-        pin_dir = pin.dir
-        self.emit(pin_dir.ljust(6))
+    def submodule_port_row(self, pin, outtype=None):
+        """ Return (dir, type, index, name, desc) of a submodule port """
+        pin_dir = pin.effective_dir
 
         # outtype = logic | reg | None (wire)
-        if pin_dir == 'output' and outtype is not None:
-            self.emit(outtype.ljust(5))
+        if pin_dir == min.Dir.O and outtype is not None:
+            pin_type = outtype
         else:
-            self.emit(' ' * 5)
+            pin_type = ''
 
         size = len(pin.net)
         if size > 1:
             index = '[%s:%s]' % (size - 1, 0)
         else:
             index = ''
-        self.advance_cursor(to=16)
-        self.emit(index.rjust(6), space='')
 
-        self.advance_cursor(to=24)
-        self.emit(pin.fname, space='')
+        return (min.Dir.NAMES[pin_dir], pin_type, index, pin.fname,
+                getattr(pin.net, 'desc', None))
 
-        if hasattr(pin.net, 'desc'):
-            self.generate_desc(pin.net.desc, col=48)
-        else:
+#-------------------------------------------------------------------------------
+def is_identifier(name):
+    return re.match(r'[A-Za-z_]\w*$', name) is not None
+
+class SystemVerilogGenerator(VerilogGenerator):
+    """
+    SystemVerilog generator that keeps interfaces whole instead of flattening
+    them into a port and a wire per signal. Interface instances are declared
+    once (or are interface ports, if bound to the module ports) and instances
+    connect to them through a modport. Interface binds with a direction
+    filter select part of a modport only, so their signals are still mapped
+    one by one, as references into the interface instance.
+    """
+
+    # Modport member directions by code: undirected members are inouts
+    MODPORT_DIRS = ('input', 'output', 'inout', 'inout')
+
+    def generate_interfaces(self):
+        """ Write the definitions of the interfaces used in the module """
+        done = set()
+        for intf_inst in self.module.get_interface_instances(flatten=True):
+            interface = intf_inst.interface
+            if interface.name not in done:
+                done.add(interface.name)
+                self.generate_interface(interface)
+
+    def generate_interface(self, interface):
+        self.reset_indent()
+        self.emit('interface')
+        self.emitln(interface.name + ';')
+        self.indent()
+
+        modports = min.OrderedTable()
+        signals = min.OrderedTable()
+        for modport_name in interface.port_at_pos:
+            modport = interface.module_instances[modport_name]
+            members = min.OrderedTable()
+            # Modport members take the direction they were bound with, as
+            # seen by the modules connected through the modport
+            for pin in modport.get_pins():
+                wire = pin.net.parent
+                index = wire.formatted_repr(fmt0='', fmt1='', fmt2='[{index}]')
+                signals.setdefault(wire.name, (index, wire.name + ';',
+                                               getattr(wire, 'desc', None)))
+                members[wire.name] = self.MODPORT_DIRS[pin.dir]
+            modports[modport_name] = members
+
+        self.generate_wire_rows(signals.values(), net_type='logic')
+        for modport_name, members in modports.items():
             self.next_line()
+            self.emitln('modport %s (' % modport_name)
+            self.indent()
+            last = len(members) - 1
+            for i, (name, dir) in enumerate(members.items()):
+                self.write_row('%-6s %s%s' % (dir, name, ',' if i < last else ''))
+            self.dedent()
+            self.emitln(');')
+
+        self.dedent()
+        self.emitln('endinterface')
+        self.next_line()
+
+    #---------------------------------------------------------------------------
+    def intf_name(self, intfinst):
+        return intfinst.formatted_repr(fmt0="{name}", fmt1="{name}{index}")
+
+    def modport_name(self, intfpin):
+        if isinstance(intfpin.modport, int):
+            return intfpin.intfinst.interface.port_at_pos[intfpin.modport]
+        return intfpin.modport
+
+    def intf_port_name(self, intfpin, used):
+        """
+        Return the port name for a whole interface: the pin template without
+        the signal name, as the flattened ports are named. If that leaves no
+        name (e.g. with template '{n}'), it is the interface instance name
+        without the lane index, so that every instance of a module gets the
+        same port; the lane index is only added when an instance has several
+        lanes of the interface.
+        """
+        intfinst = intfpin.intfinst
+        I = self.intf_name(intfinst)
+        k = intfinst.formatted_repr(fmt0="", fmt1="{index}")
+        name = intfpin.template.format(i=intfinst.name, k=k, I=I, n='')
+        name = name.strip('_')
+        if not is_identifier(name) or name in used:
+            name = intfinst.name
+        if name in used:
+            name = I
+        used.add(name)
+        return name
+
+    def signal_ref(self, pin):
+        """ Return the reference to an interface signal of a flattened pin """
+        index = pin.net.formatted_repr(fmt0='', fmt1='[{index}]',
+                                       fmt2='[{index}]')
+        return '%s.%s%s' % (pin.intfinst, pin.net.name, index)
+
+    def generate_ports(self, outtype=None):
+        port_insts = [inst for inst in self.module.get_module_instances() if
+                     inst.isport]
+        assert len(port_insts) == 1
+        self.port_inst = port_insts[0]
+
+        intfpins, netpins = self.port_inst.get_bound_pins()
+
+        # Interfaces bound to the ports, even partly, are interface ports
+        self.port_intfs = min.OrderedTable()
+        for intfpin in intfpins:
+            self.port_intfs[self.intf_name(intfpin.intfinst)] = \
+                intfpin.intfinst.interface.name
+
+        uniq_port_pins = min.OrderedTable()
+        for pin in netpins:
+            uniq_port_pins[pin.net.fname] = pin
+
+        # save for use in wires later
+        self.port_pins = uniq_port_pins.values()
+
+        rows = [(intf_type, '', '', name, None)
+                for name, intf_type in self.port_intfs.items()]
+        rows += [self.port_row(pin, outtype) for pin in self.port_pins]
+        self.generate_port_rows(rows)
+
+    def generate_declarations(self):
+        rows = []
+        for intf_inst in self.module.get_interface_instances(flatten=True):
+            name = self.intf_name(intf_inst)
+            if name not in self.port_intfs:
+                rows.append((intf_inst.interface.name, '', name + '();',
+                             getattr(intf_inst, 'desc', None)))
+        if rows:
+            self.generate_decl_rows(rows)
+
+        VerilogGenerator.generate_declarations(self)
+
+    def instance_pins(self, inst):
+        return inst.get_bound_pins()[1]
+
+    def portmap_rows(self, inst, pins):
+        rows = []
+        used = set()
+        for intfpin in inst.get_bound_pins()[0]:
+            if intfpin.dir_filter == min.Dir.ANY:
+                rows.append((self.intf_port_name(intfpin, used),
+                             '%s.%s' % (self.intf_name(intfpin.intfinst),
+                                        self.modport_name(intfpin))))
+            else:
+                for pin in intfpin.get_pins():
+                    rows.append((pin.fname, self.signal_ref(pin)))
+        rows += [self.portmap_row(pin) for pin in pins]
+        return rows
 
 #-------------------------------------------------------------------------------
 if __name__ == '__main__':
@@ -0,0 +1,135 @@
+#-------------------------------------------------------------------------------
+import collections
+import gc
+import json
+import resource
+import sys
+
+import min
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+#-------------------------------------------------------------------------------
+FORMAT_VERSION = 1
+
+def _maxrss_kb():
+    """ Peak resident set size of this process so far, in kB """
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        maxrss //= 1024 # bytes there
+    return maxrss
+
+_min_classes = {} # type -> min class name or None
+
+def min_class(cls):
+    """ Return the name of the nearest class of module min in the MRO of 'cls' """
+    try:
+        return _min_classes[cls]
+    except KeyError:
+        name = None
+        for base in getattr(cls, '__mro__', ()):
+            if base.__module__ == min.__name__:
+                name = base.__name__
+                break
+        _min_classes[cls] = name
+        return name
+
+def object_counts():
+    """
+    Return a Counter of the live objects tracked by the GC by min class
+    (design modules count as Module, wires as Wire, etc.), and the total
+    number of objects tracked
+    """
+    counts = collections.Counter()
+    objects = gc.get_objects()
+    for obj in objects:
+        name = min_class(type(obj))
+        if name is not None:
+            counts[name] += 1
+    return counts, len(objects)
+
+class MemoryProfile(object):
+    """
+    Memory snapshots at phase boundaries (see VerilogGenerator.mark_phase).
+    Each phase records the peak RSS so far and the live objects per min
+    class. When tracemalloc is available, tracing runs from __enter__ to
+    __exit__ and each phase also records the traced memory and the 'top'
+    source lines that allocated the most during the phase.
+    """
+
+    def __init__(self, top=10, frames=1):
+        self.top = top
+        self.frames = frames
+        self.phases = []
+        self.snapshot = None
+
+    def __enter__(self):
+        if tracemalloc is not None:
+            tracemalloc.start(self.frames)
+            self.snapshot = self.take_snapshot()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if tracemalloc is not None:
+            self.snapshot = None
+            tracemalloc.stop()
+
+    def take_snapshot(self):
+        """ Return a tracemalloc snapshot, without tracemalloc's own memory """
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)])
+
+    def mark(self, phase):
+        """ Record the end of 'phase' """
+        counts, total = object_counts()
+        record = collections.OrderedDict()
+        record['phase'] = phase
+        record['maxrss_kb'] = _maxrss_kb()
+        record['gc_objects'] = total
+        record['objects'] = collections.OrderedDict(sorted(counts.items()))
+
+        if tracemalloc is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            record['traced_bytes'] = current
+            record['traced_peak_bytes'] = peak
+
+            snapshot = self.take_snapshot()
+            record['top'] = [
+                collections.OrderedDict([
+                    ('site', '%s:%d' % (stat.traceback[0].filename,
+                                        stat.traceback[0].lineno)),
+                    ('size_diff', stat.size_diff),
+                    ('count_diff', stat.count_diff),
+                    ('size', stat.size)])
+                for stat in snapshot.compare_to(self.snapshot,
+                                                'lineno')[:self.top]]
+            self.snapshot = snapshot
+
+        self.phases.append(record)
+
+    #---------------------------------------------------------------------------
+    def report(self):
+        report = collections.OrderedDict()
+        report['format'] = FORMAT_VERSION
+        report['tracemalloc'] = tracemalloc is not None
+        report['phases'] = self.phases
+        return report
+
+    def save(self, f):
+        """ Write the phases to the file object 'f' as JSON """
+        json.dump(self.report(), f, indent=2, separators=(',', ': '))
+        f.write('\n')
+
+    def format_summary(self):
+        """ Return one line per phase: peak RSS and the commonest objects """
+        lines = []
+        for record in self.phases:
+            objects = sorted(record['objects'].items(),
+                             key=lambda item: (-item[1], item[0]))[:3]
+            lines.append('%-10s %8d kB peak rss, %s' % (
+                record['phase'], record['maxrss_kb'],
+                ', '.join('%d %s' % (n, name) for name, n in objects)))
+        return ''.join(line + '\n' for line in lines)
@@ -3,8 +3,10 @@ import collections
 import copy
 import warnings
 import inspect
+import itertools
 import logging
 import math
+import weakref
 
 #-------------------------------------------------------------------------------
 class MintError(Exception): pass
@@ -15,10 +17,27 @@ class MintModelDoesNotExist(MintError): pass
 
 #-------------------------------------------------------------------------------
 class Dir:
-    I = 'input'
-    O = 'output'
-    IO = 'inout'
-    ANY = '_any_dir_'
+    """
+    Pin direction codes. Pins keep the code they were bound with; names are
+    only looked up (NAMES[code]) when emitting.
+    """
+    I = 0
+    O = 1
+    IO = 2
+    ANY = 3
+
+    NAMES = ('input', 'output', 'inout', '_any_dir_')
+
+    # Maps of codes to the direction seen from the same side, and from the
+    # other side (e.g. a module port from inside the module)
+    SAME = (I, O, IO, ANY)
+    INVERSE = (O, I, IO, ANY)
+
+class Map:
+    """ How the lanes of an instance list map onto a bulk bind target """
+    ONE_TO_ONE = 'one_to_one'   # lane i <-> target[i]
+    BROADCAST = 'broadcast'     # lane i <-> target
+    SLICE = 'slice'             # lane i <-> i-th equal bit slice of target
 
 class Default:
     port_dir = Dir.ANY
@@ -27,6 +46,10 @@ class Default:
     net_template = '{I}_{n}'
     net_template = '{I}_{n}'
 
+# Binds are numbered so that pins expanded from bulk bindings sort back into
+# the order the binds were made in
+_bind_order = itertools.count()
+
 #-------------------------------------------------------------------------------
 class Net(object):
     """ Base class for net types. """
@@ -70,17 +93,35 @@ class Wire(Net):
         - indices = tuple of indices, but size takes precedence if defined.
         - parent points to parent wire for slices.
         """
-        self._name = name
-
         if size is not None:
-            self.indices = tuple(range(size))
-        else:
-            self.indices = indices  # 'None' for scalar
+            indices = wire_indices(size)
+
+        self._init_state(name, indices, parent)
+
+    # Attributes set by _init_state; any others (desc, ...) are the user's
+    STATE = ('_name', 'indices', '_parent', 'template')
 
-        self.parent = parent or self
+    def _init_state(self, name, indices, parent, template="{name}"):
+        """
+        Set the attributes of a new wire. Shared by __init__ and the bulk
+        constructors (clones, wire_bundle), which skip __init__.
+        """
+        self._name = name
+        self.indices = indices  # 'None' for scalar
+        self.parent = parent
 
         # Template used for full/formatted name
-        self.template = "{name}"
+        self.template = template
+
+    @property
+    def parent(self):
+        return self._parent or self
+
+    @parent.setter
+    def parent(self, value):
+        # Root wires store None rather than a reference to themselves, which
+        # would make every wire a reference cycle
+        self._parent = None if value is self else value
 
     def __call__(self, name=None):
         """
@@ -137,20 +178,20 @@ class Wire(Net):
         if self.indices is None:
             raise MintIndexError("scalar wire is not indexable")
 
-        valid_range = range(len(self.indices))
+        size = len(self.indices)
 
         if isinstance(key, int):
-            if key not in valid_range:
+            if not 0 <= key < size:
                 raise MintIndexError("wire index out of range")
 
             indices = (self.indices[key],)
 
         elif isinstance(key, slice):
             msb, lsb, step = key.start, key.stop, key.step
-            if msb is None: msb = valid_range[-1]
-            if lsb is None: lsb = valid_range[0]
+            if msb is None: msb = size - 1
+            if lsb is None: lsb = 0
 
-            if msb not in valid_range or lsb not in valid_range:
+            if not (0 <= msb < size and 0 <= lsb < size):
                 raise MintIndexError("wire index out of range")
 
             if msb < lsb:
@@ -158,7 +199,53 @@ class Wire(Net):
 
             indices = self.indices[lsb : msb + 1 : step]
 
-        return Wire(indices=indices, parent=self.parent)
+        return self.parent.slice(indices)
+
+    def slice(self, indices):
+        """
+        Return the slice of this (root) wire with bits 'indices'. Slices are
+        interned: while a slice is in use, taking the same bits again returns
+        the same object. The cache only holds weak references, so one-off
+        slices are freed as usual. Interned slices are never changed in
+        shared form (see WireSlice).
+        """
+        slices = self.__dict__.get('_slices')
+        if slices is None:
+            slices = self._slices = weakref.WeakValueDictionary()
+
+        try:
+            return slices[indices]
+        except KeyError:
+            wire = WireSlice(indices=indices, parent=self)
+            slices[indices] = wire
+            return wire
+
+    def __getstate__(self):
+        # The slice cache belongs to this object: copies (see Net.__mul__)
+        # and pickles start without one
+        state = self.__dict__.copy()
+        state.pop('_slices', None)
+        return state
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return self.clones(other)
+        else:
+            return NotImplemented
+
+    def clones(self, count):
+        """ Return 'count' new root wires with the attributes of this one """
+        extra = self.__getstate__()
+        for key in Wire.STATE:
+            extra.pop(key, None)
+
+        clones = []
+        for i in xrange(count):
+            clone = Wire.__new__(Wire)
+            clone._init_state(self._name, self.indices, None, self.template)
+            clone.__dict__.update(extra)
+            clones.append(clone)
+        return clones
 
     def __len__(self):
         if self.indices is None:
@@ -169,6 +256,68 @@ class Wire(Net):
     def __repr__(self):
         return "Wire(%s)" % self.formatted_repr()
 
+class WireSlice(Wire):
+    """
+    Interned slice (see Wire.slice). Naming one returns a new, unshared
+    slice, and setting its name, template or desc first takes it out of the
+    cache, so the change never shows in a later slice of the same bits.
+    """
+    DETACH = frozenset(('_name', 'template', 'desc'))
+
+    def __call__(self, name=None):
+        wire = Wire.__new__(Wire)
+        wire.__dict__.update(self.__getstate__())
+        return Wire.__call__(wire, name)
+
+    def __setattr__(self, key, value):
+        if key in WireSlice.DETACH:
+            # Not cached yet while _init_state runs
+            parent = self.__dict__.get('_parent')
+            if parent is not None:
+                slices = parent.__dict__.get('_slices', {})
+                if slices.get(self.indices) is self:
+                    del slices[self.indices]
+        object.__setattr__(self, key, value)
+
+# Index tuples of root wires, shared by all the root wires of the same size
+_wire_indices = {}
+
+def wire_indices(size):
+    """ Return the indices (0, 1, ..., size - 1) of a wire of 'size' bits """
+    try:
+        return _wire_indices[size]
+    except KeyError:
+        indices = _wire_indices[size] = tuple(range(size))
+        return indices
+
+def wire_bundle(signals):
+    """
+    Return new wires for 'signals', in order: a shorthand for creating them
+    one by one. Signals are names (scalar wires) or (name, width[, desc])
+    rows of a signal table; widths below 1 give scalar wires, like wire[0].
+    Each one is an ordinary, independent Wire.
+    """
+    wires = []
+    for signal in signals:
+        if isinstance(signal, basestring):
+            name, width, desc = signal, None, None
+        else:
+            name, width = signal[:2]
+            desc = signal[2] if len(signal) > 2 else None
+
+        if width is not None and int(width) >= 1:
+            indices = wire_indices(int(width))
+        else:
+            indices = None
+
+        # Skips the size/indices resolution of Wire.__init__
+        wire = Wire.__new__(Wire)
+        wire._init_state(name, indices, None)
+        if desc is not None:
+            wire.desc = desc
+        wires.append(wire)
+    return wires
+
 class Const(Net):
     def __init__(self, size, val, fmt='hex'):
         self.size = size
@@ -224,6 +373,140 @@ class Concat(Net):
     def __repr__(self):
         return "Concat(%s)" % self.formatted_repr()
 
+#-------------------------------------------------------------------------------
+class IndexSpace(object):
+    """
+    Compact view of an N-dimensional array stored flat in row-major order.
+    - base = shape of the whole array
+    - axes = (start, step, count) per base axis, in base coordinates
+    - kept = the axes that are dimensions of the view; the others were fixed
+      by an integer index (count 1)
+    A view of any slice is O(dimensions) in size, whatever the array size.
+    """
+    def __init__(self, base, axes=None, kept=None):
+        self.base = tuple(base)
+        if axes is None:
+            axes = tuple((0, 1, n) for n in self.base)
+        self.axes = tuple(axes)
+        if kept is None:
+            kept = tuple(range(len(self.base)))
+        self.kept = tuple(kept)
+
+        # Strides of the base array, and of the view in lane (flat) order
+        self.strides = self._strides([n for n in self.base])
+        self.lane_strides = self._strides([count for _, _, count in self.axes])
+        self.size = 1
+        for _, _, count in self.axes:
+            self.size *= count
+
+    @staticmethod
+    def _strides(shape):
+        strides = []
+        stride = 1
+        for n in reversed(shape):
+            strides.append(stride)
+            stride *= n
+        return tuple(reversed(strides))
+
+    @property
+    def shape(self):
+        return tuple(self.axes[axis][2] for axis in self.kept)
+
+    @property
+    def full(self):
+        """ True if the view covers the whole array in order """
+        return self.size == self.strides[0] * self.base[0] if self.base \
+               else True
+
+    def coords(self, index):
+        """ Base coordinates of flat index 'index' """
+        coords = []
+        for stride in self.strides:
+            coord, index = divmod(index, stride)
+            coords.append(coord)
+        return tuple(coords)
+
+    def flat(self, lane):
+        """ Flat index of the scalar at position 'lane' of the view """
+        if lane < 0 or lane >= self.size:
+            raise MintIndexError("inst index out of range")
+        index = 0
+        for (start, step, _), lane_stride, stride in zip(self.axes,
+                                                         self.lane_strides,
+                                                         self.strides):
+            pos, lane = divmod(lane, lane_stride)
+            index += (start + pos * step) * stride
+        return index
+
+    def lane(self, index):
+        """ Position in the view of flat index 'index', None if outside """
+        lane = 0
+        for (start, step, count), lane_stride, stride in zip(self.axes,
+                                                             self.lane_strides,
+                                                             self.strides):
+            coord, index = divmod(index, stride)
+            pos, rem = divmod(coord - start, step)
+            if rem or pos < 0 or pos >= count:
+                return None
+            lane += pos * lane_stride
+        return lane
+
+    def __iter__(self):
+        """ Flat indices of the view, in row-major order """
+        offsets = [[(start + i * step) * stride for i in xrange(count)]
+                   for (start, step, count), stride in zip(self.axes,
+                                                           self.strides)]
+        for combo in itertools.product(*offsets):
+            yield sum(combo)
+
+    def __len__(self):
+        return self.size
+
+    def index(self, key):
+        """
+        Return the view selected by 'key': an int, a Verilog style [msb:lsb]
+        slice, or a tuple of those, applied to the dimensions of this view.
+        """
+        keys = key if isinstance(key, tuple) else (key,)
+        if len(keys) > len(self.kept):
+            raise MintIndexError("too many indices for %s dimensions" %
+                                 len(self.kept))
+
+        axes = list(self.axes)
+        kept = list(self.kept)
+        for dim, key in reversed(list(enumerate(keys))):
+            axis = kept[dim]
+            start, step, count = axes[axis]
+            valid_range = range(count)
+
+            if isinstance(key, (int, long)):
+                if key not in valid_range:
+                    raise MintIndexError("inst index out of range")
+                axes[axis] = (start + key * step, step, 1)
+                del kept[dim]
+
+            elif isinstance(key, slice):
+                msb, lsb, sub_step = key.start, key.stop, key.step
+                if msb is None: msb = valid_range[-1]
+                if lsb is None: lsb = valid_range[0]
+
+                if msb not in valid_range or lsb not in valid_range:
+                    raise MintIndexError("inst index out of range")
+
+                if msb < lsb:
+                    raise MintIndexError("msb less than lsb")
+
+                sub_step = sub_step or 1
+                axes[axis] = (start + lsb * step, step * sub_step,
+                              len(range(lsb, msb + 1, sub_step)))
+            else:
+                raise TypeError("invalid index: %r" % (key,))
+
+        return IndexSpace(self.base, axes, kept)
+
+    def __repr__(self):
+        return "IndexSpace(%s, %s)" % (self.base, self.axes)
+
 #-------------------------------------------------------------------------------
 class InstBase(object):
     def __div__(self, other):
@@ -237,6 +520,11 @@ class InstBase(object):
         return templatized
 
 class InstScalar(InstBase):
+    # Set for scalars of multi-dimensional arrays: the coordinates of the
+    # scalar, and the template used to format them in place of the index
+    coords = None
+    index_template = None
+
     def __init__(self, name=None, index=None):
         self.name = name
 
@@ -263,7 +551,14 @@ class InstScalar(InstBase):
         if self.index is None:
             return fmt0.format(name=self.name, index=self.index)
         else:
-            return fmt1.format(name=self.name, index=self.index)
+            return fmt1.format(name=self.name, index=self.index_repr)
+
+    @property
+    def index_repr(self):
+        """ Index used in names: the index, or formatted coordinates """
+        if self.coords is None:
+            return self.index
+        return self.index_template.format(*self.coords)
 
     def __iter__(self):
         return iter([self])
@@ -276,13 +571,25 @@ class InstScalar(InstBase):
                                self.template)
 
 class InstList(InstBase):
-    def __init__(self, inst_scalars, name=None):
-        self.scalars = []
-        index = 0
-        for inst_scalar in inst_scalars:
+    def __init__(self, inst_scalars, name=None, shape=None):
+        """
+        - inst_scalars = scalars of the array, in row-major order
+        - shape = size of each dimension, None for a one dimensional array
+        """
+        self.scalars = list(inst_scalars)
+        self.space = IndexSpace(shape or (len(self.scalars),))
+        if len(self.space) != len(self.scalars):
+            raise MintValueError("%s scalars do not fit shape %s" %
+                                 (len(self.scalars), self.space.shape))
+
+        for index, inst_scalar in enumerate(self.scalars):
             inst_scalar.index = index
-            index += 1
-            self.scalars.append(inst_scalar)
+
+        if len(self.space.base) > 1:
+            for index, inst_scalar in enumerate(self.scalars):
+                inst_scalar.coords = self.space.coords(index)
+            self.index_template = '_'.join(['{%d}' % axis for axis in
+                                            range(len(self.space.base))])
 
         self._name = name
 
@@ -305,7 +612,7 @@ class InstList(InstBase):
     @name.setter
     def name(self, value):
         self._name = value
-        for scalar in self.scalars:
+        for scalar in self:
             scalar.name = value
 
     #@property
@@ -321,61 +628,113 @@ class InstList(InstBase):
 
     @model.setter
     def model(self, value):
-        for scalar in self.scalars:
+        for scalar in self:
             scalar.model = value
         self._model = value
 
+    @property
+    def shape(self):
+        return self.space.shape
+
+    @property
+    def index_template(self):
+        """
+        Format of the coordinates in the names of the scalars of a multi-
+        dimensional array, one positional field per axis, e.g. 'r{0}_c{1}'.
+        """
+        return self.scalars[0].index_template if self.scalars else None
+
+    @index_template.setter
+    def index_template(self, value):
+        for scalar in self.scalars:
+            scalar.index_template = value
+
     def make(self, model=None):
         self.model = model or self.model
         for scalar in self:
             scalar.make(self.model)
 
     def __getitem__(self, key):
-        """ Verilog like indexing syntax is used:
+        """ Verilog like indexing syntax is used, per dimension:
             [index]   => python [index]
             [msb:lsb] => python [lsb:msb+1]
+            [i][j] or [i, j] index multi-dimensional arrays, and any dimension
+            can be sliced, e.g. [:, j]. Slices share the scalars of the array.
         """
-        valid_range = range(len(self.scalars))
-
-        if isinstance(key, int):
-            if key not in valid_range:
-                raise MintIndexError("inst index out of range")
+        space = self.space.index(key)
+        if not space.shape:
+            return self.scalars[space.flat(0)]
 
-            return self.scalars[key]
+        sliced = copy.copy(self)
+        sliced.space = space
+        return sliced
 
-        elif isinstance(key, slice):
-            msb, lsb, step = key.start, key.stop, key.step
-            if msb is None: msb = valid_range[-1]
-            if lsb is None: lsb = valid_range[0]
-
-            if msb not in valid_range or lsb not in valid_range:
-                raise MintIndexError("inst index out of range")
-
-            if msb < lsb:
-                raise MintIndexError("msb less than lsb")
-
-            sliced = copy.copy(self)
-            sliced.scalars = self.scalars[lsb : msb + 1 : step]
-            return sliced
+    def at(self, lane):
+        """ Return the scalar at flat (row-major) position 'lane' """
+        return self.scalars[self.space.flat(lane)]
 
     def __iter__(self):
-        return iter(self.scalars)
+        """ Scalars in row-major order """
+        if self.space.full:
+            return iter(self.scalars)
+        scalars = self.scalars
+        return (scalars[index] for index in self.space)
 
     def __len__(self):
-        return len(self.scalars)
+        """ Total number of scalars, over all dimensions """
+        return len(self.space)
 
     def __contains__(self, value):
-        return value in self.scalars
+        return any(value is scalar for scalar in self)
 
     def __repr__(self):
         #r = "InstList("
         r = "%s(%s)[" % (self.__class__.__name__, self.name)
-        for i, e in enumerate(self.scalars):
+        for i, e in enumerate(self):
             if i: r += ', ' + str(e)
             else: r += str(e)
         r += "]"
         return r
 
+class InstView(object):
+    """
+    Mixin for the result of an inst/template expression: a light-weight view
+    of the base instance with its own template. Attributes not set on the view
+    are looked up on the base, so binds through the view update the base;
+    attributes set on the view only change the view (copy-on-write).
+    """
+    def __init__(self, base, template):
+        self._base = base
+        self.template = template
+
+    def __getattr__(self, attr):
+        # Called only for attributes missing on the view itself
+        try:
+            base = self.__dict__['_base']
+        except KeyError:
+            raise AttributeError(attr)
+        return getattr(base, attr)
+
+    def _forwarded(attr):
+        # Class attributes of the instance classes (InstScalar.coords, ...)
+        # are found before __getattr__ is tried: read them from the base
+        # explicitly, unless set on the view
+        def fget(self):
+            try:
+                return self.__dict__[attr]
+            except KeyError:
+                return getattr(self._base, attr)
+        def fset(self, value):
+            self.__dict__[attr] = value
+        return property(fget, fset)
+
+    coords = _forwarded('coords')
+    index_template = _forwarded('index_template')
+    del _forwarded
+
+    def templatize(self, template):
+        return type(self)(self, template)
+
 #-------------------------------------------------------------------------------
 class ModInstBase(object):
     def _handle_cmp_ops(self, other, op, dir):
@@ -414,12 +773,11 @@ class ModInstScalar(InstScalar, ModInstBase):
         # Bind relationships with wires represented as Pins
         self.pins = []
 
+        # Bulk bind relationships, shared with the other scalars of a list
+        self.bindings = []
+
     def templatize(self, template):
-        # Important - we make a copy, not a deepcopy. This ensures that the
-        # copy's instance variables point to the same object as the original
-        templatized = copy.copy(self)
-        templatized.template = template
-        return templatized
+        return ModInstScalarView(self, template)
 
     def bind_intf(self, intfinst, modport, dir_filter):
         for intfinst_scalar in intfinst:
@@ -438,11 +796,24 @@ class ModInstScalar(InstScalar, ModInstBase):
         self.model = model or self.model
         self.module.make(self.model)
 
+    def get_bound_pins(self):
+        """ Return (IntfPins, Pins) of the instance, in bind order """
+        intfpins, netpins = self.intfpins, self.pins
+        if self.bindings:
+            intfpins, netpins = list(intfpins), list(netpins)
+            for binding in self.bindings:
+                binding.expand(self, intfpins, netpins)
+            intfpins.sort(key=lambda pin: pin.order)
+            netpins.sort(key=lambda pin: pin.order)
+        return intfpins, netpins
+
     def get_pins(self):
+        intfpins, netpins = self.get_bound_pins()
+
         pins = []
-        for intfpin in self.intfpins:
+        for intfpin in intfpins:
             pins += intfpin.get_pins()
-        pins += self.pins
+        pins += netpins
         return pins
 
     def __repr__(self):
@@ -450,43 +821,49 @@ class ModInstScalar(InstScalar, ModInstBase):
                                               self.module.name, self.template)
 
 class ModInstList(InstList, ModInstBase):
+    def __init__(self, inst_scalars, name=None, shape=None):
+        super(ModInstList, self).__init__(inst_scalars, name, shape)
+
+        # Bulk bind relationships, shared by all scalars (and slices)
+        self.bindings = []
+        for scalar in self.scalars:
+            scalar.bindings = self.bindings
+
     def templatize(self, template):
-        scalars = []
-        for scalar in self:
-            scalars += [scalar.templatize(template)]
-        templatized = copy.copy(self)
-        templatized.scalars = scalars
-        templatized.template = template
-        return templatized
+        return ModInstListView(self, template)
 
     def bind_intf(self, intfinst, modport, dir_filter):
         #if len(intfinst) == 1:
         if isinstance(intfinst, IntfInstScalar):
             # v - s
-            for modinst_scalar in self:
-                intfpin = IntfPin(modinst=modinst_scalar, intfinst=intfinst,
-                                  modport=modport, dir_filter=dir_filter,
-                                  template=self.template)
-                #print 'IntfPin:', intfpin
-                modinst_scalar.intfpins.append(intfpin)
+            mapping = Map.BROADCAST
         else:
             # v - v
-            if len(self) != len(intfinst):
-                raise MintConnectionError("vector sizes differ: %s(%s), %s(%s)" %
-                    (self, len(self), intfinst, len(intfinst)))
-
-            for modinst_scalar, intfinst_scalar in zip(self, intfinst):
-                intfpin = IntfPin(modinst=modinst_scalar,
-                                  intfinst=intfinst_scalar,
-                                  modport=modport, dir_filter=dir_filter,
-                                  template=self.template)
-                #print 'IntfPin:', intfpin
-                modinst_scalar.intfpins.append(intfpin)
+            mapping = Map.ONE_TO_ONE
+        self.bind(intfinst, mapping, dir_filter, modport)
 
     def bind_net(self, net, dir):
-        for modinst_scalar in self:
-            pin = Pin(dir=dir, inst=modinst_scalar, net=net, name=self.template)
-            modinst_scalar.pins.append(pin)
+        self.bind(net, Map.BROADCAST, dir)
+
+    def bind(self, target, mapping, dir, modport=None):
+        """ Record a bulk bind, pins are expanded per scalar on demand """
+        binding = Binding(self, target, mapping, dir, modport)
+        self.bindings.append(binding)
+        return binding
+
+class ModInstScalarView(InstView, ModInstScalar): pass
+
+class ModInstListView(InstView, ModInstList):
+    def __getitem__(self, key):
+        item = ModInstList.__getitem__(self, key)
+        if isinstance(item, ModInstScalar):
+            item = item.templatize(self.template)
+        return item
+
+    def __iter__(self):
+        template = self.template
+        return (scalar.templatize(template)
+                for scalar in ModInstList.__iter__(self))
 
 #-------------------------------------------------------------------------------
 class IntfInstBase(object):
@@ -535,7 +912,156 @@ class IntfInstList(InstList, IntfInstBase):
         return self
 
 #-------------------------------------------------------------------------------
-class Pin(object):
+class Binding(object):
+    """
+    Bulk bind of all the scalars (lanes) of a module instance list to an
+    interface instance, a net, or a list of either. Costs the same for any
+    number of lanes; the per-scalar IntfPins/Pins are only created by expand.
+    - insts = ModInstList (or ModInstScalar) being bound
+    - target = IntfInstScalar/IntfInstList, Net, or list of Nets
+    - mapping = Map.ONE_TO_ONE, Map.BROADCAST or Map.SLICE
+    - dir = pin direction for nets, direction filter for interfaces
+    - modport = interface modport (position or name), None for nets
+    """
+
+    def __init__(self, insts, target, mapping, dir, modport=None):
+        self.target = target
+        self.mapping = mapping
+        self.dir = dir
+        self.modport = modport
+        self.template = insts.template
+        self.order = next(_bind_order)
+
+        self.isintf = isinstance(target, IntfInstBase)
+
+        # Lanes are the index space of the list (or slice) being bound, or the
+        # index of a single scalar
+        if isinstance(insts, InstList):
+            self.space = insts.space
+            self.index = None
+            self.count = len(insts.space)
+        else:
+            self.space = None
+            self.index = insts.index
+            self.count = 1
+        if self.count == 0:
+            raise MintConnectionError("nothing to bind in %s" % insts)
+
+        if mapping == Map.ONE_TO_ONE:
+            if len(target) != self.count:
+                raise MintConnectionError("vector sizes differ: %s(%s), %s(%s)" %
+                    (insts, self.count, target, len(target)))
+            if isinstance(target, InstList) and self.space is not None and \
+               target.shape != self.space.shape:
+                raise MintConnectionError("shapes differ: %s%s, %s%s" %
+                    (insts, self.space.shape, target, target.shape))
+        elif mapping == Map.SLICE:
+            if self.isintf or not isinstance(target, Wire):
+                raise MintConnectionError("only wires can be sliced per lane: %s"
+                                          % target)
+            if len(target) % self.count:
+                raise MintConnectionError("%s(%s) does not split into %s lanes"
+                                          % (target, len(target), self.count))
+            self.width = len(target) // self.count
+        elif mapping != Map.BROADCAST:
+            raise MintValueError("unknown mapping '%s'" % mapping)
+
+    def lane(self, scalar):
+        """ Return the lane of 'scalar', None if it is not bound here """
+        if self.space is None:
+            return 0 if scalar.index == self.index else None
+        return self.space.lane(scalar.index)
+
+    def lane_target(self, lane):
+        if self.mapping == Map.BROADCAST:
+            return self.target
+        elif self.mapping == Map.ONE_TO_ONE:
+            if isinstance(self.target, InstList):
+                return self.target.at(lane)
+            return self.target[lane]
+        else:
+            lsb = lane * self.width
+            return self.target[lsb + self.width - 1 : lsb]
+
+    def expand(self, scalar, intfpins, pins):
+        """ Append the IntfPins/Pins of 'scalar' for this binding """
+        lane = self.lane(scalar)
+        if lane is None:
+            return
+
+        target = self.lane_target(lane)
+        if self.isintf:
+            for intfinst_scalar in target:
+                intfpin = IntfPin(modinst=scalar, intfinst=intfinst_scalar,
+                                  modport=self.modport, dir_filter=self.dir,
+                                  template=self.template)
+                intfpin.order = self.order
+                intfpins.append(intfpin)
+        else:
+            pin = Pin(dir=self.dir, inst=scalar, net=target, name=self.template)
+            pin.order = self.order
+            pins.append(pin)
+
+    def __repr__(self):
+        return "Binding(%s, %s, %s, %s)" % (self.mapping, self.target,
+                                            Dir.NAMES[self.dir],
+                                            self.space or self.index)
+
+def connect(insts, target, mapping=None, dir=Dir.ANY, modport=0):
+    """
+    Bulk bind module instances 'insts' to 'target' (see Binding):
+    - an interface instance (list), bound through 'modport'
+    - a net, a wire bus, or a list of nets, as pins of direction 'dir'
+    By default scalar targets are broadcast to all the lanes and lists are
+    mapped one-to-one; use Map.SLICE to give each lane its own bits of a bus.
+    """
+    if mapping is None:
+        if isinstance(target, (IntfInstList, list, tuple)):
+            mapping = Map.ONE_TO_ONE
+        else:
+            mapping = Map.BROADCAST
+
+    if isinstance(insts, ModInstList):
+        return insts.bind(target, mapping, dir, modport)
+
+    if isinstance(insts, ModInstScalar):
+        binding = Binding(insts, target, mapping, dir, modport)
+        insts.bindings.append(binding)
+        return binding
+
+    raise TypeError("cannot connect '%s' to '%s'" % (type(insts), type(target)))
+
+#-------------------------------------------------------------------------------
+def base_instance(inst):
+    """ Return the instance that an inst/template view is based on """
+    while isinstance(inst, InstView):
+        inst = inst._base
+    return inst
+
+class PinBase(object):
+    """
+    Pins are owned by their module instance, and point back to it through a
+    weak reference so the netlist has no instance <-> pin reference cycles.
+    """
+    @property
+    def modinst(self):
+        return self._modinst()
+
+    @modinst.setter
+    def modinst(self, inst):
+        self._modinst = weakref.ref(base_instance(inst))
+
+    def __getstate__(self):
+        # Weak references cannot be pickled, the instance is pickled instead
+        state = self.__dict__.copy()
+        state['_modinst'] = self.modinst
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.modinst = state['_modinst']
+
+class Pin(PinBase):
     """
     P = port name, dir
     I = inst/modport
@@ -548,6 +1074,13 @@ class Pin(object):
         self.modinst = inst
         self.net = net
 
+        # Direction of the port the pin makes: pins of a port instance bind
+        # the ports from inside the module, so they are the other way round
+        if self.modinst.isport:
+            self.effective_dir = Dir.INVERSE[dir]
+        else:
+            self.effective_dir = dir
+
         # This may be defined by "inst/'name'" expression, else net name
         self._name = name
 
@@ -556,6 +1089,8 @@ class Pin(object):
         # Template used for full/formatted name
         self.template = "{name}"
 
+        self.order = next(_bind_order)
+
     @property
     def name(self):
         if self._name:
@@ -578,12 +1113,18 @@ class Pin(object):
         """ Return full/formatted name """
         return self.template.format(name=self.name)
 
+    def copy(self):
+        """ Return a copy of this pin, bound to the same instance and net """
+        pin = Pin.__new__(Pin)
+        pin.__dict__.update(self.__dict__)
+        return pin
+
     def __repr__(self):
-        r = '{self.dir}: {self.modinst.name}.{self.fname}({self.net.fname})'
-        return r.format(self=self)
+        r = '{dir}: {self.modinst.name}.{self.fname}({self.net.fname})'
+        return r.format(self=self, dir=Dir.NAMES[self.dir])
 
 
-class IntfPin(object):
+class IntfPin(PinBase):
     """
     Interface Pin binds a modinst to a view/filter of the interface instance
     P = port template, dir
@@ -597,9 +1138,17 @@ class IntfPin(object):
         self.intfinst = intfinst
         self.modport = modport # this could int(position) or str(name)
         self.dir_filter = dir_filter
+        # Map of the modport pin directions to the directions of the ports
+        # they make here (see Pin.effective_dir)
+        if self.modinst.isport:
+            self.effective_dirs = Dir.INVERSE
+        else:
+            self.effective_dirs = Dir.SAME
         # This may be defined by "inst/template" expression, else default
         self._template = template
 
+        self.order = next(_bind_order)
+
     #@property
     #def name(self):
     #    return self.intfinst.name   # ???
@@ -629,18 +1178,21 @@ class IntfPin(object):
         modport = interface.module_instances[modport_name]
 
         # Get the pins form the modport that match the direction criteria and
-        # compute the port and wire names based on naming rules
+        # compute the port and wire names based on naming rules. The modport
+        # pins are shared by every port bound to the interface: each gets
+        # copies with its own template and direction
         pins = []
+        dir_filter = self.dir_filter
         #for pin in modport.pins:
         for pin in modport.get_pins():
-            if self.dir_filter in (Dir.ANY, pin.dir):
+            if dir_filter == Dir.ANY or pin.dir == dir_filter:
                 i = self.intfinst.name
                 k = self.intfinst.formatted_repr(fmt0="", fmt1="{index}")
                 I = self.intfinst.formatted_repr(fmt0="{name}",
                                                  fmt1="{name}{index}")
 
-                # Inplace pin template change
                 pin_template = self.template
+                pin = pin.copy()
                 pin.template = pin_template.format(i=i, k=k, I=I, n='{name}')
 
                 # Inplace wire template change
@@ -649,13 +1201,81 @@ class IntfPin(object):
                     pin.net.template = net_template.format(i=i, k=k, I=I, n='{name}')
 
                 pin.intfinst = I
+                pin.effective_dir = self.effective_dirs[pin.dir]
                 pins.append(pin)
         return pins
 
     def __repr__(self):
-        r = '{self.dir_filter}: {self.modinst.name}.{self.name}'
+        r = '{dir}: {self.modinst.name}.{self.name}'
         r += '({self.intfinst.name}.{self.modport})'
-        return r.format(self=self)
+        return r.format(self=self, dir=Dir.NAMES[self.dir_filter])
+
+#-------------------------------------------------------------------------------
+class OrderedTable(dict):
+    """
+    Insertion ordered dict for the netlist. Unlike collections.OrderedDict
+    (a circular linked list in python 2) it creates no reference cycles, so
+    it is freed by reference counting rather than by the cyclic GC.
+    """
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self)
+        self._keys = []
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._keys.append(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._keys.remove(key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            self._keys.remove(key)
+        return dict.pop(self, key, *default)
+
+    def clear(self):
+        dict.clear(self)
+        del self._keys[:]
+
+    def keys(self):
+        return list(self._keys)
+
+    def values(self):
+        return [self[key] for key in self._keys]
+
+    def items(self):
+        return [(key, self[key]) for key in self._keys]
+
+    def iterkeys(self):
+        return iter(self._keys)
+
+    def itervalues(self):
+        return (self[key] for key in self._keys)
+
+    def iteritems(self):
+        return ((key, self[key]) for key in self._keys)
+
+    def __reduce__(self):
+        # The default reduce would set the items before _keys exists
+        return (self.__class__, (self.items(),))
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.items())
 
 #-------------------------------------------------------------------------------
 class MintObject(object):
@@ -663,8 +1283,8 @@ class MintObject(object):
         self._name = name or self.__class__.__name__
         self.model = model
 
-        self.module_instances = collections.OrderedDict()
-        self.interface_instances = collections.OrderedDict()
+        self.module_instances = OrderedTable()
+        self.interface_instances = OrderedTable()
         self.port_at_pos = []
         # TODO add shadow dict for self.intstances
 
@@ -1,10 +1,13 @@
+import contextlib
 import functools
+import gc
 import inspect
 import logging
 import warnings
 
 import min
 import max
+import elab
 
 from max import VerilogGenerator
 
@@ -12,6 +15,7 @@ from max import VerilogGenerator
 # Export the "miny" language constructs
 __all__ = ['Module', 'Interface', 'model',
            'instance', 'interface', 'wire', 'concat', 'const',
+           'connect', 'Map', 'Dir',
            'verilog']
 
 #-------------------------------------------------------------------------------
@@ -52,20 +56,13 @@ class RegisterMeta(type):
 class Module(min.Module):
     __metaclass__ = RegisterMeta
 
-    def __init__(self, *args, **kwargs):
-        min.Module.__init__(self, *args, **kwargs)
-        self.verilog = max.VerilogGenerator(self)
+    @property
+    def verilog(self):
+        # Not kept as an attribute: the generator points back to the module
+        return max.VerilogGenerator(self)
 
     def generate_verilog(self):
-        for mod_inst in self.get_module_instances(flatten=True):
-            try: mod_inst.make(self.model)
-            except min.MintModelDoesNotExist, e: pass
-
-        for intf_inst in self.get_interface_instances(flatten=True):
-            intf_inst.make(self.model)
-            for intf_inst2 in intf_inst.interface.get_interface_instances(flatten=True):
-                intf_inst2.make(self.model)
-
+        elaborate_instances(self, self.model)
         self.verilog.generate_module()
 
 class Interface(min.Interface):
@@ -79,45 +76,52 @@ class model(object):
         self.func = model_func
         #logging.info('Reading model: %s' % self.name)
 
-    def __get__(self, obj, objtype):
-        """ obj = module or interface object """
+        # The model arguments after 'self' are the ports, in order
+        self.port_names = tuple(inspect.getargspec(model_func).args[1:])
 
+        # The same callable serves every object: it gets the object as its
+        # argument (see MintObject.make)
         def _model(obj):
-            #print "model:", obj.name, obj, objtype, self.func.__name__
+            return self.build(obj)
+        self.model_func = functools.update_wrapper(_model, model_func)
 
-            model_func_args = inspect.getargspec(self.func).args
-            obj.port_at_pos = model_func_args[1:]
+    def __get__(self, obj, objtype):
+        """ obj = module or interface object """
+        return self.model_func
 
-            arg_dict = {}
-            for port_name in obj.port_at_pos:
-                port_inst = min.ModInstScalar(module=min.Module(name='_port_'),
-                                              name=port_name)
-                port_inst.isport = True
-                arg_dict[port_name] = port_inst
+    def build(self, obj):
+        #print "model:", obj.name, obj, self.func.__name__
+        obj.port_at_pos = self.port_names
 
-            func_locals = self.func(obj, **arg_dict)
+        arg_dict = {}
+        for port_name in self.port_names:
+            port_inst = min.ModInstScalar(module=PORT_MODULE, name=port_name)
+            port_inst.isport = True
+            arg_dict[port_name] = port_inst
 
-            if func_locals is None:
-                raise min.MintError(
-                    "Missing 'return locals()' for %s model of %s" %
-                    (self.func.__name__, objtype.__name__))
+        func_locals = self.func(obj, **arg_dict)
 
-            #print "func locals:", func_locals
+        if func_locals is None:
+            raise min.MintError(
+                "Missing 'return locals()' for %s model of %s" %
+                (self.func.__name__, type(obj).__name__))
 
-            for var_name, var in func_locals.items():
-                #print var_name, var
-                try:
-                    var.name = var.name or var_name
-                except AttributeError:
-                    pass
-                else:
-                    obj.add(var)
+        #print "func locals:", func_locals
 
-            return func_locals
+        for var_name, var in func_locals.items():
+            #print var_name, var
+            try:
+                var.name = var.name or var_name
+            except AttributeError:
+                pass
+            else:
+                obj.add(var)
 
-        functools.update_wrapper(_model, self.func)
+        return func_locals
 
-        return _model
+# Module of the port instances of all models. It is never elaborated or
+# emitted, so one object is shared.
+PORT_MODULE = min.Module(name='_port_')
 
 #-------------------------------------------------------------------------------
 instance = max.InstGen(scalar_type=min.ModInstScalar,
@@ -131,24 +135,101 @@ interface = max.InstGen(scalar_type=min.IntfInstScalar,
 wire = max.WireGen()
 const = min.Const
 concat = min.Concat
+connect = min.connect
+Map = min.Map
+Dir = min.Dir
 
 #-------------------------------------------------------------------------------
-def verilog(module, model):
-    mod = module(model=model)
-
-    for mod_inst in mod.get_module_instances(flatten=True):
-        try: mod_inst.make(model)
-        except min.MintModelDoesNotExist, e: pass #warnings.warn(repr(e))
+def elaborate_instances(mod, model, elaborator=None):
+    """ Build 'model' of everything instantiated (at any depth) in 'mod' """
+    elaborator = elaborator or elab.Elaborator()
+    elaborator.elaborate(mod, model, built=True)
+    return elaborator
+
+@contextlib.contextmanager
+def frozen_gc(freeze=True):
+    """
+    Keep the cyclic GC from repeatedly scanning the netlist while it is built
+    and emitted: collection is off inside the block, and on python 3.7+ the
+    surviving objects are then moved out of GC tracking with gc.freeze().
+    The netlist has no reference cycles, so nothing piles up meanwhile.
+    """
+    if not freeze:
+        yield
+        return
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+        if enabled:
+            gc.enable()
+
+def elaborate(module, model, freeze_gc=False, elaborator=None, jobs=None):
+    """
+    Instantiate 'module' (class or registered name) and elaborate it. Pass an
+    elab.Elaborator to keep the dependency graph of the elaborated hierarchy,
+    or 'jobs' to build the submodules in that many worker processes.
+    """
+    if isinstance(module, basestring):
+        module = max.Registry.get(module, min.Module)
 
-    for intf_inst in mod.get_interface_instances(flatten=True):
-        intf_inst.make(model)
-        #try: intf_inst.make(model)
-        #except min.MintModelDoesNotExist: pass #warnings.warn(repr(e))
-        for intf_inst2 in intf_inst.interface.get_interface_instances(flatten=True):
-            intf_inst2.make(model)
+    if jobs and elaborator is None:
+        elaborator = elab.ParallelElaborator(jobs)
 
-    vgen = max.VerilogGenerator(mod)
+    with frozen_gc(freeze_gc):
+        mod = module(model=model)
+        elaborate_instances(mod, model, elaborator)
+    return mod
 
-    vgen.generate_module()
+def verilog(module, model, out=None, freeze_gc=False, stream=False, jobs=None,
+            sv=False, profile=None):
+    """
+    Generate verilog for 'module' (class or registered name) to 'out'. With
+    'stream', each submodule is elaborated right before its instance is
+    emitted and released right after, so the hierarchy under the top is
+    never alive at once; the top level itself is built in full (see
+    VerilogGenerator.generate_module_streaming). With 'sv',
+    generate SystemVerilog with the interfaces kept whole, preceded by the
+    definitions of the interfaces used. Pass a memprof.MemoryProfile as
+    'profile' to snapshot memory after elaboration and each generation phase.
+    'jobs' (see elaborate) cannot be combined with 'stream'.
+    """
+    if stream and jobs:
+        raise min.MintValueError("stream and jobs cannot be combined")
+
+    generator = max.SystemVerilogGenerator if sv else max.VerilogGenerator
+
+    with frozen_gc(freeze_gc):
+        if not stream:
+            mod = elaborate(module, model, jobs=jobs)
+            if profile is not None:
+                profile.mark('elaborate')
+            vgen = generator(mod, out)
+            vgen.profile = profile
+            if sv:
+                vgen.generate_interfaces()
+            vgen.generate_module()
+            return
+
+        if isinstance(module, basestring):
+            module = max.Registry.get(module, min.Module)
+        mod = module(model=model)
+        elab.Elaborator().elaborate_interfaces(mod, model)
+        if profile is not None:
+            profile.mark('elaborate')
+
+        def elaborate_inst(inst):
+            inst.model = model
+            elab.Elaborator().elaborate(inst.module, model)
+
+        vgen = generator(mod, out)
+        vgen.profile = profile
+        if sv:
+            vgen.generate_interfaces()
+        vgen.generate_module(stream=True, elaborate=elaborate_inst)
 
 #-------------------------------------------------------------------------------
@@ -0,0 +1,512 @@
+#-------------------------------------------------------------------------------
+import bz2
+import collections
+import cStringIO
+import errno
+import hashlib
+import json
+import os
+import Queue
+import re
+import stat
+import threading
+import zlib
+
+#-------------------------------------------------------------------------------
+CHUNK_SIZE = 64 * 1024
+
+# Streaming compressors by codec name. The gzip stream comes from zlib, whose
+# header has no timestamp, so unchanged content compresses to the same bytes.
+CODECS = {
+    'gzip': lambda: zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS),
+    'bz2': bz2.BZ2Compressor,
+}
+
+EXTENSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+}
+
+def codec_for(path):
+    """ Return the codec implied by the extension of 'path', or None """
+    return EXTENSIONS.get(os.path.splitext(path)[1])
+
+def compressor(codec):
+    """ Return a new compressor object (compress/flush) for 'codec' """
+    try:
+        return CODECS[codec]()
+    except KeyError:
+        raise ValueError("unknown codec '%s' (choose from %s)" %
+                         (codec, ', '.join(sorted(CODECS))))
+
+class ChunkedCompressor(object):
+    """
+    Compressor for 'codec' that collects writes and compresses them
+    CHUNK_SIZE at a time, rather than one call per (small) write
+    """
+    def __init__(self, codec):
+        self.compressor = compressor(codec)
+        self.chunks = []
+        self.size = 0
+
+    def compress(self, data):
+        """ Take 'data'; return the compressed output ready so far, if any """
+        self.chunks.append(data)
+        self.size += len(data)
+        if self.size < CHUNK_SIZE:
+            return ''
+        return self.compress_chunks()
+
+    def compress_chunks(self):
+        data = ''.join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        return self.compressor.compress(data)
+
+    def flush(self):
+        """ Return the rest of the compressed output """
+        return self.compress_chunks() + self.compressor.flush()
+
+#-------------------------------------------------------------------------------
+def temp_file(path):
+    """
+    Create a new file next to 'path' and return (fd, its path). Unlike
+    tempfile.mkstemp (owner only), it gets the mode of any new file under
+    the process umask, so it can be renamed to a new 'path' as is.
+    """
+    dirname, basename = os.path.split(os.path.abspath(path))
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        tmp_path = os.path.join(dirname, '.%s.%s.tmp' % (
+            basename, os.urandom(6).encode('hex')))
+        try:
+            return os.open(tmp_path, flags, 0666), tmp_path
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+def file_digest(path):
+    """ Return the sha1 digest of the file at 'path', read in chunks """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), ''):
+            digest.update(chunk)
+    return digest.digest()
+
+def same_content(path, size, digest):
+    """ True if the file at 'path' has the given size and sha1 digest """
+    try:
+        if os.stat(path).st_size != size:
+            return False
+        return file_digest(path) == digest
+    except (OSError, IOError):
+        return False
+
+#-------------------------------------------------------------------------------
+class WriteStats(object):
+    def __init__(self):
+        self.written = 0
+        self.skipped = 0
+
+    def __str__(self):
+        return "%d written, %d skipped" % (self.written, self.skipped)
+
+class CompressedWriter(object):
+    """
+    File-like object that compresses what is written to it with 'codec' (a
+    CODECS name) as it goes, and writes the compressed data to 'out'. Closing
+    flushes the compressor, but leaves 'out' open. Leaving a with block on an
+    exception does not: the output is left truncated rather than looking
+    complete.
+    """
+    def __init__(self, out, codec):
+        self.compressor = ChunkedCompressor(codec)
+        self.out = out
+
+    def write(self, data):
+        data = self.compressor.compress(data)
+        if data:
+            self.out.write(data)
+
+    def close(self):
+        if self.compressor is not None:
+            self.out.write(self.compressor.flush())
+            self.compressor = None
+
+    def discard(self):
+        """ Drop what is not written yet, without ending the stream """
+        self.compressor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+class OutputFile(object):
+    """
+    File-like object that replaces the file at 'path' on close, but only if
+    the content changed, so unchanged outputs keep their mtime.
+    Content goes to a temp file next to 'path' (hashed as it is written), and
+    is renamed over 'path' atomically. A file replaced this way keeps its
+    permissions.
+    It is compressed on the way with 'codec' (a CODECS name), which defaults
+    to the one implied by the extension of 'path'; pass 'none' to disable.
+    """
+    def __init__(self, path, stats=None, codec=None):
+        self.path = path
+        self.stats = stats
+        self.codec = codec or codec_for(path)
+        if self.codec == 'none':
+            self.codec = None
+        self.compressor = None
+        if self.codec is not None:
+            self.compressor = ChunkedCompressor(self.codec)
+
+        fd, self.tmp_path = temp_file(path)
+        self.file = os.fdopen(fd, 'wb')
+        self.digest = hashlib.sha1()
+        self.size = 0
+
+        # Set on close: True if 'path' was (re)written
+        self.changed = None
+
+    def write(self, data):
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+            if not data:
+                return
+        self.write_raw(data)
+
+    def write_raw(self, data):
+        """ Write 'data' to the temp file as is, bypassing compression """
+        self.file.write(data)
+        self.digest.update(data)
+        self.size += len(data)
+
+    def close(self):
+        if self.file.closed:
+            return
+        if self.compressor is not None:
+            self.write_raw(self.compressor.flush())
+            self.compressor = None
+        self.file.close()
+
+        if same_content(self.path, self.size, self.digest.digest()):
+            os.unlink(self.tmp_path)
+            self.changed = False
+        else:
+            try:
+                mode = stat.S_IMODE(os.stat(self.path).st_mode)
+            except OSError:
+                pass # new file, the temp file's mode is right
+            else:
+                os.chmod(self.tmp_path, mode)
+            os.rename(self.tmp_path, self.path)
+            self.changed = True
+
+        if self.stats is not None:
+            if self.changed:
+                self.stats.written += 1
+            else:
+                self.stats.skipped += 1
+
+    @property
+    def closed(self):
+        return self.file.closed
+
+    def discard(self):
+        """ Drop the new content, leaving 'path' untouched """
+        if not self.file.closed:
+            self.file.close()
+            os.unlink(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+class PendingFile(object):
+    """
+    In-memory stand-in for an uncompressed OutputFile, whose content is
+    handed to a ConcurrentWriter when it is closed
+    """
+    def __init__(self, path, writer):
+        self.path = path
+        self.writer = writer
+        self.buffer = cStringIO.StringIO()
+        self.digest = hashlib.sha1()
+        self.size = 0
+        self.closed = False
+
+    def write(self, data):
+        self.buffer.write(data)
+        self.digest.update(data)
+        self.size += len(data)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.submit(self.path, self.buffer.getvalue())
+            self.buffer = None
+
+    def discard(self):
+        self.closed = True
+        self.buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+#-------------------------------------------------------------------------------
+class WriteError(IOError):
+    """ Some files of a ConcurrentWriter failed; 'errors' = [(path, error)] """
+    def __init__(self, errors):
+        IOError.__init__(self, '\n'.join('%s: %s' % (path, error)
+                                         for path, error in errors))
+        self.errors = errors
+
+class ConcurrentWriter(object):
+    """
+    Writes complete outputs to OutputFiles from 'jobs' threads, so that the
+    caller can go on generating while earlier files are flushed (a win on
+    filesystems where each write waits on the network). Up to 'pending'
+    texts wait to be written; submit blocks beyond that. Failed files do not
+    stop the others: join (or close) raises a WriteError listing each of
+    them.
+    """
+    def __init__(self, jobs=4, stats=None, pending=None, codec=None):
+        if jobs < 1:
+            raise ValueError("ConcurrentWriter needs at least 1 job, not %d"
+                             % jobs)
+        self.stats = stats
+        self.codec = codec
+        self.queue = Queue.Queue(pending or 2 * jobs)
+        self.lock = threading.Lock()
+        self.errors = []
+        self.threads = [threading.Thread(target=self.worker)
+                        for i in range(jobs)]
+        for thread in self.threads:
+            thread.daemon = True
+            thread.start()
+
+    def submit(self, path, text):
+        """ Queue 'text' to be written to 'path' """
+        if not self.threads:
+            raise ValueError("submit to a closed ConcurrentWriter")
+        self.put((path, text))
+
+    def put(self, item):
+        """
+        Queue 'item', waiting for room as long as a worker is alive to make
+        some. Without workers the queued files are dropped as failed, so
+        that neither submit nor join can block for ever.
+        """
+        while True:
+            try:
+                self.queue.put(item, True, 0.1)
+                return
+            except Queue.Full:
+                if not any(thread.is_alive() for thread in self.threads):
+                    self.drain()
+
+    def drain(self):
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except Queue.Empty:
+                return
+            if item is not None:
+                self.fail(item[0], RuntimeError("no writer thread left"))
+
+    def fail(self, path, error):
+        with self.lock:
+            self.errors.append((path, error))
+
+    def worker(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            path, text = item
+            try:
+                with OutputFile(path, codec=self.codec) as f:
+                    f.write(text)
+            except Exception as e:
+                self.fail(path, e)
+                continue
+
+            if self.stats is not None:
+                with self.lock:
+                    if f.changed:
+                        self.stats.written += 1
+                    else:
+                        self.stats.skipped += 1
+
+    def stop(self):
+        """ Wait for the queued files to be written, and stop the threads """
+        for thread in self.threads:
+            self.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def join(self):
+        """ Stop, then raise a WriteError if any file failed """
+        self.stop()
+        if self.errors:
+            raise WriteError(sorted(self.errors))
+
+    def close(self):
+        self.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.stop()
+
+#-------------------------------------------------------------------------------
+SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+
+def parse_size(text):
+    """ Return the byte count of a size like '4096', '64k' or '2M' """
+    match = re.match(r'(\d+)([kmg]?)b?$', text.strip().lower())
+    if match is None:
+        raise ValueError("invalid size '%s'" % text)
+    return int(match.group(1)) * SIZE_UNITS[match.group(2)]
+
+class SplitOutput(object):
+    """
+    File-like object for one module split across files. Outside of sections
+    content goes to the main file at 'path'. Inside a section it goes to
+    parts named '<base>.<section><n>.vh', each `included from the main file
+    where it starts. A new part starts at the first boundary after a part
+    reaches 'limit' bytes. Closing writes a JSON manifest of the files
+    ('<base>.manifest.json') and removes parts left over from a previous
+    manifest. All the files are OutputFiles, so unchanged ones are not
+    rewritten. With a ConcurrentWriter as 'writer', each file is kept in
+    memory until it is complete, then handed to the writer, which writes
+    it while generation goes on.
+    """
+    def __init__(self, path, limit, stats=None, writer=None):
+        self.path = path
+        self.limit = limit
+        self.stats = stats
+        self.writer = writer
+        self.base = os.path.splitext(path)[0]
+        self.manifest_path = self.base + '.manifest.json'
+
+        self.main = self.open_file(path)
+        self.current = self.main
+        self.section_name = None
+        self.parts = []
+        self.counts = collections.Counter()
+
+    def write(self, data):
+        if self.current is None:
+            self.open_part()
+        self.current.write(data)
+
+    def open_part(self):
+        n = self.counts[self.section_name]
+        self.counts[self.section_name] += 1
+
+        path = '%s.%s%d.vh' % (self.base, self.section_name, n)
+        self.main.write('`include "%s"\n' % os.path.basename(path))
+        self.current = self.open_file(path)
+        self.parts.append((self.section_name, self.current))
+
+    def open_file(self, path):
+        if self.writer is not None:
+            return PendingFile(path, self.writer)
+        return OutputFile(path, self.stats, codec='none')
+
+    def section(self, name):
+        """ Start sending content to parts of section 'name' """
+        self.end_section()
+        self.section_name = name
+        self.current = None
+
+    def boundary(self):
+        """ Mark a point where a full part may end """
+        if self.section_name is not None and self.current is not None and \
+           self.current.size >= self.limit:
+            self.current.close()
+            self.current = None
+
+    def end_section(self):
+        if self.section_name is not None:
+            if self.current is not None:
+                self.current.close()
+            self.section_name = None
+            self.current = self.main
+
+    def manifest(self):
+        """ Return the manifest of the files written, main file first """
+        files = [('main', self.main)] + self.parts
+        return collections.OrderedDict([
+            ('main', os.path.basename(self.path)),
+            ('limit', self.limit),
+            ('files', [collections.OrderedDict([
+                ('path', os.path.basename(f.path)),
+                ('section', section),
+                ('bytes', f.size),
+                ('sha1', f.digest.hexdigest()),
+            ]) for section, f in files]),
+        ])
+
+    def old_parts(self):
+        """ Return the part paths listed in the manifest of a previous run """
+        try:
+            with open(self.manifest_path) as f:
+                files = json.load(f)['files']
+        except (IOError, ValueError, KeyError, TypeError):
+            return []
+        dirname = os.path.dirname(self.path)
+        return [os.path.join(dirname, entry['path']) for entry in files
+                if entry.get('section') != 'main']
+
+    def close(self):
+        if self.main.closed:
+            return
+        self.end_section()
+        self.main.close()
+
+        stale = set(self.old_parts()) - set(f.path for s, f in self.parts)
+        with self.open_file(self.manifest_path) as f:
+            json.dump(self.manifest(), f, indent=2, separators=(',', ': '))
+            f.write('\n')
+        for path in stale:
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def discard(self):
+        """ Drop the new content of the files not closed yet """
+        self.main.discard()
+        for section, f in self.parts:
+            f.discard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
@@ -0,0 +1,189 @@
+#-------------------------------------------------------------------------------
+import collections
+
+import min
+import export
+
+#-------------------------------------------------------------------------------
+FORWARD = 'forward'
+BACKWARD = 'backward'
+BOTH = 'both'
+
+# Pin direction codes that drive / load their net. Undirected pins may do
+# either, so they count as both, like inouts.
+DRIVER_CODES = frozenset((min.Dir.O, min.Dir.IO, min.Dir.ANY))
+LOAD_CODES = frozenset((min.Dir.I, min.Dir.IO, min.Dir.ANY))
+
+Endpoint = collections.namedtuple('Endpoint', 'inst, port, dir, net')
+
+class NetlistIndex(object):
+    """
+    Connectivity queries on one elaborated module, by instance and net name
+    (as emitted in verilog). The module ports are an instance too, named
+    after the model argument (usually 'io'): its output pins drive the module
+    inputs, and its input pins load the module outputs.
+    Nets are the wires and slices connected to pins; slices of the same wire
+    that share bits are aliases, and are followed as one net. Each lookup
+    only touches the pins of the nets involved.
+    """
+
+    def __init__(self, mod):
+        self.conn = export.Connectivity(mod, ports=True)
+        self.inst_ids = dict((name, i)
+                             for i, name in enumerate(self.conn.inst_names))
+        self.net_ids = dict((name, n)
+                            for n, name in enumerate(self.conn.net_names))
+        self.aliases = self.find_aliases()
+
+    def find_aliases(self):
+        """ Return net id -> ids of the other nets sharing bits with it """
+        conn = self.conn
+        by_wire = collections.defaultdict(list)
+        for n in xrange(conn.num_nets):
+            by_wire[conn.net_wire[n]].append(
+                (conn.net_lsb[n], conn.net_lsb[n] + conn.net_width[n], n))
+
+        aliases = {}
+        for nets in by_wire.itervalues():
+            if len(nets) < 2:
+                continue
+            # Sweep the bit ranges in order of lsb, against the open ones
+            nets.sort()
+            active = []
+            for lsb, end, n in nets:
+                active = [net for net in active if net[1] > lsb]
+                for other in active:
+                    aliases.setdefault(n, []).append(other[2])
+                    aliases.setdefault(other[2], []).append(n)
+                active.append((lsb, end, n))
+        return aliases
+
+    #---------------------------------------------------------------------------
+    def inst_id(self, inst):
+        try:
+            return self.inst_ids[inst]
+        except KeyError:
+            raise min.MintValueError("no instance '%s'" % inst)
+
+    def net_id(self, net):
+        try:
+            return self.net_ids[net]
+        except KeyError:
+            raise min.MintValueError("no net '%s'" % net)
+
+    def endpoint(self, pin):
+        conn = self.conn
+        return Endpoint(conn.inst_names[conn.pin_inst[pin]],
+                        conn.port_names[conn.pin_port[pin]],
+                        min.Dir.NAMES[conn.pin_dir[pin]],
+                        conn.net_names[conn.pin_net[pin]])
+
+    def net_pins(self, n):
+        """ Yield the pin ids on net id 'n' and its aliases """
+        conn = self.conn
+        for net in [n] + self.aliases.get(n, []):
+            for i in xrange(conn.net_ptr[net], conn.net_ptr[net + 1]):
+                yield conn.net_pins[i]
+
+    def inst_pins(self, i):
+        return xrange(self.conn.inst_ptr[i], self.conn.inst_ptr[i + 1])
+
+    #---------------------------------------------------------------------------
+    def endpoints(self, pins):
+        """ Return the Endpoints of 'pins', without duplicates """
+        endpoints = []
+        seen = set()
+        for pin in pins:
+            endpoint = self.endpoint(pin)
+            if endpoint not in seen:
+                seen.add(endpoint)
+                endpoints.append(endpoint)
+        return endpoints
+
+    def pins(self, net):
+        """ Return the Endpoints connected to 'net' """
+        return self.endpoints(self.net_pins(self.net_id(net)))
+
+    def drivers(self, net):
+        """ Return the Endpoints driving 'net' """
+        return self.endpoints(pin for pin in self.net_pins(self.net_id(net))
+                              if self.conn.pin_dir[pin] in DRIVER_CODES)
+
+    def fanout(self, net):
+        """ Return the Endpoints that 'net' drives """
+        return self.endpoints(pin for pin in self.net_pins(self.net_id(net))
+                              if self.conn.pin_dir[pin] in LOAD_CODES)
+
+    def fanin(self, inst, port=None):
+        """
+        Return the Endpoints driving the inputs of 'inst', or only its input
+        'port', other than 'inst' itself
+        """
+        conn = self.conn
+        i = self.inst_id(inst)
+        pins = []
+        for pin in self.inst_pins(i):
+            if conn.pin_dir[pin] not in LOAD_CODES:
+                continue
+            if port is not None and conn.port_names[conn.pin_port[pin]] != port:
+                continue
+            for other in self.net_pins(conn.pin_net[pin]):
+                if conn.pin_inst[other] != i and \
+                   conn.pin_dir[other] in DRIVER_CODES:
+                    pins.append(other)
+        return self.endpoints(pins)
+
+    def neighbors(self, i, direction=FORWARD, seen_nets=None):
+        """
+        Yield the instance ids one hop from instance id 'i'. Nets in the set
+        'seen_nets' are skipped, and the nets followed are added to it.
+        """
+        conn = self.conn
+        if direction == FORWARD:
+            mine, theirs = DRIVER_CODES, LOAD_CODES
+        elif direction == BACKWARD:
+            mine, theirs = LOAD_CODES, DRIVER_CODES
+        else:
+            mine = theirs = None
+
+        for pin in self.inst_pins(i):
+            if mine is not None and conn.pin_dir[pin] not in mine:
+                continue
+            net = conn.pin_net[pin]
+            if seen_nets is not None:
+                if net in seen_nets:
+                    continue
+                seen_nets.add(net)
+            for other in self.net_pins(net):
+                if theirs is None or conn.pin_dir[other] in theirs:
+                    yield conn.pin_inst[other]
+
+    def bfs(self, inst, depth, direction=FORWARD):
+        """
+        Return the instances within 'depth' hops of 'inst' following nets
+        FORWARD (driver to load), BACKWARD or BOTH ways, as an ordered
+        dict of instance name -> hops, nearest first
+        """
+        if direction not in (FORWARD, BACKWARD, BOTH):
+            raise min.MintValueError("unknown direction '%s'" % direction)
+
+        start = self.inst_id(inst)
+        hops = {start: 0}
+        # Each net leads to the same instances whichever pin it is reached
+        # from, so it is followed once: big fanout nets are not rescanned
+        seen_nets = set()
+        frontier = [start]
+        for hop in xrange(1, depth + 1):
+            next_frontier = []
+            for i in frontier:
+                for j in self.neighbors(i, direction, seen_nets):
+                    if j not in hops:
+                        hops[j] = hop
+                        next_frontier.append(j)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        return collections.OrderedDict(
+            (self.conn.inst_names[i], hop)
+            for i, hop in sorted(hops.items(), key=lambda item: item[::-1]))
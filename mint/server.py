@@ -0,0 +1,129 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import importlib
+import json
+import logging
+import os
+import socket
+import SocketServer
+import threading
+import time
+import traceback
+
+import max
+import miny
+import output
+
+log = logging.getLogger(__name__)
+
+#-------------------------------------------------------------------------------
+# Protocol: one JSON object per line in each direction.
+#   request  = {"module": name, "model": name, "path": file or null}
+#   response = {"status": "ok" | "error", "timings": {phase: seconds},
+#               "text": verilog (only if no path),
+#               "written": false if path was left unchanged,
+#               "error": message}
+#-------------------------------------------------------------------------------
+class RequestHandler(SocketServer.StreamRequestHandler):
+    def handle(self):
+        # readline, not iteration: file iteration reads ahead and would block
+        for line in iter(self.rfile.readline, ''):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = self.server.generate(request)
+            except Exception, e:
+                log.debug(traceback.format_exc())
+                response = {'status': 'error', 'error': str(e)}
+            self.wfile.write(json.dumps(response) + '\n')
+            self.wfile.flush()
+
+class GenerationServer(SocketServer.ThreadingMixIn,
+                       SocketServer.UnixStreamServer):
+    """
+    Serves generation requests on a unix domain socket against a warm,
+    pre-imported design. Each connection gets a thread, but requests are
+    handled one at a time since elaboration uses shared generator state.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, design_modules=()):
+        if os.path.exists(address):
+            os.unlink(address)
+        SocketServer.UnixStreamServer.__init__(self, address, RequestHandler)
+        self.lock = threading.Lock()
+
+        for name in design_modules:
+            importlib.import_module(name)
+
+    def generate(self, request):
+        with self.lock:
+            return self._generate(request)
+
+    def _generate(self, request):
+        timings = {}
+        start = time.time()
+        mod = miny.elaborate(request['module'], request['model'])
+        timings['elaborate'] = time.time() - start
+
+        path = request.get('path')
+        start = time.time()
+        if path is None:
+            out = cStringIO.StringIO()
+            max.VerilogGenerator(mod, out).generate_module()
+            text = out.getvalue()
+        else:
+            with output.OutputFile(path) as out:
+                max.VerilogGenerator(mod, out).generate_module()
+            text = None
+        timings['generate'] = time.time() - start
+
+        log.info("%s %s -> %s (%.3fs)", request['module'], request['model'],
+                 path or '-', sum(timings.values()))
+
+        response = {'status': 'ok', 'timings': timings}
+        if text is not None:
+            response['text'] = text
+        else:
+            response['written'] = out.changed
+        return response
+
+    def server_close(self):
+        SocketServer.UnixStreamServer.server_close(self)
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+#-------------------------------------------------------------------------------
+class Client(object):
+    """ Thin client, keeps one connection open across requests """
+    def __init__(self, address):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(address)
+        self.rfile = self.sock.makefile('rb')
+
+    def request(self, module, model, path=None):
+        if path is not None:
+            path = os.path.abspath(path)
+        request = {'module': module, 'model': model, 'path': path}
+        self.sock.sendall(json.dumps(request) + '\n')
+        line = self.rfile.readline()
+        if not line:
+            raise IOError("connection closed by server")
+        return json.loads(line)
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+def serve(address, design_modules=()):
+    server = GenerationServer(address, design_modules)
+    log.info("serving on %s", address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
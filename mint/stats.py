@@ -0,0 +1,120 @@
+#-------------------------------------------------------------------------------
+import collections
+import json
+
+import min
+
+#-------------------------------------------------------------------------------
+FIELDS = ('modules', 'instances', 'instance_arrays',
+          'interfaces', 'interface_arrays',
+          'ports', 'wires', 'wire_bits',
+          'inputs', 'outputs', 'inouts', 'undirected',
+          'consts', 'concats')
+
+# Direction fields by min.Dir code
+DIR_FIELDS = ('inputs', 'outputs', 'inouts', 'undirected')
+
+#-------------------------------------------------------------------------------
+def module_stats(mod):
+    """
+    Return a Counter of FIELDS for the single module object 'mod' (not its
+    submodules), together with the submodule objects to visit next.
+    """
+    counts = collections.Counter(modules=1)
+    submodules = []
+
+    # Port nets first, so that wires only count nets internal to 'mod'
+    port_nets = set()
+    for mod_inst in mod.module_instances.values():
+        if mod_inst.isport:
+            for pin in mod_inst.get_pins():
+                port_nets.add(pin.net.fname)
+    counts['ports'] = len(port_nets)
+
+    wires = set()
+    for mod_inst in mod.module_instances.values():
+        if mod_inst.isport:
+            continue
+        if isinstance(mod_inst, min.ModInstList):
+            counts['instance_arrays'] += 1
+
+        for scalar in mod_inst:
+            counts['instances'] += 1
+            submodules.append(scalar.module)
+
+            for pin in scalar.get_pins():
+                counts[DIR_FIELDS[pin.dir]] += 1
+
+                net = pin.net
+                if isinstance(net, min.Const):
+                    counts['consts'] += 1
+                    continue
+                if isinstance(net, min.Concat):
+                    counts['concats'] += 1
+                    nets = net.wires
+                else:
+                    nets = [net]
+
+                for wire in nets:
+                    fname = wire.fname
+                    if fname not in wires:
+                        wires.add(fname)
+                        if fname not in port_nets:
+                            counts['wires'] += 1
+                            counts['wire_bits'] += len(wire.parent)
+
+    for intf_inst in mod.interface_instances.values():
+        if isinstance(intf_inst, min.IntfInstList):
+            counts['interface_arrays'] += 1
+        counts['interfaces'] += len(intf_inst)
+
+    return counts, submodules
+
+def design_stats(top):
+    """
+    Collect statistics of the elaborated hierarchy under 'top' in a single
+    pass. Returns (per_module, total): per_module maps module names to the
+    Counter summed over all objects of that module, total sums everything.
+    """
+    per_module = min.OrderedTable()
+    total = collections.Counter()
+
+    stack = [top]
+    while stack:
+        mod = stack.pop()
+        counts, submodules = module_stats(mod)
+        if mod.name in per_module:
+            per_module[mod.name].update(counts)
+        else:
+            per_module[mod.name] = counts
+        total.update(counts)
+        stack.extend(reversed(submodules))
+
+    return per_module, total
+
+#-------------------------------------------------------------------------------
+def format_report(per_module, total):
+    """ Return the statistics as a text table, one row per module """
+    width = max(len(name) for name in per_module.keys() + ['module'])
+    rows = [(name, per_module[name]) for name in per_module] + \
+           [('TOTAL', total)]
+
+    lines = []
+    lines.append(' '.join(['module'.ljust(width)] +
+                          [field.rjust(len(field)) for field in FIELDS]))
+    for name, counts in rows:
+        lines.append(' '.join([name.ljust(width)] +
+                              [str(counts[field]).rjust(len(field))
+                               for field in FIELDS]))
+    return '\n'.join(lines) + '\n'
+
+def _fields(counts):
+    return collections.OrderedDict((field, counts[field]) for field in FIELDS)
+
+def json_report(per_module, total):
+    """ Return the statistics as JSON, for use by scripts and CI checks """
+    report = collections.OrderedDict()
+    report['modules'] = collections.OrderedDict(
+        (name, _fields(counts)) for name, counts in per_module.items())
+    report['total'] = _fields(total)
+    return json.dumps(report, indent=2) + '\n'
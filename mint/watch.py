@@ -0,0 +1,190 @@
+#-------------------------------------------------------------------------------
+import collections
+import importlib
+import logging
+import os
+import sys
+import time
+
+import elab
+import min
+import max
+import miny
+import output
+
+log = logging.getLogger(__name__)
+
+#-------------------------------------------------------------------------------
+Target = collections.namedtuple('Target', 'module, model, path')
+
+def parse_target(spec):
+    """ Parse a 'module:model:path' target specification """
+    try:
+        module, model, path = spec.split(':', 2)
+    except ValueError:
+        raise min.MintValueError("target '%s' is not 'module:model:path'" %
+                                 spec)
+    return Target(module, model, path)
+
+def source_file(pymod):
+    """ Return the .py source of a python module (None if unknown) """
+    filename = getattr(pymod, '__file__', None)
+    if filename is None:
+        return None
+    if filename.endswith(('.pyc', '.pyo')):
+        filename = filename[:-1]
+    return filename
+
+#-------------------------------------------------------------------------------
+class Watcher(object):
+    """
+    Keeps the design imported and the targets elaborated, and regenerates the
+    targets affected by edits to the design sources. Only the modules of the
+    edited sources and their parents are elaborated again; the rest of each
+    target is reused (see elab.IncrementalElaborator).
+    - design_modules = names of the python modules holding the design
+    - targets = list of Target(module, model, path)
+    - interval = polling interval in seconds
+    """
+
+    def __init__(self, design_modules, targets, interval=0.25):
+        self.design_modules = list(design_modules)
+        self.targets = list(targets)
+        self.interval = interval
+
+        self.mtimes = {}    # python module name -> source mtime
+        self.deps = {}      # target -> set of python module names
+        self.elaborators = {} # target -> last IncrementalElaborator
+        self.stats = output.WriteStats()
+
+    def start(self):
+        for name in self.design_modules:
+            importlib.import_module(name)
+        self.scan()
+        for target in self.targets:
+            self.regenerate(target)
+
+    def watched_modules(self):
+        """ Python modules that define the design """
+        names = set(self.design_modules)
+        for entry in max.Registry._registry.values():
+            name = getattr(entry.obj, '__module__', None)
+            if name in sys.modules and not name.startswith('mint.'):
+                names.add(name)
+        return names
+
+    def scan(self):
+        """ Return the names of python modules whose source changed """
+        changed = []
+        for name in self.watched_modules():
+            filename = source_file(sys.modules.get(name))
+            try:
+                mtime = os.stat(filename).st_mtime
+            except (OSError, TypeError):
+                continue
+            if self.mtimes.get(name, mtime) != mtime:
+                changed.append(name)
+            self.mtimes[name] = mtime
+        return changed
+
+    def dependents(self, changed):
+        """
+        Return the other design modules whose classes derive from classes of
+        the python modules 'changed', bases first. They must be re-imported
+        too, or their classes keep the bases from before the change.
+        """
+        bases = {} # python module name -> modules of its classes' bases
+        for entry in max.Registry._registry.values():
+            name = getattr(entry.obj, '__module__', None)
+            if name in sys.modules and not name.startswith('mint.'):
+                bases.setdefault(name, set()).update(
+                    cls.__module__ for cls in getattr(entry.obj, '__mro__', ()))
+
+        pending = set(name for name in bases
+                      if name not in changed and bases[name] & changed)
+        order = []
+        while pending:
+            ready = [name for name in pending
+                     if not (bases[name] - set([name])) & pending]
+            # Classes deriving from each other both ways: any order will do
+            ready = sorted(ready or pending)
+            order.extend(ready)
+            pending.difference_update(ready)
+        return order
+
+    def reimport(self, name):
+        """ Drop the registrations made by 'name' and re-import it """
+        registry = max.Registry._registry
+        dropped = [(obj_name, entry) for obj_name, entry in registry.items()
+                   if getattr(entry.obj, '__module__', None) == name]
+        for obj_name, entry in dropped:
+            max.Registry.deregister(obj_name, entry.type)
+
+        try:
+            reload(sys.modules[name])
+        except Exception:
+            # Keep the last good design around
+            log.exception("failed to re-import '%s'", name)
+            for obj_name, entry in dropped:
+                if obj_name not in registry:
+                    max.Registry.register(entry.obj, obj_name, entry.type)
+            return False
+        return True
+
+    def regenerate(self, target, changed=()):
+        """
+        Elaborate and generate 'target', write it if its text changed.
+        'changed' names the python modules re-imported since the last time.
+        """
+        start = time.time()
+        try:
+            elaborator = elab.IncrementalElaborator(
+                self.elaborators.get(target), changed)
+            mod = miny.elaborate(target.module, target.model,
+                                 elaborator=elaborator)
+            with output.OutputFile(target.path, self.stats) as out:
+                max.VerilogGenerator(mod, out).generate_module()
+        except Exception:
+            log.exception("failed to generate '%s'", target.path)
+            # What changed since the last elaboration would be lost: start
+            # over next time
+            self.elaborators.pop(target, None)
+            return False
+
+        self.deps[target] = set(base.__module__
+                                for cls in elaborator.classes()
+                                for base in cls.__mro__)
+        self.elaborators[target] = elaborator
+
+        log.info("%s %s (%.3fs, %d of %d objects reused)", target.path,
+                 'written' if out.changed else 'unchanged', time.time() - start,
+                 len(elaborator.built), len(elaborator.nodes))
+        return out.changed
+
+    def step(self):
+        """ Handle one round of source changes, return the rewritten targets """
+        changed = self.scan()
+        if not changed:
+            return []
+
+        changed = set(name for name in changed if self.reimport(name))
+        changed.update(name for name in self.dependents(changed)
+                       if self.reimport(name))
+
+        affected = [target for target in self.targets
+                    if target not in self.deps or self.deps[target] & changed]
+
+        rewritten = [target for target in affected
+                     if self.regenerate(target, changed)]
+        log.info("outputs: %s", self.stats)
+        return rewritten
+
+    def run(self):
+        self.start()
+        log.info("watching %s", ', '.join(sorted(self.watched_modules())))
+        try:
+            while True:
+                time.sleep(self.interval)
+                self.step()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,39 @@
+module A (
+  input                 CLK_IF_clk
+, input                 CLK_IF_reset
+, input          [1:0]  A_IF_cmd
+, output         [1:0]  A_IF_resp
+, output         [7:0]  AB_IF0_address
+, inout          [7:0]  AB_IF0_data
+, output                AB_IF0_ren
+, output                AB_IF0_wen
+, output         [7:0]  AB_IF1_address
+, inout          [7:0]  AB_IF1_data
+, output                AB_IF1_ren
+, output                AB_IF1_wen
+, input                 si
+, output                smid
+, input                 w1
+, output                w2
+);
+endmodule
+module C (
+  input                 p2
+);
+endmodule
+module B (
+  input                 CLK_IF_clk
+, input                 CLK_IF_reset
+, input          [7:0]  address
+, inout          [7:0]  data
+, input                 ren
+, input                 wen
+, input                 si
+, output                so
+, input                 p1
+);
+endmodule
+module D (
+  input                 w2
+);
+endmodule
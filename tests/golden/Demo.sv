@@ -0,0 +1,99 @@
+interface a_if;
+    logic            [1:0]  cmd;
+    logic            [1:0]  resp;
+
+    modport a (
+        output cmd,
+        input  resp
+    );
+
+    modport b (
+        input  cmd,
+        output resp
+    );
+endinterface
+
+interface clk_if;
+    logic                   clk;
+    logic                   reset;
+
+    modport a (
+        output clk,
+        output reset
+    );
+
+    modport b (
+        input  clk,
+        input  reset
+    );
+endinterface
+
+interface ab_if;
+    logic            [7:0]  address;
+    logic            [7:0]  data;
+    logic                   ren;
+    logic                   wen;
+
+    modport a (
+        output address,
+        inout  data,
+        output ren,
+        output wen
+    );
+
+    modport b (
+        input  address,
+        inout  data,
+        input  ren,
+        input  wen
+    );
+endinterface
+
+module Demo (
+  clk_if                CLK_IF
+, a_if                  A_IF
+, input                 si
+, output                so
+, input                 w1
+);
+
+ab_if                   AB_IF0();
+ab_if                   AB_IF1();
+wire             [1:0]  smid;
+wire                    w2;
+
+A a (
+    .CLK_IF                   ( CLK_IF.b                 ),
+    .A_IF                     ( A_IF.b                   ),
+    .AB_IF0                   ( AB_IF0.a                 ),
+    .AB_IF1                   ( AB_IF1.a                 ),
+    .si                       ( si                       ),
+    .smid                     ( smid[0]                  ),
+    .w1                       ( w1                       ),
+    .w2                       ( w2                       )
+    );
+
+C c (
+    .p2                       ( w2                       )
+    );
+
+B b0 (
+    .CLK_IF                   ( CLK_IF.b                 ),
+    .AB_IF                    ( AB_IF0.b                 ),
+    .si                       ( smid[0]                  ),
+    .so                       ( smid[1]                  ),
+    .p1                       ( w1                       )
+    );
+
+B b1 (
+    .CLK_IF                   ( CLK_IF.b                 ),
+    .AB_IF                    ( AB_IF1.b                 ),
+    .si                       ( smid[1]                  ),
+    .so                       ( so                       ),
+    .p1                       ( w1                       )
+    );
+
+D d (
+    .w2                       ( w2                       )
+    );
+endmodule
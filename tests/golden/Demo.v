@@ -0,0 +1,72 @@
+module Demo (
+  input                 clk
+, input                 reset
+, input          [1:0]  A_IF_cmd
+, output         [1:0]  A_IF_resp
+, input                 si
+, output                so
+, input                 w1
+);
+
+wire             [7:0]  address_0;
+wire             [7:0]  data_0;
+wire                    ren_0;
+wire                    wen_0;
+wire             [7:0]  address_1;
+wire             [7:0]  data_1;
+wire                    ren_1;
+wire                    wen_1;
+wire             [1:0]  smid;
+wire                    w2;
+
+A a (
+    .CLK_IF_clk               ( clk                      ),
+    .CLK_IF_reset             ( reset                    ),
+    .A_IF_cmd                 ( A_IF_cmd[1:0]            ),
+    .A_IF_resp                ( A_IF_resp[1:0]           ),
+    .AB_IF0_address           ( address_0[7:0]           ),
+    .AB_IF0_data              ( data_0[7:0]              ),
+    .AB_IF0_ren               ( ren_0[0]                 ),
+    .AB_IF0_wen               ( wen_0                    ),
+    .AB_IF1_address           ( address_1[7:0]           ),
+    .AB_IF1_data              ( data_1[7:0]              ),
+    .AB_IF1_ren               ( ren_1[0]                 ),
+    .AB_IF1_wen               ( wen_1                    ),
+    .si                       ( si                       ),
+    .smid                     ( smid[0]                  ),
+    .w1                       ( w1                       ),
+    .w2                       ( w2                       )
+    );
+
+C c (
+    .p2                       ( w2                       )
+    );
+
+B b0 (
+    .CLK_IF_clk               ( clk                      ),
+    .CLK_IF_reset             ( reset                    ),
+    .address                  ( address_0[7:0]           ),
+    .data                     ( data_0[7:0]              ),
+    .ren                      ( ren_0[0]                 ),
+    .wen                      ( wen_0                    ),
+    .si                       ( smid[0]                  ),
+    .so                       ( smid[1]                  ),
+    .p1                       ( w1                       )
+    );
+
+B b1 (
+    .CLK_IF_clk               ( clk                      ),
+    .CLK_IF_reset             ( reset                    ),
+    .address                  ( address_1[7:0]           ),
+    .data                     ( data_1[7:0]              ),
+    .ren                      ( ren_1[0]                 ),
+    .wen                      ( wen_1                    ),
+    .si                       ( smid[1]                  ),
+    .so                       ( so                       ),
+    .p1                       ( w1                       )
+    );
+
+D d (
+    .w2                       ( w2                       )
+    );
+endmodule
@@ -0,0 +1,114 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import re
+import unittest
+
+from mint import min
+from mint import miny
+from mint.miny import *
+
+class array_link_if(Interface):
+    @model
+    def rtl(self, a, b):
+        v = wire()
+        a > v > b
+        return locals()
+
+class ArrayMesh(Module):
+    @model
+    def rtl(self, io):
+        node = instance[2][3].ArrayNode
+        links = interface[2][3].array_link_if
+        node.index_template = 'r{0}c{1}'
+        row = wire[3]()
+        col = wire[2]()
+        node == links
+        connect(node[1]/'row', row, dir=Dir.I)
+        connect(node[:, 2]/'col', col, Map.SLICE, dir=Dir.O)
+        clk = wire()
+        io > clk > node[1][0]/'clk'
+        return locals()
+
+def generate(**kwargs):
+    out = cStringIO.StringIO()
+    miny.verilog(ArrayMesh, 'rtl', out, **kwargs)
+    return out.getvalue()
+
+def port_maps(text):
+    """ Return instance name -> [(port, net)] """
+    maps = {}
+    for name, body in re.findall(r'^ArrayNode (\w+) \((.*?)\);', text,
+                                 re.M | re.S):
+        maps[name] = re.findall(r'\.(\w+)\s+\( (\S+)\s+\)', body)
+    return maps
+
+#-------------------------------------------------------------------------------
+class ArrayTest(unittest.TestCase):
+    def setUp(self):
+        self.mod = miny.elaborate(ArrayMesh, 'rtl')
+        self.node = self.mod.module_instances['node']
+
+    def test_shapes(self):
+        node = self.node
+        self.assertEqual(node.shape, (2, 3))
+        self.assertEqual(len(node), 6)
+        self.assertEqual(node[1].shape, (3,))
+        self.assertEqual(node[:, 2].shape, (2,))
+        self.assertEqual(node[1:0, 2:1].shape, (2, 2))
+        self.assertEqual(len(node[1:0, 2:1]), 4)
+
+    def test_views_share_the_scalars(self):
+        node = self.node
+        self.assertIs(node[1][2], node[1, 2])
+        self.assertIs(node[:, 2][1], node[1, 2])
+        self.assertIs(node.at(5), node[1, 2])
+        self.assertEqual([scalar.index_repr for scalar in node[:, 1]],
+                         ['r0c1', 'r1c1'])
+
+    def test_view_of_a_scalar(self):
+        view = self.node[1][2]/'q'
+        self.assertEqual(view.coords, (1, 2))
+        self.assertEqual(view.index_repr, 'r1c2')
+        self.assertEqual(view.formatted_repr(fmt1='{name}{index}'),
+                         'noder1c2')
+        view.index_template = '{1}_{0}'
+        self.assertEqual(view.index_repr, '2_1')
+        self.assertEqual(self.node[1][2].index_repr, 'r1c2')
+
+    def test_bad_indices(self):
+        node = self.node
+        self.assertRaises(min.MintIndexError, lambda: node[2])
+        self.assertRaises(min.MintIndexError, lambda: node[0, 3])
+        self.assertRaises(min.MintIndexError, lambda: node[0:1])
+        self.assertRaises(min.MintIndexError, lambda: node[0, 0, 0])
+        self.assertRaises(TypeError, lambda: node['x'])
+
+    def test_port_maps(self):
+        maps = port_maps(generate())
+        self.assertEqual(sorted(maps), ['noder%dc%d' % (r, c)
+                                        for r in range(2) for c in range(3)])
+        for r in range(2):
+            for c in range(3):
+                self.assertEqual(maps['noder%dc%d' % (r, c)][0],
+                                 ('links_v', 'links%d_%d_v' % (r, c)))
+        self.assertEqual(maps['noder1c0'][1:],
+                         [('row', 'row[2:0]'), ('clk', 'clk')])
+        self.assertEqual(maps['noder0c2'][1:], [('col', 'col[0]')])
+        self.assertEqual(maps['noder1c2'][1:],
+                         [('row', 'row[2:0]'), ('col', 'col[1]')])
+        self.assertEqual(maps['noder0c0'][1:], [])
+
+    def test_sv(self):
+        text = generate(sv=True)
+        self.assertEqual(re.findall(r'^array_link_if\s+(\w+)\(\);', text,
+                                    re.M),
+                         ['links%d_%d' % (r, c)
+                          for r in range(2) for c in range(3)])
+        self.assertEqual(port_maps(text)['noder1c2'],
+                         [('links', 'links1_2.a'), ('row', 'row[2:0]'),
+                          ('col', 'col[1]')])
+        self.assertEqual(len(re.findall(r'^ArrayNode noder\dc\d \(', text,
+                                        re.M)), 6)
+
+if __name__ == '__main__':
+    unittest.main()
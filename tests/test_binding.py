@@ -0,0 +1,87 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import unittest
+
+from mint import max
+from mint import min
+from mint import miny
+from mint.miny import *
+
+class bind_lane_if(Interface):
+    @model
+    def rtl(self, a, b):
+        req = wire()
+        a > req > b
+        return locals()
+
+class BindBulk(Module):
+    @model
+    def rtl(self, io):
+        x = instance[4].BindLane
+        bus = wire[8]()
+        ifs = interface[4].bind_lane_if
+        clk = wire()
+        data = wire[4]()
+        connect(x, clk, dir=Dir.I)
+        connect(x/'d', bus, Map.SLICE, dir=Dir.O)
+        connect(x[2:1]/'b', data[1:0], dir=Dir.I)
+        connect(x, ifs, modport=1)
+        io > clk
+        return locals()
+
+class BindScalar(Module):
+    """ BindBulk's nets, bound one pin at a time """
+    @model
+    def rtl(self, io):
+        x = instance[4].BindLane
+        bus = wire[8]()
+        clk = wire()
+        data = wire[4]()
+        for i in range(4):
+            clk > x[i]
+        for i in range(4):
+            x[i]/'d' > bus[2 * i + 1:2 * i]
+        for i in (1, 2):
+            data[1:0] > x[i]/'b'
+        io > clk
+        return locals()
+
+def generate(module):
+    out = cStringIO.StringIO()
+    max.VerilogGenerator(miny.elaborate(module, 'rtl'), out).generate_module()
+    return out.getvalue()
+
+#-------------------------------------------------------------------------------
+class BindingTest(unittest.TestCase):
+    def test_bindings_are_not_expanded_when_bound(self):
+        mod = miny.elaborate(BindBulk, 'rtl')
+        x = mod.module_instances['x']
+        self.assertEqual(len(x.bindings), 4)
+        for scalar in x:
+            self.assertEqual((scalar.pins, scalar.intfpins), ([], []))
+            self.assertIs(scalar.bindings, x.bindings)
+
+    def test_expanded_pins(self):
+        mod = miny.elaborate(BindBulk, 'rtl')
+        x = mod.module_instances['x']
+        intfpins, pins = x[1].get_bound_pins()
+        self.assertEqual([pin.intfinst.name for pin in intfpins], ['ifs'])
+        self.assertEqual([(pin.dir, pin.net.formatted_repr()) for pin in pins],
+                         [(min.Dir.I, 'clk'), (min.Dir.O, 'bus[3:2]'),
+                          (min.Dir.I, 'data[1:0]')])
+        intfpins, pins = x[3].get_bound_pins()
+        self.assertEqual(len(pins), 2)
+
+    def test_same_output_as_scalar_binds(self):
+        bulk = generate(BindBulk).replace('BindBulk', 'BindScalar')
+        scalar = generate(BindScalar)
+        strip = lambda text: '\n'.join(line for line in text.splitlines()
+                                       if 'ifs' not in line)
+        self.assertEqual(strip(bulk), strip(scalar))
+        self.assertIn('.ifs_req                  ( ifs3_req ', bulk)
+
+    def test_bad_target(self):
+        self.assertRaises(TypeError, connect, wire(), wire())
+
+if __name__ == '__main__':
+    unittest.main()
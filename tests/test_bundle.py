@@ -0,0 +1,48 @@
+#-------------------------------------------------------------------------------
+import pickle
+import unittest
+
+from mint import min
+from mint import miny
+
+def state(wire):
+    return sorted(wire.__getstate__().items())
+
+#-------------------------------------------------------------------------------
+class BundleTest(unittest.TestCase):
+    def test_bundle_wires_are_plain_wires(self):
+        a, b, c = miny.wire.bundle(['a', ('b', 8), ('c', 0, 'unused')])
+        self.assertEqual(state(a), state(min.Wire(name='a')))
+        self.assertEqual(state(b), state(min.Wire(name='b', size=8)))
+        self.assertEqual(c.indices, None)
+        self.assertEqual(c.desc, 'unused')
+        self.assertEqual(b[3:0].formatted_repr(), 'b[3:0]')
+
+    def test_same_width_shares_indices(self):
+        a, b = miny.wire.bundle([('a', 4), ('b', 4)])
+        self.assertIs(a.indices, b.indices)
+        self.assertIs(a.indices, miny.wire[4]().indices)
+
+    def test_clones_are_new_roots(self):
+        w = miny.wire[4]('w')
+        w.desc = 'data'
+        w.template = 'p_{name}'
+        w[1]
+
+        clones = w * 3
+        self.assertEqual(len(clones), 3)
+        for clone in clones:
+            self.assertIsNot(clone, w)
+            self.assertIs(clone.parent, clone)
+            self.assertEqual(state(clone), state(w))
+            self.assertNotIn('_slices', clone.__dict__)
+        self.assertIsNot(clones[0][1], w[1])
+
+    def test_pickle_round_trip(self):
+        w, = miny.wire.bundle([('w', 2)])
+        w[0]
+        copy = pickle.loads(pickle.dumps(w, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(state(copy), state(w))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import re
+import unittest
+
+from mint import max
+from mint import miny
+from mint.miny import *
+
+class ColumnsTop(Module):
+    @model
+    def rtl(self, io):
+        a = instance[2].ColumnsLeaf
+        very_long_signal_name_that_breaks_alignment = wire[128]()
+        x = wire()
+        x.desc = "first\nsecond"
+        io > very_long_signal_name_that_breaks_alignment > a
+        a > x > a/'some_really_quite_long_port_name_here'
+        return locals()
+
+def generate():
+    mod = miny.elaborate(ColumnsTop, 'rtl')
+    out = cStringIO.StringIO()
+    max.VerilogGenerator(mod, out).generate_module()
+    return out.getvalue()
+
+#-------------------------------------------------------------------------------
+class ColumnsTest(unittest.TestCase):
+    def test_column_width(self):
+        self.assertEqual(max.column_width(['a', 'abc'], 2), 3)
+        self.assertEqual(max.column_width(['a'], 24), 24)
+        self.assertEqual(max.column_width([], 6), 6)
+
+    def test_long_names_widen_the_port_map(self):
+        text = generate()
+        rows = [line for line in text.splitlines()
+                if line.startswith('    .')]
+        self.assertEqual(len(rows), 6)
+        for sep in ('(', ')'):
+            self.assertEqual(len(set(row.index(sep) for row in rows)), 1)
+        self.assertIn('( very_long_signal_name_that_breaks_alignment[127:0] )',
+                      text)
+
+    def test_short_names_keep_the_fixed_columns(self):
+        text = generate()
+        self.assertIn('wire                    x;                      '
+                      '// first\n', text)
+        self.assertIn('\n' + ' ' * 48 + '// second\n', text)
+        self.assertTrue(re.search(r'^  input         \[127:0\]  very_long',
+                                  text, re.M))
+
+if __name__ == '__main__':
+    unittest.main()
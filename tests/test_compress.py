@@ -0,0 +1,75 @@
+#-------------------------------------------------------------------------------
+import bz2
+import cStringIO
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import zlib
+
+from mint import output
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def gunzip(data):
+    return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+
+TEXT = ''.join('wire [%d:0] w%d;\n' % (i % 32, i) for i in range(20000))
+
+#-------------------------------------------------------------------------------
+class CompressTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write_tokens(self, out):
+        for token in TEXT.split(' '):
+            out.write(token)
+            out.write(' ')
+
+    def test_small_writes_round_trip(self):
+        for codec, decompress in (('gzip', gunzip), ('bz2', bz2.decompress)):
+            out = cStringIO.StringIO()
+            with output.CompressedWriter(out, codec) as writer:
+                self.write_tokens(writer)
+            self.assertEqual(decompress(out.getvalue()),
+                             ' '.join(TEXT.split(' ')) + ' ')
+
+    def test_writer_is_not_finalized_on_error(self):
+        out = cStringIO.StringIO()
+        try:
+            with output.CompressedWriter(out, 'gzip') as writer:
+                writer.write(TEXT)
+                raise RuntimeError('generation failed')
+        except RuntimeError:
+            pass
+        self.assertRaises(zlib.error, gunzip, out.getvalue())
+
+    def test_output_file_by_extension(self):
+        path = os.path.join(self.dir, 'out.v.gz')
+        for i in range(2):
+            stats = output.WriteStats()
+            with output.OutputFile(path, stats) as out:
+                out.write(TEXT)
+            self.assertEqual((stats.written, stats.skipped), (1 - i, i))
+        with open(path, 'rb') as f:
+            self.assertEqual(gunzip(f.read()), TEXT)
+
+    def test_split_rejects_compression(self):
+        for args in (['-o', os.path.join(self.dir, 'Demo.v.gz')],
+                     ['-o', os.path.join(self.dir, 'Demo.v'), '-z', 'bz2']):
+            proc = subprocess.Popen(
+                [sys.executable, '-m', 'mint', 'gen', '-d', 'demo', 'Demo',
+                 'rtl', '--split', '1k'] + args,
+                cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            out, err = proc.communicate()
+            self.assertEqual(proc.returncode, 1)
+            self.assertIn('--split', err)
+        self.assertEqual(os.listdir(self.dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
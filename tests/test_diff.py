@@ -0,0 +1,114 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import bench
+import demo
+from mint import diff
+from mint import min
+from mint import miny
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN = os.path.join(ROOT, 'tests', 'golden')
+
+def mint(*args):
+    proc = subprocess.Popen([sys.executable, '-m', 'mint'] + list(args),
+                            cwd=ROOT, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    out, err = proc.communicate()
+    return proc.returncode, out, err
+
+def bench_netlist(lanes, depth):
+    bench.BenchTop.lanes = lanes
+    bench.BenchTile.depth = depth
+    return diff.Netlist.from_module(miny.elaborate(bench.BenchTop, 'rtl'))
+
+#-------------------------------------------------------------------------------
+class DiffTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.saved = (bench.BenchTop.lanes, bench.BenchTop.core,
+                      bench.BenchTile.depth)
+        bench.BenchTop.core = 'BenchTile'
+
+    def tearDown(self):
+        (bench.BenchTop.lanes, bench.BenchTop.core,
+         bench.BenchTile.depth) = self.saved
+        shutil.rmtree(self.dir)
+
+    def save(self, netlist, name):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w') as f:
+            netlist.save(f)
+        return path
+
+    def test_identical_subtrees_are_stored_once(self):
+        netlist = bench_netlist(4, 2)
+        self.assertEqual(sorted(record.name
+                                for record in netlist.modules.values()),
+                         ['BenchReg', 'BenchTile', 'BenchTop'])
+        self.assertEqual(diff.diff(netlist, bench_netlist(4, 2)), [])
+
+    def test_save_and_load(self):
+        netlist = bench_netlist(2, 2)
+        f = cStringIO.StringIO()
+        netlist.save(f)
+        f.seek(0)
+        loaded = diff.Netlist.load(f)
+        self.assertEqual(loaded.top, netlist.top)
+        self.assertEqual(diff.diff(loaded, netlist), [])
+
+        f = cStringIO.StringIO('{"format": 1}')
+        self.assertRaises(min.MintValueError, diff.Netlist.load, f)
+
+    def test_changes(self):
+        changes = diff.diff(bench_netlist(2, 2), bench_netlist(2, 3))
+        self.assertEqual(diff.format_changes(changes),
+                         '+ instance   BenchTop/cores0/regs2: BenchReg\n'
+                         '+ instance   BenchTop/cores1/regs2: BenchReg\n')
+
+        changes = diff.diff(bench_netlist(2, 3), bench_netlist(3, 3))
+        self.assertEqual(diff.format_changes(changes),
+                         '+ port       BenchTop/ifs2_ack: output [1]\n'
+                         '+ port       BenchTop/ifs2_data: input [32]\n'
+                         '+ port       BenchTop/ifs2_req: input [1]\n'
+                         '+ instance   BenchTop/cores2: BenchTile\n')
+
+    def test_directions_as_emitted(self):
+        netlist = diff.Netlist.from_module(miny.elaborate('Demo', 'rtl'))
+        with open(os.path.join(GOLDEN, 'Demo.v')) as f:
+            emitted = dict((name, dir) for dir, name in re.findall(
+                r'^[ ,] (input|output|inout)\s.*?(\w+)$', f.read(), re.M))
+        ports = netlist.modules[netlist.top].ports
+        self.assertEqual(dict((name, dir) for name, dir, width in ports),
+                         emitted)
+
+    def test_cli(self):
+        old = self.save(bench_netlist(2, 2), 'old.json')
+        new = self.save(bench_netlist(2, 3), 'new.json')
+
+        status, out, err = mint('diff', old, old)
+        self.assertEqual((status, out), (0, ''), err)
+        status, out, err = mint('diff', old, new)
+        self.assertEqual(status, 1, err)
+        self.assertEqual(len(out.splitlines()), 2)
+
+        path = os.path.join(self.dir, 'demo.json')
+        status, out, err = mint('netlist', '-d', 'demo', 'Demo', 'rtl',
+                                '-o', path)
+        self.assertEqual(status, 0, err)
+        status, out, err = mint('diff', '-d', 'demo', path, 'Demo:rtl')
+        self.assertEqual((status, out), (0, ''), err)
+
+        status, out, err = mint('diff', path, 'nonsense')
+        self.assertEqual(status, 1)
+        self.assertIn('neither a netlist file nor MODULE:MODEL', err)
+
+if __name__ == '__main__':
+    unittest.main()
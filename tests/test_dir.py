@@ -0,0 +1,90 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import unittest
+
+import demo
+from mint import max
+from mint import min
+from mint import miny
+from mint.miny import *
+
+class dir_polarity_if(Interface):
+    @model
+    def rtl(self, a, b):
+        req, ack = wire() * 2
+        a > req > b
+        b > ack > a
+        return locals()
+
+class DirPolarity(Module):
+    @model
+    def rtl(self, io):
+        u = instance.DirPolarityLeaf
+        link = interface.dir_polarity_if
+        # Both through modport a: io from the inside, u from the outside
+        io == link
+        u == link
+        return locals()
+
+#-------------------------------------------------------------------------------
+class DirectionTest(unittest.TestCase):
+    def test_codes(self):
+        dirs = (min.Dir.I, min.Dir.O, min.Dir.IO, min.Dir.ANY)
+        self.assertEqual(dirs, (0, 1, 2, 3))
+        self.assertEqual([min.Dir.NAMES[dir] for dir in dirs],
+                         ['input', 'output', 'inout', '_any_dir_'])
+        self.assertEqual([min.Dir.INVERSE[min.Dir.INVERSE[dir]]
+                          for dir in dirs], list(dirs))
+
+    def test_effective_dir_is_set_at_bind_time(self):
+        port = min.ModInstScalar(module=miny.PORT_MODULE, name='io')
+        port.isport = True
+        inst = min.ModInstScalar(module=min.Module(name='M'), name='m')
+        w = miny.wire()
+        port > w > inst
+
+        port_pin, = port.pins
+        inst_pin, = inst.pins
+        self.assertEqual((port_pin.dir, port_pin.effective_dir),
+                         (min.Dir.O, min.Dir.I))
+        self.assertEqual((inst_pin.dir, inst_pin.effective_dir),
+                         (min.Dir.I, min.Dir.I))
+
+    def test_interface_pins_take_the_side_they_are_bound_on(self):
+        mod = miny.elaborate('Demo', 'rtl')
+        port_inst = mod.module_instances['io']
+        a = mod.module_instances['a']
+
+        # io == A_IF through modport a, a through modport b: cmd goes from
+        # the module inputs into instance a
+        port_dirs = dict((pin.fname, pin.effective_dir)
+                         for pin in port_inst.get_pins())
+        self.assertEqual(port_dirs['A_IF_cmd'], min.Dir.I)
+        self.assertEqual(port_dirs['A_IF_resp'], min.Dir.O)
+        inst_dirs = dict((pin.fname, pin.effective_dir) for pin in a.get_pins())
+        self.assertEqual(inst_dirs['A_IF_cmd'], min.Dir.I)
+        self.assertEqual(inst_dirs['A_IF_resp'], min.Dir.O)
+
+    def test_one_modport_bound_both_ways(self):
+        mod = miny.elaborate(DirPolarity, 'rtl')
+        port_pins = mod.module_instances['io'].get_pins()
+        inst_pins = mod.module_instances['u'].get_pins()
+
+        # Each expansion keeps its own directions, whichever came last
+        self.assertEqual([(pin.fname, pin.effective_dir) for pin in port_pins],
+                         [('link_req', min.Dir.I), ('link_ack', min.Dir.O)])
+        self.assertEqual([(pin.fname, pin.effective_dir) for pin in inst_pins],
+                         [('link_req', min.Dir.O), ('link_ack', min.Dir.I)])
+
+    def test_generation_does_not_invert_directions(self):
+        class Generator(max.VerilogGenerator):
+            def invert_dir(self, dir):
+                raise AssertionError("direction inverted at emission")
+
+        out = cStringIO.StringIO()
+        Generator(miny.elaborate('Demo', 'rtl'), out).generate_module()
+        self.assertIn(', input          [1:0]  A_IF_cmd', out.getvalue())
+        self.assertIn(', output                so', out.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
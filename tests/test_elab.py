@@ -0,0 +1,78 @@
+#-------------------------------------------------------------------------------
+import sys
+import unittest
+
+from mint import elab
+from mint import miny
+from mint.miny import *
+
+class elab_leaf_if(Interface):
+    @model
+    def rtl(self, a, b):
+        x = wire()
+        a > x > b
+        return locals()
+
+class ElabLeaf(Module):
+    @model
+    def rtl(self, io):
+        i = interface.elab_leaf_if
+        return locals()
+
+class ElabMid(Module):
+    @model
+    def rtl(self, io):
+        l = instance[2].ElabLeaf
+        return locals()
+
+class ElabTop(Module):
+    @model
+    def rtl(self, io):
+        m = instance.ElabMid
+        return locals()
+
+# A chain of modules deeper than the recursion limit
+DEPTH = sys.getrecursionlimit() + 500
+for i in range(DEPTH):
+    exec '''class ElabDeep%d(Module):
+    @model
+    def rtl(self, io):
+        d = instance.ElabDeep%d
+        return locals()
+''' % (i, i + 1)
+
+#-------------------------------------------------------------------------------
+class ElaboratorTest(unittest.TestCase):
+    def test_graph(self):
+        elaborator = elab.Elaborator()
+        top = miny.elaborate('ElabTop', 'rtl', elaborator=elaborator)
+        self.assertEqual([type(obj).__name__ for obj, model in elaborator.nodes],
+                         ['ElabTop', 'ElabMid', 'ElabLeaf', 'ElabLeaf',
+                          'elab_leaf_if', 'elab_leaf_if'])
+        self.assertEqual(len(elaborator.subtree(top, 'rtl')), 6)
+
+        parents = elaborator.parents()
+        self.assertEqual(len(parents), 5)
+        mid = top.module_instances['m'].module
+        leaf = mid.module_instances['l'][1].module
+        self.assertEqual(parents[elaborator.key(leaf, 'rtl')], [(mid, 'rtl')])
+        self.assertEqual(set(cls.__name__ for cls in elaborator.classes()),
+                         set(['ElabTop', 'ElabMid', 'ElabLeaf',
+                              'elab_leaf_if']))
+
+    def test_every_object_is_built(self):
+        top = miny.elaborate('ElabTop', 'rtl')
+        leaf = top.module_instances['m'].module.module_instances['l'][0].module
+        intf = leaf.interface_instances['i'].interface
+        self.assertEqual(intf.module_instances.keys(), ['a', 'b'])
+        pin, = intf.module_instances['b'].get_pins()
+        self.assertEqual(pin.net.name, 'x')
+
+    def test_deeper_than_the_recursion_limit(self):
+        elaborator = elab.Elaborator()
+        miny.elaborate('ElabDeep0', 'rtl', elaborator=elaborator)
+        # The last class is auto created as an empty leaf
+        self.assertEqual(len(elaborator.nodes), DEPTH + 1)
+
+if __name__ == '__main__':
+    unittest.main()
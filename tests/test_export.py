@@ -0,0 +1,84 @@
+#-------------------------------------------------------------------------------
+import os
+import re
+import unittest
+
+import demo
+from mint import export
+from mint import miny
+
+GOLDEN = os.path.join(os.path.dirname(__file__), 'golden')
+
+#-------------------------------------------------------------------------------
+class ConnectivityTest(unittest.TestCase):
+    def setUp(self):
+        self.mod = miny.elaborate('Demo', 'rtl')
+        self.conn = export.connectivity(self.mod)
+
+    def test_sizes(self):
+        conn = self.conn
+        self.assertEqual((conn.num_insts, conn.num_nets, conn.num_pins),
+                         (5, 18, 36))
+        sizes = {'inst_module': conn.num_insts,
+                 'inst_ptr': conn.num_insts + 1,
+                 'net_ptr': conn.num_nets + 1,
+                 'net_pins': conn.num_pins}
+        for name, arr in conn.arrays().items():
+            if name.startswith('net_'):
+                size = sizes.get(name, conn.num_nets)
+            else:
+                size = sizes.get(name, conn.num_pins)
+            self.assertEqual(len(arr), size, name)
+        self.assertEqual(conn.tables().keys(), list(export.TABLES))
+
+    def test_instance_pins_match_the_port_maps(self):
+        with open(os.path.join(GOLDEN, 'Demo.v')) as f:
+            text = f.read()
+        conn = self.conn
+        for i, name in enumerate(conn.inst_names):
+            body = re.search(r'^\w+ %s \((.*?)\);' % name, text,
+                             re.M | re.S).group(1)
+            rows = re.findall(r'\.(\w+)\s+\( (\S+)\s+\)', body)
+            pins = range(conn.inst_ptr[i], conn.inst_ptr[i + 1])
+            self.assertEqual([(conn.port_names[conn.pin_port[p]],
+                               conn.net_names[conn.pin_net[p]])
+                              for p in pins], rows)
+
+    def test_net_pins_invert_pin_net(self):
+        conn = self.conn
+        seen = []
+        for n in range(conn.num_nets):
+            pins = conn.net_pins[conn.net_ptr[n]:conn.net_ptr[n + 1]]
+            self.assertEqual(list(pins), sorted(pins))
+            for p in pins:
+                self.assertEqual(conn.pin_net[p], n)
+            seen.extend(pins)
+        self.assertEqual(sorted(seen), range(conn.num_pins))
+
+    def test_nets(self):
+        conn = self.conn
+        n = conn.net_names.index('smid[1]')
+        self.assertEqual((conn.net_width[n], conn.net_lsb[n]), (1, 1))
+        self.assertEqual(conn.wire_names[conn.net_wire[n]], 'smid')
+        self.assertEqual(conn.net_isport[n], 0)
+        self.assertEqual(conn.net_isport[conn.net_names.index('clk')], 1)
+
+    def test_ports_instance_first(self):
+        conn = export.connectivity(self.mod, ports=True)
+        self.assertEqual(conn.inst_names[0], 'io')
+        self.assertEqual(conn.module_names[conn.inst_module[0]], '_port_')
+        self.assertEqual(conn.inst_names[1:], self.conn.inst_names)
+
+    @unittest.skipIf(export.numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        arrays = self.conn.to_numpy()
+        self.assertEqual(arrays['pin_net'].tolist(),
+                         self.conn.pin_net.tolist())
+        self.assertEqual(arrays['pin_dir'].dtype.itemsize, 1)
+
+    @unittest.skipIf(export.numpy is not None, 'numpy is installed')
+    def test_numpy_missing(self):
+        self.assertRaises(ImportError, self.conn.to_numpy)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import gc
+import unittest
+import weakref
+
+import bench
+import demo
+from mint import max
+from mint import miny
+
+def build_and_generate(module):
+    mod = miny.elaborate(module, 'rtl')
+    max.VerilogGenerator(mod, cStringIO.StringIO()).generate_module()
+    return weakref.ref(mod)
+
+#-------------------------------------------------------------------------------
+class ReferenceCycleTest(unittest.TestCase):
+    def setUp(self):
+        self.enabled = gc.isenabled()
+        gc.collect()
+        gc.disable()
+
+    def tearDown(self):
+        if self.enabled:
+            gc.enable()
+
+    def assertFreedByRefcount(self, module):
+        # Warm up the caches (auto created classes, etc.) first
+        build_and_generate(module)
+        gc.collect()
+
+        ref = build_and_generate(module)
+        self.assertIsNone(ref())
+        self.assertEqual(gc.collect(), 0)
+
+    def test_demo(self):
+        self.assertFreedByRefcount('Demo')
+
+    def test_bench(self):
+        lanes = bench.BenchTop.lanes
+        bench.BenchTop.lanes = 8
+        try:
+            self.assertFreedByRefcount(bench.BenchTop)
+        finally:
+            bench.BenchTop.lanes = lanes
+
+if __name__ == '__main__':
+    unittest.main()
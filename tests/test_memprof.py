@@ -0,0 +1,50 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import json
+import unittest
+
+import demo
+from mint import memprof
+from mint import miny
+
+def verilog(**kwargs):
+    out = cStringIO.StringIO()
+    miny.verilog('Demo', 'rtl', out, **kwargs)
+    return out.getvalue()
+
+#-------------------------------------------------------------------------------
+class MemoryProfileTest(unittest.TestCase):
+    def test_phases(self):
+        profile = memprof.MemoryProfile()
+        with profile:
+            text = verilog(profile=profile)
+        self.assertEqual([record['phase'] for record in profile.phases],
+                         ['elaborate', 'ports', 'intfpins', 'wires',
+                          'instances'])
+        self.assertEqual(text, verilog())
+
+        intfpins = profile.phases[2]
+        self.assertGreater(intfpins['objects']['IntfPin'], 0)
+        self.assertGreater(intfpins['gc_objects'], 0)
+
+    def test_stream_phases(self):
+        profile = memprof.MemoryProfile()
+        with profile:
+            text = verilog(profile=profile, stream=True)
+        self.assertEqual([record['phase'] for record in profile.phases],
+                         ['elaborate', 'stream'])
+        self.assertEqual(text, verilog())
+
+    def test_report(self):
+        profile = memprof.MemoryProfile()
+        with profile:
+            verilog(profile=profile)
+        out = cStringIO.StringIO()
+        profile.save(out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['format'], memprof.FORMAT_VERSION)
+        self.assertEqual(len(report['phases']), 5)
+        self.assertEqual(len(profile.format_summary().splitlines()), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#-------------------------------------------------------------------------------
+import unittest
+
+from mint import min
+from mint import miny
+from mint.miny import *
+
+class ModelModule(Module):
+    @model
+    def rtl(self, clk, data, out):
+        """ Model docstring """
+        w = wire()
+        clk > w
+        return locals()
+
+    @model
+    def broken(self, io):
+        pass
+
+#-------------------------------------------------------------------------------
+class ModelTest(unittest.TestCase):
+    def test_port_names_are_read_once(self):
+        descriptor = ModelModule.__dict__['rtl']
+        self.assertEqual(descriptor.port_names, ('clk', 'data', 'out'))
+        self.assertEqual(descriptor.name, 'rtl')
+
+    def test_one_callable_for_every_object(self):
+        a = ModelModule()
+        b = ModelModule()
+        self.assertIs(a.rtl, b.rtl)
+        self.assertIs(a.rtl, ModelModule.rtl)
+        self.assertEqual(a.rtl.__name__, 'rtl')
+        self.assertEqual(a.rtl.__doc__, ' Model docstring ')
+
+    def test_build(self):
+        mod = ModelModule(model='rtl')
+        self.assertEqual(mod.port_at_pos, ('clk', 'data', 'out'))
+        for name in mod.port_at_pos:
+            port = mod.module_instances[name]
+            self.assertTrue(port.isport)
+            self.assertIs(port.module, miny.PORT_MODULE)
+
+        # Unnamed locals take the name of their variable
+        func_locals = ModelModule.__dict__['rtl'].build(ModelModule())
+        self.assertEqual(func_locals['w'].name, 'w')
+
+        # Each build gets its own port instances
+        other = ModelModule(model='rtl')
+        self.assertIsNot(other.module_instances['clk'],
+                         mod.module_instances['clk'])
+
+    def test_missing_return_locals(self):
+        with self.assertRaises(min.MintError) as caught:
+            ModelModule(model='broken')
+        self.assertIn("Missing 'return locals()' for broken model of "
+                      "ModelModule", str(caught.exception))
+
+    def test_unknown_model(self):
+        self.assertRaises(min.MintModelDoesNotExist, ModelModule,
+                          model='nope')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#-------------------------------------------------------------------------------
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from mint import output
+
+#-------------------------------------------------------------------------------
+class OutputFileTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'out.v')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, text, stats=None):
+        with output.OutputFile(self.path, stats) as out:
+            out.write(text)
+        return out
+
+    def mode(self):
+        return stat.S_IMODE(os.stat(self.path).st_mode)
+
+    def test_mode_follows_umask(self):
+        for umask in (022, 077):
+            old = os.umask(umask)
+            try:
+                self.write('umask %o\n' % umask)
+            finally:
+                os.umask(old)
+            self.assertEqual(self.mode(), 0666 & ~umask)
+            os.unlink(self.path)
+
+    def test_replaced_file_keeps_its_mode(self):
+        self.write('old\n')
+        for mode in (0664, 0444):
+            os.chmod(self.path, mode)
+            self.assertTrue(self.write('mode %o\n' % mode).changed)
+            self.assertEqual(self.mode(), mode)
+
+    def test_unchanged_content_keeps_the_file(self):
+        stats = output.WriteStats()
+        self.write('same\n', stats)
+        os.utime(self.path, (1, 1))
+        out = self.write('same\n', stats)
+        self.assertFalse(out.changed)
+        self.assertEqual(os.stat(self.path).st_mtime, 1)
+        out = self.write('new\n', stats)
+        self.assertTrue(out.changed)
+        self.assertEqual((stats.written, stats.skipped), (2, 1))
+        self.assertEqual(os.listdir(self.dir), ['out.v'])
+
+    def test_error_leaves_the_old_file(self):
+        self.write('old\n')
+        try:
+            with output.OutputFile(self.path) as out:
+                out.write('partial')
+                raise RuntimeError('generation failed')
+        except RuntimeError:
+            pass
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'old\n')
+        self.assertEqual(os.listdir(self.dir), ['out.v'])
+
+    def test_temp_files_do_not_collide(self):
+        temps = [output.temp_file(self.path) for i in range(20)]
+        for fd, path in temps:
+            os.close(fd)
+        self.assertEqual(len(set(path for fd, path in temps)), 20)
+
+if __name__ == '__main__':
+    unittest.main()
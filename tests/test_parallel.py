@@ -0,0 +1,54 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import unittest
+
+import bench
+from mint import elab
+from mint import max
+from mint import min
+from mint import miny
+
+def dump(elaborator):
+    """ Generate every module with instances, in elaboration order """
+    miny.elaborate(bench.BenchTop, 'rtl', elaborator=elaborator)
+    out = cStringIO.StringIO()
+    for obj, model in elaborator.nodes:
+        if isinstance(obj, min.Module) and obj.module_instances:
+            max.VerilogGenerator(obj, out).generate_module()
+    return out.getvalue()
+
+#-------------------------------------------------------------------------------
+class ParallelTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = (bench.BenchTop.lanes, bench.BenchTop.core,
+                      bench.BenchTile.depth)
+        bench.BenchTop.lanes = 8
+        bench.BenchTop.core = 'BenchTile'
+        bench.BenchTile.depth = 4
+
+    def tearDown(self):
+        (bench.BenchTop.lanes, bench.BenchTop.core,
+         bench.BenchTile.depth) = self.saved
+
+    def test_same_result_as_serial(self):
+        serial = elab.Elaborator()
+        parallel = elab.ParallelElaborator(3)
+        text = dump(serial)
+        self.assertEqual(dump(parallel), text)
+        self.assertIn('BenchReg regs3 (', text)
+
+        self.assertEqual(len(parallel.nodes), len(serial.nodes))
+        self.assertEqual(sorted(cls.__name__ for cls in parallel.classes()),
+                         sorted(cls.__name__ for cls in serial.classes()))
+        # Everything under the top came back from the workers
+        self.assertEqual(len(parallel.built), 8 * (1 + 4))
+
+    def test_generated_top(self):
+        plain = cStringIO.StringIO()
+        miny.verilog(bench.BenchTop, 'rtl', plain)
+        jobs = cStringIO.StringIO()
+        miny.verilog(bench.BenchTop, 'rtl', jobs, jobs=2)
+        self.assertEqual(jobs.getvalue(), plain.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#-------------------------------------------------------------------------------
+import unittest
+
+import demo
+from mint import min
+from mint import miny
+from mint import query
+from mint.miny import *
+
+class QueryTop(Module):
+    @model
+    def rtl(self, io):
+        src = instance.QuerySrc
+        lo = instance.QuerySink
+        mid = instance.QuerySink
+        hi = instance.QuerySink
+        bus = wire[4]()
+        src > bus
+        bus[1] > lo
+        bus[2:1] > mid
+        bus[3] > hi
+        return locals()
+
+def names(endpoints):
+    return [(endpoint.inst, endpoint.port) for endpoint in endpoints]
+
+#-------------------------------------------------------------------------------
+class QueryTest(unittest.TestCase):
+    def setUp(self):
+        self.index = query.NetlistIndex(miny.elaborate('Demo', 'rtl'))
+
+    def test_drivers_and_fanout(self):
+        self.assertEqual(self.index.drivers('w2'),
+                         [query.Endpoint('a', 'w2', 'output', 'w2')])
+        self.assertEqual(names(self.index.fanout('w2')),
+                         [('c', 'p2'), ('d', 'w2')])
+        self.assertEqual(names(self.index.pins('w2')),
+                         [('a', 'w2'), ('c', 'p2'), ('d', 'w2')])
+
+    def test_ports_drive_the_module_inputs(self):
+        self.assertEqual(self.index.drivers('clk'),
+                         [query.Endpoint('io', 'CLK_IF_clk', 'output', 'clk')])
+        self.assertEqual(names(self.index.fanout('so')), [('io', 'so')])
+
+    def test_fanin(self):
+        self.assertEqual(self.index.fanin('b1', 'si'),
+                         [query.Endpoint('b0', 'so', 'output', 'smid[1]')])
+        fanin = names(self.index.fanin('b1'))
+        self.assertIn(('a', 'AB_IF1_data'), fanin)
+        self.assertIn(('io', 'w1'), fanin)
+        self.assertNotIn('b1', [inst for inst, port in fanin])
+
+    def test_bfs(self):
+        self.assertEqual(self.index.bfs('io', 3).items(),
+                         [('io', 0), ('a', 1), ('b0', 1), ('b1', 1),
+                          ('c', 2), ('d', 2)])
+        self.assertEqual(self.index.bfs('b1', 2, query.BACKWARD).items(),
+                         [('b1', 0), ('io', 1), ('a', 1), ('b0', 1)])
+        self.assertEqual(self.index.bfs('c', 1, query.BOTH).keys()[:2],
+                         ['c', 'a'])
+        self.assertEqual(self.index.bfs('c', 0).items(), [('c', 0)])
+
+    def test_unknown_names(self):
+        self.assertRaises(min.MintValueError, self.index.fanout, 'nope')
+        self.assertRaises(min.MintValueError, self.index.fanin, 'nope')
+        self.assertRaises(min.MintValueError, self.index.bfs, 'c', 1, 'up')
+
+    def test_overlapping_slices_are_one_net(self):
+        index = query.NetlistIndex(miny.elaborate(QueryTop, 'rtl'))
+        self.assertEqual(names(index.fanout('bus[3:0]')),
+                         [('lo', 'bus'), ('mid', 'bus'), ('hi', 'bus')])
+        self.assertEqual(names(index.drivers('bus[2:1]')), [('src', 'bus')])
+        self.assertEqual(names(index.fanout('bus[1]')),
+                         [('lo', 'bus'), ('mid', 'bus')])
+        self.assertEqual(index.bfs('lo', 2, query.BACKWARD).keys(),
+                         ['lo', 'src'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#-------------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import demo
+from mint import server
+
+GOLDEN = os.path.join(os.path.dirname(__file__), 'golden')
+
+#-------------------------------------------------------------------------------
+class ServerTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.socket = os.path.join(self.dir, 'mint.sock')
+        self.server = server.GenerationServer(self.socket, ['demo'])
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       kwargs={'poll_interval': 0.05})
+        self.thread.daemon = True
+        self.thread.start()
+        self.client = server.Client(self.socket)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.dir)
+
+    def golden(self):
+        with open(os.path.join(GOLDEN, 'Demo.v')) as f:
+            return f.read()
+
+    def test_text_response(self):
+        for i in range(2):
+            response = self.client.request('Demo', 'rtl')
+            self.assertEqual(response['status'], 'ok')
+            self.assertEqual(response['text'], self.golden())
+            self.assertEqual(sorted(response['timings']),
+                             ['elaborate', 'generate'])
+
+    def test_written_to_path(self):
+        path = os.path.join(self.dir, 'Demo.v')
+        self.assertTrue(self.client.request('Demo', 'rtl', path)['written'])
+        self.assertFalse(self.client.request('Demo', 'rtl', path)['written'])
+        with open(path) as f:
+            self.assertEqual(f.read(), self.golden())
+
+    def test_error_keeps_the_connection(self):
+        response = self.client.request('NoSuchModule', 'rtl')
+        self.assertEqual(response['status'], 'error')
+        self.assertIn('NoSuchModule', response['error'])
+        self.assertEqual(self.client.request('Demo', 'rtl')['status'], 'ok')
+
+    def test_socket_removed_on_close(self):
+        self.assertTrue(os.path.exists(self.socket))
+        self.server.server_close()
+        self.assertFalse(os.path.exists(self.socket))
+
+if __name__ == '__main__':
+    unittest.main()
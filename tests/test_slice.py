@@ -0,0 +1,42 @@
+#-------------------------------------------------------------------------------
+import pickle
+import unittest
+
+from mint import miny
+
+#-------------------------------------------------------------------------------
+class SliceTest(unittest.TestCase):
+    def test_slices_are_interned(self):
+        bus = miny.wire[8]('bus')
+        self.assertIs(bus[0], bus[0])
+        self.assertIs(bus[3:0], bus[3:0])
+        self.assertIs(bus[3:0][1], bus[1])
+
+    def test_naming_a_slice_leaves_the_shared_one_alone(self):
+        bus = miny.wire[8]('bus')
+        shared = bus[0]
+        named = bus[0]('x')
+        self.assertIsNot(named, shared)
+        self.assertEqual(named.name, 'x')
+        self.assertEqual(named.formatted_repr(), 'x[0]')
+        self.assertEqual(shared.formatted_repr(), 'bus[0]')
+        self.assertIs(bus[0], shared)
+
+    def test_changes_do_not_leak_into_later_slices(self):
+        bus = miny.wire[8]('bus')
+        first = bus[1]
+        first.template = 'p_{name}'
+        first.desc = 'lane 1'
+        later = bus[1]
+        self.assertIsNot(later, first)
+        self.assertEqual(later.formatted_repr(), 'bus[1]')
+        self.assertFalse(hasattr(later, 'desc'))
+        self.assertEqual(first.formatted_repr(), 'p_bus[1]')
+
+    def test_pickled_slice(self):
+        bus = miny.wire[4]('bus')
+        copy = pickle.loads(pickle.dumps(bus[2:1], pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(copy.formatted_repr(), 'bus[2:1]')
+
+if __name__ == '__main__':
+    unittest.main()
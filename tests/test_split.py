@@ -0,0 +1,115 @@
+#-------------------------------------------------------------------------------
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import demo
+from mint import miny
+from mint import output
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN = os.path.join(ROOT, 'tests', 'golden')
+
+def mint(*args):
+    proc = subprocess.Popen([sys.executable, '-m', 'mint'] + list(args),
+                            cwd=ROOT, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    out, err = proc.communicate()
+    return proc.returncode, out, err
+
+def golden(name):
+    with open(os.path.join(GOLDEN, name)) as f:
+        return f.read()
+
+#-------------------------------------------------------------------------------
+class SplitTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'Demo.v')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def read(self, name):
+        with open(os.path.join(self.dir, name)) as f:
+            return f.read()
+
+    def expanded(self, name='Demo.v'):
+        """ The main file with its `includes replaced by their content """
+        return re.sub(r'^`include "(.*)"\n',
+                      lambda match: self.read(match.group(1)),
+                      self.read(name), flags=re.M)
+
+    def split(self, limit, **kwargs):
+        stats = output.WriteStats()
+        with output.SplitOutput(self.path, limit, stats) as out:
+            miny.verilog('Demo', 'rtl', out, **kwargs)
+        return out, stats
+
+    def test_expands_to_the_flat_output(self):
+        for limit in (1, 1024, 1 << 20):
+            self.split(limit)
+            self.assertEqual(self.expanded(), golden('Demo.v'))
+        self.split(1024, sv=True)
+        self.assertEqual(self.expanded(), golden('Demo.sv'))
+
+    def test_manifest(self):
+        out, stats = self.split(1024)
+        manifest = json.loads(self.read('Demo.manifest.json'))
+        self.assertEqual(manifest['main'], 'Demo.v')
+        self.assertEqual(manifest['limit'], 1024)
+        files = manifest['files']
+        self.assertEqual([entry['section'] for entry in files],
+                         ['main', 'wires', 'instances', 'instances',
+                          'instances'])
+        for entry in files:
+            text = self.read(entry['path'])
+            self.assertEqual(entry['bytes'], len(text))
+            self.assertEqual(entry['sha1'], hashlib.sha1(text).hexdigest())
+        # Parts end on boundaries: no instance is cut in two
+        for entry in files[2:]:
+            self.assertTrue(self.read(entry['path']).endswith(');\n'))
+
+    def test_rerun_skips_unchanged_and_removes_stale_parts(self):
+        out, stats = self.split(1)
+        parts = sorted(os.listdir(self.dir))
+        self.assertEqual(stats.skipped, 0)
+
+        out, stats = self.split(1)
+        self.assertEqual((stats.written, stats.skipped), (0, len(parts)))
+
+        self.split(1 << 20)
+        self.assertEqual(sorted(os.listdir(self.dir)),
+                         ['Demo.instances0.vh', 'Demo.manifest.json',
+                          'Demo.v', 'Demo.wires0.vh'])
+
+    def test_cli(self):
+        status, out, err = mint('gen', '-d', 'demo', 'Demo', 'rtl',
+                                '-o', self.path, '--split', '1k',
+                                '--write-jobs', '2')
+        self.assertEqual(status, 0, err)
+        self.assertEqual(self.expanded(), golden('Demo.v'))
+
+        status, out, err = mint('gen', '-d', 'demo', 'Demo', 'rtl',
+                                '--split', '1k')
+        self.assertEqual(status, 1)
+        self.assertIn('needs an output file', err)
+
+        status, out, err = mint('gen', '-d', 'demo', 'Demo', 'rtl',
+                                '-o', self.path, '--split', '1k', '--stream')
+        self.assertEqual(status, 1)
+        self.assertIn('--stream', err)
+
+    def test_parse_size(self):
+        self.assertEqual(output.parse_size('4M'), 4 << 20)
+        self.assertEqual(output.parse_size('1k'), 1024)
+        self.assertEqual(output.parse_size('100'), 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#-------------------------------------------------------------------------------
+import collections
+import json
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+import demo
+from mint import miny
+from mint import stats
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN = os.path.join(ROOT, 'tests', 'golden')
+
+def mint(*args):
+    proc = subprocess.Popen([sys.executable, '-m', 'mint'] + list(args),
+                            cwd=ROOT, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    out, err = proc.communicate()
+    return proc.returncode, out, err
+
+#-------------------------------------------------------------------------------
+class StatsTest(unittest.TestCase):
+    def setUp(self):
+        self.per_module, self.total = stats.design_stats(
+            miny.elaborate('Demo', 'rtl'))
+
+    def test_counts_match_the_generated_module(self):
+        with open(os.path.join(GOLDEN, 'Demo.v')) as f:
+            text = f.read()
+        demo_counts = self.per_module['Demo']
+        self.assertEqual(demo_counts['wires'],
+                         len(re.findall(r'^wire', text, re.M)))
+        self.assertEqual(demo_counts['ports'],
+                         len(re.findall(r'^[ ,] (input|output|inout)',
+                                        text, re.M)))
+        self.assertEqual(demo_counts['instances'],
+                         len(re.findall(r'^[A-Z]\w* \w+ \(', text, re.M)))
+        self.assertEqual(
+            sum(demo_counts[field] for field in stats.DIR_FIELDS),
+            len(re.findall(r'^    \.', text, re.M)))
+
+    def test_per_module_and_total(self):
+        self.assertEqual(self.per_module.keys(), ['Demo', 'A', 'C', 'B', 'D'])
+        self.assertEqual(self.per_module['B']['modules'], 2)
+        self.assertEqual(self.total['modules'], 6)
+        for field in stats.FIELDS:
+            self.assertEqual(self.total[field],
+                             sum(counts[field]
+                                 for counts in self.per_module.values()))
+
+    def test_cli(self):
+        status, out, err = mint('stats', '-d', 'demo', 'Demo', 'rtl')
+        self.assertEqual(status, 0, err)
+        lines = out.splitlines()
+        self.assertEqual(lines[0].split(), ['module'] + list(stats.FIELDS))
+        self.assertEqual(lines[-1].split()[0], 'TOTAL')
+
+        status, out, err = mint('stats', '-d', 'demo', 'Demo', 'rtl', '--json')
+        self.assertEqual(status, 0, err)
+        report = json.loads(out, object_pairs_hook=collections.OrderedDict)
+        self.assertEqual(report['total']['wires'], self.total['wires'])
+        self.assertEqual(report['modules'].keys(), self.per_module.keys())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import os
+import subprocess
+import sys
+import unittest
+
+import bench
+import demo
+from mint import min
+from mint import miny
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN = os.path.join(os.path.dirname(__file__), 'golden')
+
+def verilog(module, **kwargs):
+    out = cStringIO.StringIO()
+    miny.verilog(module, 'rtl', out, **kwargs)
+    return out.getvalue()
+
+#-------------------------------------------------------------------------------
+class StreamTest(unittest.TestCase):
+    def test_demo_matches_golden(self):
+        with open(os.path.join(GOLDEN, 'Demo.v')) as f:
+            golden = f.read()
+        self.assertEqual(verilog('Demo'), golden)
+        self.assertEqual(verilog('Demo', stream=True), golden)
+
+    def test_bench_streams_the_same_bytes(self):
+        lanes = bench.BenchTop.lanes
+        bench.BenchTop.lanes = 8
+        try:
+            plain = verilog(bench.BenchTop)
+            streamed = verilog(bench.BenchTop, stream=True)
+        finally:
+            bench.BenchTop.lanes = lanes
+        self.assertEqual(streamed, plain)
+        self.assertIn('BenchCore cores7 (', plain)
+
+    def test_sv_streams_the_same_bytes(self):
+        self.assertEqual(verilog('Demo', sv=True, stream=True),
+                         verilog('Demo', sv=True))
+
+    def test_jobs_are_rejected(self):
+        self.assertRaises(min.MintValueError, verilog, 'Demo', stream=True,
+                          jobs=2)
+        proc = subprocess.Popen(
+            [sys.executable, '-m', 'mint', 'gen', '-d', 'demo', 'Demo', 'rtl',
+             '--stream', '-j', '2'],
+            cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out, err = proc.communicate()
+        self.assertEqual((proc.returncode, out), (1, ''))
+        self.assertIn('--jobs', err)
+
+if __name__ == '__main__':
+    unittest.main()
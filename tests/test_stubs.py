@@ -0,0 +1,103 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import demo
+from mint import max
+from mint import min
+from mint import miny
+from mint import output
+from mint.miny import *
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN = os.path.join(ROOT, 'tests', 'golden')
+
+class StubsConflict(Module):
+    @model
+    def rtl(self, io):
+        a = wire[4]()
+        b = wire[8]()
+        l = instance[3].StubsLeaf
+        a > l[0]/'x'
+        a > l[1]/'x'
+        b > l[2]/'x'
+        return locals()
+
+def mint(*args):
+    proc = subprocess.Popen([sys.executable, '-m', 'mint'] + list(args),
+                            cwd=ROOT, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    out, err = proc.communicate()
+    return proc.returncode, out, err
+
+def stubs(module='Demo', *args):
+    out = cStringIO.StringIO()
+    max.VerilogGenerator(miny.elaborate(module, 'rtl'),
+                         out).generate_submodules(*args)
+    return out.getvalue()
+
+#-------------------------------------------------------------------------------
+class StubsTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        with open(os.path.join(GOLDEN, 'Demo.stubs.v')) as f:
+            self.golden = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_one_stub_per_module(self):
+        self.assertEqual(stubs(), self.golden)
+        self.assertEqual(self.golden.count('module B ('), 1)
+
+    def test_filters(self):
+        self.assertEqual(stubs('Demo', 'B').splitlines()[0], 'module B (')
+        self.assertEqual(stubs('Demo', None, 'c'),
+                         'module C (\n  input                 p2\n);\n'
+                         'endmodule\n')
+        self.assertRaises(min.MintError, stubs, 'Demo', 'Nope')
+        self.assertRaises(min.MintError, stubs, 'Demo', None, 'nope')
+
+    def test_conflicting_instances(self):
+        with self.assertRaises(min.MintError) as caught:
+            stubs(StubsConflict)
+        self.assertIn("instance 'l2' differ from instance 'l0'",
+                      str(caught.exception))
+
+    def test_files(self):
+        vgen = max.VerilogGenerator(miny.elaborate('Demo', 'rtl'))
+        for i in range(2):
+            stats = output.WriteStats()
+            paths = vgen.generate_submodule_files(self.dir, stats=stats,
+                                                  jobs=2)
+            self.assertEqual((stats.written, stats.skipped),
+                             (4 * (1 - i), 4 * i))
+        self.assertEqual([os.path.basename(path) for path in paths],
+                         ['A.v', 'C.v', 'B.v', 'D.v'])
+        text = ''
+        for path in paths:
+            with open(path) as f:
+                text += f.read()
+        self.assertEqual(text, self.golden)
+
+    def test_cli(self):
+        status, out, err = mint('stubs', '-d', 'demo', 'Demo', 'rtl')
+        self.assertEqual((status, out), (0, self.golden), err)
+
+        status, out, err = mint('stubs', '-d', 'demo', 'Demo', 'rtl',
+                                '-o', self.dir, '-s', 'D')
+        self.assertEqual(status, 0, err)
+        self.assertEqual(os.listdir(self.dir), ['D.v'])
+
+        status, out, err = mint('stubs', '-d', 'demo', 'Demo', 'rtl',
+                                '-s', 'Nope')
+        self.assertEqual(status, 1)
+        self.assertIn("Submodule 'Nope' not found", err)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+#-------------------------------------------------------------------------------
+import collections
+import cStringIO
+import os
+import re
+import unittest
+
+import demo
+from mint import max
+from mint import miny
+
+#-------------------------------------------------------------------------------
+GOLDEN = os.path.join(os.path.dirname(__file__), 'golden')
+
+INSTANCE = re.compile(r'^(?!module )(\w+) (\w+) \(\n(.*?)\n    \);', re.M | re.S)
+PORTMAP = re.compile(r'^\s*\.(\w+)\s+\( (\S+)\s+\)', re.M)
+
+def sv_instances(text):
+    """ Return (module, instance, [(port, connection)]) of the SV instances """
+    return [(module, name, PORTMAP.findall(body))
+            for module, name, body in INSTANCE.findall(text)]
+
+class SystemVerilogTest(unittest.TestCase):
+    def setUp(self):
+        self.mod = miny.elaborate('Demo', 'rtl')
+        out = cStringIO.StringIO()
+        vgen = max.SystemVerilogGenerator(self.mod, out)
+        vgen.generate_interfaces()
+        vgen.generate_module()
+        self.text = out.getvalue()
+        self.instances = sv_instances(self.text)
+
+    def test_instances_of_a_module_have_the_same_ports(self):
+        ports = collections.defaultdict(set)
+        for module, name, portmap in self.instances:
+            ports[module].add(tuple(port for port, conn in portmap))
+        self.assertEqual(len(self.instances), 5)
+        for module, signatures in ports.items():
+            self.assertEqual(len(signatures), 1, (module, signatures))
+
+    def test_net_ports_match_the_stub_signature(self):
+        stubs = max.VerilogGenerator(self.mod).collect_submodules()
+        insts = dict((inst.formatted_repr(fmt0="{name}", fmt1="{name}{index}"),
+                      inst) for inst in self.mod.get_module_instances(True)
+                     if not inst.isport)
+
+        for module, name, portmap in self.instances:
+            intfpins = insts[name].get_bound_pins()[0]
+            intf_ports = set(pin.fname for intfpin in intfpins
+                             for pin in intfpin.get_pins())
+            stub_ports = [row[3] for row in stubs[module]]
+            self.assertEqual([port for port, conn in portmap
+                              if '.' not in conn],
+                             [port for port in stub_ports
+                              if port not in intf_ports])
+
+    def test_lanes_of_one_interface_share_the_port_name(self):
+        portmaps = dict((name, dict(portmap))
+                        for module, name, portmap in self.instances)
+        self.assertEqual(portmaps['b0']['AB_IF'], 'AB_IF0.b')
+        self.assertEqual(portmaps['b1']['AB_IF'], 'AB_IF1.b')
+        self.assertEqual(portmaps['a']['AB_IF0'], 'AB_IF0.a')
+        self.assertEqual(portmaps['a']['AB_IF1'], 'AB_IF1.a')
+
+    def test_matches_golden(self):
+        with open(os.path.join(GOLDEN, 'Demo.sv')) as f:
+            self.assertEqual(self.text, f.read())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+#-------------------------------------------------------------------------------
+import unittest
+
+from mint import min
+from mint import miny
+from mint.miny import *
+
+class ViewsTop(Module):
+    @model
+    def rtl(self, io):
+        u = instance.ViewsLeaf
+        v = instance[2].ViewsLeaf
+        a, b = wire() * 2
+        io > a > u/'in_a'
+        u/'out_b' > b > v/'in_b'
+        return locals()
+
+#-------------------------------------------------------------------------------
+class ViewTest(unittest.TestCase):
+    def setUp(self):
+        self.mod = miny.elaborate(ViewsTop, 'rtl')
+        self.u = self.mod.module_instances['u']
+        self.v = self.mod.module_instances['v']
+
+    def test_binds_through_a_view_update_the_base(self):
+        self.assertEqual([(pin.name, pin.dir) for pin in self.u.pins],
+                         [('in_a', min.Dir.I), ('out_b', min.Dir.O)])
+        for scalar in self.v:
+            pin, = scalar.get_pins()
+            self.assertEqual((pin.name, pin.net.name), ('in_b', 'b'))
+            self.assertIs(pin.modinst, scalar)
+
+    def test_view_is_copy_on_write(self):
+        view = self.u/'x_{n}'
+        self.assertIsInstance(view, min.ModInstScalarView)
+        self.assertIs(min.base_instance(view), self.u)
+        self.assertEqual(view.template, 'x_{n}')
+        self.assertNotEqual(self.u.template, 'x_{n}')
+        self.assertIs(view.pins, self.u.pins)
+
+        view.desc = 'view only'
+        self.assertFalse(hasattr(self.u, 'desc'))
+
+        nested = view/'y'
+        self.assertIs(min.base_instance(nested), self.u)
+        self.assertEqual(view.template, 'x_{n}')
+
+    def test_list_view_items_share_the_base_scalars(self):
+        view = self.v/'in_c'
+        self.assertIsInstance(view, min.ModInstListView)
+        self.assertIs(min.base_instance(view[1]), self.v[1])
+        self.assertEqual([item.template for item in view], ['in_c'] * 2)
+
+    def test_bad_template(self):
+        self.assertRaises(TypeError, lambda: self.u / 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+#-------------------------------------------------------------------------------
+import cStringIO
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+
+from mint import max
+from mint import miny
+from mint import watch
+
+# Design sources, one python module per module class. Each model logs its
+# builds in watch_test_log, which is never edited.
+SOURCES = {
+    'watch_test_log': '''
+        builds = []
+        ''',
+    'watch_test_leaf': '''
+        from mint.miny import *
+        import watch_test_log
+
+        class WatchLeaf(Module):
+            @model
+            def rtl(self, io):
+                watch_test_log.builds.append('WatchLeaf')
+                return locals()
+        ''',
+    'watch_test_mid': '''
+        from mint.miny import *
+        import watch_test_leaf
+        import watch_test_log
+
+        class WatchMid(Module):
+            @model
+            def rtl(self, io):
+                watch_test_log.builds.append('WatchMid')
+                leaf = instance.WatchLeaf
+                x = wire()
+                io > x > leaf
+                return locals()
+        ''',
+    'watch_test_top': '''
+        from mint.miny import *
+        import watch_test_leaf
+        import watch_test_log
+        import watch_test_mid
+
+        class WatchTop(Module):
+            @model
+            def rtl(self, io):
+                watch_test_log.builds.append('WatchTop')
+                mids = instance[2].WatchMid
+                leaf = instance.WatchLeaf
+                a = wire[WIDTH]()
+                io > a > mids
+                a > leaf
+                return locals()
+        ''',
+    # A base class and a subclass of it in another module
+    'watch_test_base': '''
+        from mint.miny import *
+        import watch_test_leaf
+
+        class WatchBase(Module):
+            @model
+            def rtl(self, io):
+                leaf = instance.WatchLeaf
+                b = wire[WIDTH]()
+                io > b > leaf
+                return locals()
+        ''',
+    'watch_test_sub': '''
+        import watch_test_base
+
+        class WatchSub(watch_test_base.WatchBase):
+            pass
+        ''',
+}
+
+#-------------------------------------------------------------------------------
+class WatchFixture(unittest.TestCase):
+    """ Watches TOP, imported from DESIGN """
+    TOP = 'WatchTop'
+    DESIGN = 'watch_test_top'
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.dont_write_bytecode = sys.dont_write_bytecode
+        sys.dont_write_bytecode = True
+        sys.path.insert(0, self.dir)
+        self.mtime = 1000000000
+        for name in SOURCES:
+            self.write(name, SOURCES[name], WIDTH=4)
+        self.path = os.path.join(self.dir, self.TOP + '.v')
+        target = watch.Target(self.TOP, 'rtl', self.path)
+        self.watcher = watch.Watcher([self.DESIGN], [target])
+        self.watcher.start()
+        self.log = sys.modules['watch_test_log'].builds
+
+    def tearDown(self):
+        sys.path.remove(self.dir)
+        sys.dont_write_bytecode = self.dont_write_bytecode
+        for name in SOURCES:
+            sys.modules.pop(name, None)
+        for name in ('WatchTop', 'WatchMid', 'WatchLeaf', 'WatchBase',
+                     'WatchSub'):
+            max.Registry._registry.pop(name, None)
+        shutil.rmtree(self.dir)
+
+    def write(self, name, source, **values):
+        path = os.path.join(self.dir, name + '.py')
+        with open(path, 'w') as f:
+            f.write(textwrap.dedent(source).replace('WIDTH',
+                                                    str(values.get('WIDTH'))))
+        # Distinct mtimes even within the same second
+        self.mtime += 10
+        os.utime(path, (self.mtime, self.mtime))
+
+    def edit(self, name, **values):
+        self.write(name, SOURCES[name], **values)
+        del self.log[:]
+        return self.watcher.step()
+
+    def generated(self):
+        with open(self.path) as f:
+            return f.read()
+
+    def fresh(self):
+        out = cStringIO.StringIO()
+        miny.verilog(self.TOP, 'rtl', out)
+        return out.getvalue()
+
+class WatchTest(WatchFixture):
+    def test_first_build_elaborates_everything(self):
+        self.assertEqual(sorted(self.log),
+                         ['WatchLeaf'] * 3 + ['WatchMid'] * 2 + ['WatchTop'])
+        self.assertIn('WatchMid mids0', self.generated())
+
+    def test_leaf_edit_rebuilds_its_parents_only(self):
+        self.assertEqual(self.edit('watch_test_leaf'), [])
+        self.assertEqual(sorted(self.log),
+                         ['WatchLeaf'] * 3 + ['WatchMid'] * 2 + ['WatchTop'])
+
+        self.edit('watch_test_mid')
+        self.assertEqual(sorted(self.log), ['WatchMid'] * 2 + ['WatchTop'])
+        self.assertEqual(self.generated(), self.fresh())
+
+    def test_top_edit_reuses_the_submodules(self):
+        self.assertEqual(len(self.edit('watch_test_top', WIDTH=8)), 1)
+        self.assertEqual(self.log, ['WatchTop'])
+        self.assertIn('[7:0]', self.generated())
+        self.assertEqual(self.generated(), self.fresh())
+
+    def test_failed_edit_forces_a_full_build(self):
+        watch.log.disabled = True
+        try:
+            self.edit('watch_test_top', WIDTH='undefined')
+        finally:
+            watch.log.disabled = False
+        self.assertEqual(self.log, ['WatchTop'])
+        self.edit('watch_test_top', WIDTH=8)
+        self.assertEqual(sorted(self.log),
+                         ['WatchLeaf'] * 3 + ['WatchMid'] * 2 + ['WatchTop'])
+        self.assertEqual(self.generated(), self.fresh())
+
+class WatchBaseClassTest(WatchFixture):
+    TOP = 'WatchSub'
+    DESIGN = 'watch_test_sub'
+
+    def test_base_class_edit_in_another_module(self):
+        self.assertIn('[3:0]', self.generated())
+        self.assertEqual(len(self.edit('watch_test_base', WIDTH=8)), 1)
+        # The subclass was re-imported on top of the new base
+        registry = max.Registry._registry
+        self.assertIs(registry['WatchSub'].obj.__bases__[0],
+                      registry['WatchBase'].obj)
+        self.assertIn('[7:0]', self.generated())
+        self.assertEqual(self.generated(), self.fresh())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#-------------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+import unittest
+
+from mint import output
+
+#-------------------------------------------------------------------------------
+class ConcurrentWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def read(self, name):
+        with open(self.path(name)) as f:
+            return f.read()
+
+    def test_writes_and_skips_unchanged(self):
+        stats = output.WriteStats()
+        with output.ConcurrentWriter(3, stats, pending=2) as writer:
+            for i in range(10):
+                writer.submit(self.path('f%d.v' % i), 'text %d\n' % i)
+        self.assertEqual((stats.written, stats.skipped), (10, 0))
+        self.assertEqual(self.read('f7.v'), 'text 7\n')
+
+        stats = output.WriteStats()
+        with output.ConcurrentWriter(2, stats) as writer:
+            writer.submit(self.path('f1.v'), 'text 1\n')
+            writer.submit(self.path('f2.v'), 'new\n')
+        self.assertEqual((stats.written, stats.skipped), (1, 1))
+
+    def test_errors_are_reported_per_file(self):
+        writer = output.ConcurrentWriter(2)
+        writer.submit(self.path('missing/a.v'), 'a\n')
+        writer.submit(self.path('ok.v'), 'ok\n')
+        writer.submit(self.path('unicode.v'), u'\xe9\n') # not an IOError
+        with self.assertRaises(output.WriteError) as cm:
+            writer.join()
+        self.assertEqual([path for path, error in cm.exception.errors],
+                         [self.path('missing/a.v'), self.path('unicode.v')])
+        self.assertIsInstance(cm.exception.errors[1][1], UnicodeError)
+        self.assertEqual(self.read('ok.v'), 'ok\n')
+
+    def test_dead_workers_do_not_block(self):
+        class DeadWriter(output.ConcurrentWriter):
+            def worker(self):
+                return
+
+        writer = DeadWriter(1, pending=1)
+        for i in range(3):
+            writer.submit(self.path('f%d.v' % i), 'x')
+        with self.assertRaises(output.WriteError) as cm:
+            writer.join()
+        self.assertTrue(cm.exception.errors)
+
+    def test_needs_a_job(self):
+        self.assertRaises(ValueError, output.ConcurrentWriter, 0)
+
+    def test_split_output_through_writer(self):
+        def split(writer):
+            out = output.SplitOutput(self.path('m.v'), 16, writer=writer)
+            out.write('module m;\n')
+            out.section('wires')
+            for i in range(8):
+                out.write('wire w%d;\n' % i)
+                out.boundary()
+            out.end_section()
+            out.write('endmodule\n')
+            out.close()
+            return out.manifest()
+
+        serial = split(None)
+        texts = dict((name, self.read(name)) for name in os.listdir(self.dir))
+        shutil.rmtree(self.dir)
+        os.mkdir(self.dir)
+
+        with output.ConcurrentWriter(2) as writer:
+            concurrent = split(writer)
+        self.assertEqual(concurrent, serial)
+        self.assertEqual(dict((name, self.read(name))
+                              for name in os.listdir(self.dir)), texts)
+
+if __name__ == '__main__':
+    unittest.main()